@@ -1,8 +1,27 @@
-from .coordinator import CoordinatorAgent
-from .assessor import AssessmentAgent
-from .therapist import TherapistAgent
-from .validator import ValidatorAgent
-from .safety import SafetyAgent
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .coordinator import CoordinatorAgent
+    from .assessor import AssessmentAgent
+    from .therapist import TherapistAgent
+    from .validator import ValidatorAgent
+    from .safety import SafetyAgent
+
+# Agents are imported on first attribute access so that importing one of
+# them doesn't pull in the others' dependencies
+_AGENT_MODULES = {
+    'CoordinatorAgent': '.coordinator',
+    'AssessmentAgent': '.assessor',
+    'TherapistAgent': '.therapist',
+    'ValidatorAgent': '.validator',
+    'SafetyAgent': '.safety'
+}
+
+def __getattr__(name):
+    if name in _AGENT_MODULES:
+        return getattr(import_module(_AGENT_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'CoordinatorAgent',
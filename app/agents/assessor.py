@@ -1,15 +1,70 @@
-from typing import Dict, Tuple, List
+from typing import Any, Dict, Mapping, Optional, Tuple, List
 from datetime import datetime
-from textblob import TextBlob
-from app.models.message import Message
+from types import MappingProxyType
+import itertools
+import sys
+from app.models.message import HistoryEntry, Message
+from app.models.runtime import EmotionReading, TextAssessment
 from app.models.state import EmotionalState, SafetyStatus
+from app.models.vocab import EMOTION_CODES, NEUTRAL
+from app.utils.assessment_cache import AssessmentCache, get_assessment_cache
+from app.utils.executor import AssessmentExecutor, get_assessment_executor
+from app.utils.tracing import tracer
+
+# Part of every assessment cache key. Bump it whenever assess_text's scoring
+# changes so results computed by the old logic are never served.
+ASSESSOR_VERSION = 1
+
+# Hashable snapshot of an agent's keyword weights and emotion codes
+ScoringConfig = Tuple[Tuple[Tuple[str, float], ...], Tuple[Any, ...]]
+
+# Scoring config -> small id used in cache keys, so keys hash cheaply. Equal
+# configs share an id (and so cached results) while they are in the table;
+# ids are never reused, so clearing a full table can only cost cache hits.
+_config_ids: Dict[ScoringConfig, int] = {}
+_next_config_id = itertools.count()
+MAX_CONFIG_IDS = 64
+
+def _config_id(config: ScoringConfig) -> int:
+    config_id = _config_ids.get(config)
+    if config_id is None:
+        if len(_config_ids) >= MAX_CONFIG_IDS:
+            _config_ids.clear()
+        config_id = _config_ids[config] = next(_next_config_id)
+    return config_id
+
+def sentiment(text: str) -> Tuple[float, float]:
+    """TextBlob (polarity, subjectivity) for a text; TextBlob is imported on first use."""
+    from textblob import TextBlob
+    
+    with tracer.span("assessor.sentiment"):
+        result = TextBlob(text).sentiment
+        return result.polarity, result.subjectivity
+
+def normalize_text(text: str) -> str:
+    """
+    Cache form of a message text: whitespace collapsed, case kept.
+    
+    Case must stay, since TextBlob's emoticon lexicon is case-sensitive
+    (``:D`` scores positive, ``:d`` doesn't).
+    """
+    return " ".join(text.split())
 
 class AssessmentAgent:
     """Clinical assessment agent for emotional state and safety analysis."""
     
-    def __init__(self):
+    def __init__(self, 
+                 executor: Optional[AssessmentExecutor] = None,
+                 cache: Optional[AssessmentCache] = None):
+        # Where analyze runs the CPU work, and the cache of its message-level
+        # results; the shared configured ones by default
+        self.executor = executor
+        self.cache = cache
+        # (scoring_config(), its cache-key id), computed on first use
+        self._scoring: Optional[Tuple[ScoringConfig, int]] = None
+        
         # Crisis keywords and their weights
-        self.crisis_indicators = {
+        self._crisis_indicators = {
             'suicide': 1.0,
             'kill': 0.8,
             'die': 0.7,
@@ -48,84 +103,207 @@ class AssessmentAgent:
                 (0.7, 1.0): "elated"
             }
         }
+        self._emotion_codes = {
+            pol_range: {
+                subj_range: EMOTION_CODES[name]
+                for subj_range, name in subj_ranges.items()
+            }
+            for pol_range, subj_ranges in self.emotion_map.items()
+        }
     
+    @property
+    def crisis_indicators(self) -> Mapping[str, float]:
+        """Crisis keywords and their weights (read-only; assign a new mapping to change them)."""
+        return MappingProxyType(self._crisis_indicators)
+    
+    @crisis_indicators.setter
+    def crisis_indicators(self, weights: Mapping[str, float]):
+        self._crisis_indicators = dict(weights)
+        self._scoring = None
+    
+    def scoring_config(self) -> ScoringConfig:
+        """
+        Snapshot of the settings ``assess_text`` scores with.
+        
+        Computed once and again only after ``crisis_indicators`` is
+        reassigned; it keys the cache and rebuilds this agent in process
+        workers.
+        """
+        return self._scoring_key()[0]
+    
+    def _scoring_key(self) -> Tuple[ScoringConfig, int]:
+        scoring = self._scoring
+        if scoring is None:
+            config = (
+                tuple(self._crisis_indicators.items()),
+                tuple((pol_range, tuple(codes.items())) for pol_range, codes in self._emotion_codes.items())
+            )
+            scoring = self._scoring = (config, _config_id(config))
+        return scoring
+    
+    @classmethod
+    def from_scoring_config(cls, config: ScoringConfig) -> "AssessmentAgent":
+        """An agent that scores exactly like the one ``config`` was taken from."""
+        agent = cls()
+        crisis_indicators, emotion_codes = config
+        agent.crisis_indicators = dict(crisis_indicators)
+        agent._emotion_codes = {pol_range: dict(codes) for pol_range, codes in emotion_codes}
+        agent._scoring = None
+        return agent
+    
+    @tracer.traced("assessor.analyze")
     async def analyze(self, message: Message, 
-                     conversation_history: List[Message]) -> Tuple[EmotionalState, SafetyStatus]:
+                     conversation_history: List[HistoryEntry],
+                     text_assessment: Optional[TextAssessment] = None) -> Tuple[EmotionalState, SafetyStatus]:
         """
         Analyze message for emotional content and safety concerns.
         
         Args:
             message: Current message to analyze
             conversation_history: Previous messages for context
+            text_assessment: Precomputed ``assess_text`` result for the message
             
         Returns:
             Tuple of EmotionalState and SafetyStatus
         """
-        # Analyze text using TextBlob
-        blob = TextBlob(message.content)
+        texts = [msg.content for msg in conversation_history[-3:]]
+        if text_assessment is None:
+            texts.append(message.content)
+        assessments = await self.assess_texts(texts)
+        if text_assessment is None:
+            text_assessment = assessments.pop()
         
-        # Get polarity (-1 to 1) and subjectivity (0 to 1)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
+        # History risk is recomputed for this session on every turn; only the
+        # message-level assessments behind it come from the cache
+        history_risk = self.history_risk([assessment.emotion.valence for assessment in assessments])
+        
+        # Perform safety assessment
+        safety_status = self._assess_safety(text_assessment, history_risk)
+        
+        return text_assessment.emotion.to_model(), safety_status
+    
+    async def assess_texts(self, texts: List[str]) -> List[TextAssessment]:
+        """
+        ``assess_text`` for several texts, served from the cache where possible.
+        
+        Texts are scored in their ``normalize_text`` form, the cache key,
+        so a cached result never depends on which spelling arrived first.
+        The texts that miss are scored in one call to the executor, off the
+        event loop unless it runs inline, and then cached.
+        
+        Args:
+            texts: Message texts to assess
+            
+        Returns:
+            One TextAssessment per text, in order
+        """
+        normalized = [normalize_text(text) for text in texts]
+        cache = self.cache if self.cache is not None else get_assessment_cache()
+        if not cache.enabled:
+            return await self._score(normalized)
+        
+        # Agents configured differently share the cache without sharing results
+        config_id = self._scoring_key()[1]
+        keys = [(ASSESSOR_VERSION, config_id, text) for text in normalized]
+        results: List[Optional[TextAssessment]] = []
+        # key -> normalized text for the distinct texts to score
+        missing: Dict[Tuple[int, int, str], str] = {}
+        for key, text in zip(keys, normalized):
+            assessment = cache.get(key) if key not in missing else None
+            if assessment is None:
+                missing.setdefault(key, text)
+            results.append(assessment)
+        
+        if missing:
+            scored = dict(zip(missing, await self._score(list(missing.values()))))
+            for key, assessment in scored.items():
+                cache.put(key, assessment)
+            results = [scored[key] if assessment is None else assessment
+                       for key, assessment in zip(keys, results)]
+        return results
+    
+    async def _score(self, texts: List[str]) -> List[TextAssessment]:
+        executor = self.executor or get_assessment_executor()
+        return await executor.call(self, "score_texts", texts)
+    
+    def score_texts(self, texts: List[str]) -> List[TextAssessment]:
+        """CPU-bound part of ``analyze``: ``assess_text`` for each text."""
+        return [self.assess_text(text) for text in texts]
+    
+    def assess_text(self, text: str) -> TextAssessment:
+        """Score a single message's text: sentiment, emotion and keyword risk."""
+        # Get polarity (-1 to 1) and subjectivity (0 to 1) using TextBlob
+        polarity, subjectivity = sentiment(text)
         
         # Map to emotional state
-        emotional_state = self._map_to_emotion(polarity, subjectivity)
+        emotion = self._map_to_emotion(polarity, subjectivity)
         
-        # Perform safety assessment
-        safety_status = await self._assess_safety(message.content, 
-                                                emotional_state,
-                                                conversation_history)
+        risk_score, crisis_indicators = self._scan_crisis_keywords(text, emotion)
+        return TextAssessment(emotion, risk_score, crisis_indicators)
+    
+    @tracer.traced("assessor.analyze_batch")
+    async def analyze_batch(self, messages: List[Message]) -> List[TextAssessment]:
+        """
+        Assess the text of many messages at once, through ``assess_texts``.
         
-        return emotional_state, safety_status
+        Results match ``analyze`` for the same text, and share its cache and
+        executor; history-dependent risk is left to ``analyze`` so it can be
+        applied per session.
+        """
+        return await self.assess_texts([message.content for message in messages])
     
-    def _map_to_emotion(self, polarity: float, subjectivity: float) -> EmotionalState:
+    def _map_to_emotion(self, polarity: float, subjectivity: float) -> EmotionReading:
         """Map TextBlob sentiment to emotional state."""
         # Find the right emotion based on polarity and subjectivity ranges
-        primary_emotion = "neutral"
-        for (pol_min, pol_max) in self.emotion_map:
+        emotion_code = NEUTRAL
+        for (pol_min, pol_max) in self._emotion_codes:
             if pol_min <= polarity <= pol_max:
-                subj_ranges = self.emotion_map[(pol_min, pol_max)]
+                subj_ranges = self._emotion_codes[(pol_min, pol_max)]
                 for (subj_min, subj_max) in subj_ranges:
                     if subj_min <= subjectivity <= subj_max:
-                        primary_emotion = subj_ranges[(subj_min, subj_max)]
+                        emotion_code = subj_ranges[(subj_min, subj_max)]
                         break
                 break
         
-        return EmotionalState(
-            primary_emotion=primary_emotion,
+        return EmotionReading(
+            emotion_code=emotion_code,
             intensity=subjectivity,
             valence=polarity,
-            arousal=self._calculate_arousal(polarity, subjectivity),
-            secondary_emotions=[]
+            arousal=self._calculate_arousal(polarity, subjectivity)
         )
     
-    async def _assess_safety(self, 
-                           text: str, 
-                           emotional_state: EmotionalState,
-                           history: List[Message]) -> SafetyStatus:
-        """Assess message for safety concerns and crisis indicators."""
+    def _scan_crisis_keywords(self, 
+                              text: str, 
+                              emotion: EmotionReading) -> Tuple[float, Tuple[str, ...]]:
+        """Score crisis keywords and emotional extremity in a single message."""
         risk_score = 0.0
         crisis_indicators = []
         
         # Check for crisis keywords
         words = text.lower().split()
         for word in words:
-            if word in self.crisis_indicators:
-                risk_score = max(risk_score, self.crisis_indicators[word])
-                crisis_indicators.append(word)
+            if word in self._crisis_indicators:
+                risk_score = max(risk_score, self._crisis_indicators[word])
+                # Share the keyword constant rather than keep the split() copy
+                crisis_indicators.append(sys.intern(word))
         
         # Factor in emotional state
-        if emotional_state.valence < -0.8 and emotional_state.intensity > 0.7:
+        if emotion.valence < -0.8 and emotion.intensity > 0.7:
             risk_score += 0.2
+        
+        return risk_score, tuple(crisis_indicators)
+    
+    def _assess_safety(self, 
+                       text_assessment: TextAssessment,
+                       history_risk: float) -> SafetyStatus:
+        """Combine message-level risk with conversation history risk into a safety status."""
+        # Factor in patterns in conversation history
+        risk_score = max(text_assessment.risk_score, history_risk)
             
-        # Analyze patterns in conversation history
-        if history:
-            history_risk = self._analyze_history_risk(history)
-            risk_score = max(risk_score, history_risk)
-            
-        return SafetyStatus(
+        # Values are computed here, so skip validation
+        return SafetyStatus.model_construct(
             risk_level=min(1.0, risk_score),
-            crisis_indicators=crisis_indicators,
+            crisis_indicators=list(text_assessment.crisis_indicators),
             last_assessment=datetime.now(),
             recommended_actions=self._get_safety_recommendations(risk_score)
         )
@@ -136,19 +314,13 @@ class AssessmentAgent:
         # High arousal = strong feelings (positive or negative) + high subjectivity
         return min(1.0, (abs(polarity) + subjectivity) / 2)
     
-    def _analyze_history_risk(self, history: List[Message]) -> float:
-        """Analyze conversation history for risk patterns."""
-        if not history:
-            return 0.0
-            
-        # Look at recent messages for negative patterns
-        recent_messages = history[-3:]  # Last 3 messages
+    def history_risk(self, polarities: List[float]) -> float:
+        """Risk from the sentiment polarities of the last three history messages."""
         risk_score = 0.0
         
-        for msg in recent_messages:
-            blob = TextBlob(msg.content)
+        for polarity in polarities[-3:]:
             # If very negative sentiment in recent messages, increase risk
-            if blob.sentiment.polarity < -0.7:
+            if polarity < -0.7:
                 risk_score += 0.1
                 
         return min(1.0, risk_score)
@@ -2,14 +2,18 @@
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import logging
-from app.models.message import Message
+from app.config.settings import get_settings
+from app.models.message import HistoryEntry, Message
 from app.models.state import (
     ConversationState, 
     TherapeuticFramework, 
     EmotionalState, 
     SafetyStatus,
-    TherapeuticState
+    TherapeuticState,
+    initial_conversation_state
 )
+from app.utils.recording import current_turn
+from app.utils.tracing import current_span, tracer
 from .assessor import AssessmentAgent
 from .therapist import TherapistAgent
 from .safety import SafetyAgent
@@ -25,7 +29,6 @@ class CoordinatorAgent:
         self.safety_agent = SafetyAgent()
         
         self.config = config or {}
-        self.crisis_threshold = self.config.get('crisis_threshold', 0.7)
         
         # Define therapeutic framework selection criteria
         self.framework_selection_rules = {
@@ -37,6 +40,17 @@ class CoordinatorAgent:
             'relationship_issues': TherapeuticFramework.SOLUTION_FOCUSED
         }
         
+    @property
+    def crisis_threshold(self) -> float:
+        """Risk level at which a turn is handled as a crisis."""
+        return self.config.get('crisis_threshold', get_settings().CRISIS_THRESHOLD)
+    
+    @property
+    def max_history(self) -> int:
+        """Number of messages kept in the conversation state."""
+        return self.config.get('max_history', get_settings().MAX_HISTORY)
+    
+    @tracer.traced("coordinator.process_message")
     async def process_message(
         self, 
         message: Message, 
@@ -54,11 +68,11 @@ class CoordinatorAgent:
         """
         try:
             # Initialize or update conversation state
-            current_state = state or await self._initialize_state()
+            current_state = state or self._initialize_state()
             
             # Update message history
-            current_state.messages.append(message)
-            if len(current_state.messages) > 10:  # Keep last 10 messages
+            current_state.messages.append(HistoryEntry.from_message(message))
+            if len(current_state.messages) > self.max_history:  # Keep recent messages only
                 current_state.messages.pop(0)
             
             # Perform emotional and safety assessment
@@ -70,6 +84,9 @@ class CoordinatorAgent:
             # Update state with new assessments
             current_state.emotional_state = emotional_state
             current_state.safety_status = safety_status
+            record = current_turn()
+            if record is not None:
+                record.set_assessment(emotional_state, safety_status)
             
             # Check for crisis situation
             if safety_status.risk_level >= self.crisis_threshold:
@@ -77,6 +94,8 @@ class CoordinatorAgent:
                     message, 
                     current_state
                 )
+                if record is not None:
+                    record.set_response(response)
                 return response, updated_state
             
             # Update therapeutic approach if needed
@@ -91,7 +110,9 @@ class CoordinatorAgent:
             )
             
             # Update state with response
-            current_state.messages.append(response)
+            current_state.messages.append(HistoryEntry.from_message(response))
+            if record is not None:
+                record.set_response(response)
             
             return response, current_state
             
@@ -99,31 +120,9 @@ class CoordinatorAgent:
             logger.error(f"Error processing message: {e}", exc_info=True)
             return await self._handle_error(current_state), current_state
     
-    async def _initialize_state(self) -> ConversationState:
+    def _initialize_state(self) -> ConversationState:
         """Initialize a new conversation state."""
-        return ConversationState(
-            messages=[],
-            emotional_state=EmotionalState(
-                primary_emotion="neutral",
-                intensity=0.0,
-                valence=0.0,
-                arousal=0.0,
-                secondary_emotions=[]
-            ),
-            therapeutic_state=TherapeuticState(
-                active_framework=TherapeuticFramework.PERSON_CENTERED,
-                session_goals=[],
-                progress_markers={},
-                interventions_used=[]
-            ),
-            safety_status=SafetyStatus(
-                risk_level=0.0,
-                crisis_indicators=[],
-                last_assessment=datetime.now(),
-                recommended_actions=[]
-            ),
-            metadata={}
-        )
+        return initial_conversation_state()
     
     async def _handle_crisis(
         self, 
@@ -134,6 +133,7 @@ class CoordinatorAgent:
         try:
             # Log crisis detection
             logger.warning(f"Crisis detected. Risk level: {state.safety_status.risk_level}")
+            current_span().set("crisis", True)
             
             # Generate crisis response
             crisis_response = Message(
@@ -148,9 +148,10 @@ class CoordinatorAgent:
             )
             
             # Update state for crisis handling
-            state.therapeutic_state.active_framework = TherapeuticFramework.DBT
-            state.therapeutic_state.interventions_used.append("crisis_intervention")
-            state.messages.append(crisis_response)
+            therapeutic_state = state.edit_therapeutic_state()
+            therapeutic_state.active_framework = TherapeuticFramework.DBT
+            therapeutic_state.interventions_used.append("crisis_intervention")
+            state.messages.append(HistoryEntry.from_message(crisis_response))
             
             return crisis_response, state
             
@@ -172,6 +173,7 @@ class CoordinatorAgent:
         )
         
         if new_framework != current_approach.active_framework:
+            current_approach = state.edit_therapeutic_state()
             current_approach.active_framework = new_framework
             current_approach.interventions_used = []
             
@@ -193,12 +195,12 @@ class CoordinatorAgent:
         if safety_status.risk_level > 0.5:
             return TherapeuticFramework.DBT
             
-        # Check primary emotion against framework rules
-        if emotional_state.primary_emotion.lower() in self.framework_selection_rules:
-            return self.framework_selection_rules[emotional_state.primary_emotion.lower()]
-            
-        # Default to person-centered approach
-        return TherapeuticFramework.PERSON_CENTERED
+        # Check primary emotion against framework rules; emotions come from
+        # the lowercase vocabulary, defaulting to a person-centered approach
+        return self.framework_selection_rules.get(
+            emotional_state.primary_emotion,
+            TherapeuticFramework.PERSON_CENTERED
+        )
     
     def _generate_framework_goals(
         self, 
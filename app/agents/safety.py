@@ -1,7 +1,8 @@
-from typing import Dict, List
+from typing import Dict, List, Tuple
 import datetime
-from app.models.message import Message
+from app.models.message import HistoryEntry, Message
 from app.models.state import SafetyStatus
+from app.utils.tracing import tracer
 
 class SafetyAgent:
     """Crisis detection and safety monitoring agent."""
@@ -15,16 +16,10 @@ class SafetyAgent:
             'end': 0.6
         }
     
-    async def evaluate_risk(self, message: Message, history: List[Message] = None) -> SafetyStatus:
+    @tracer.traced("safety.evaluate_risk")
+    async def evaluate_risk(self, message: Message, history: List[HistoryEntry] = None) -> SafetyStatus:
         """Evaluate message for crisis indicators and safety concerns."""
-        risk_score = 0.0
-        crisis_indicators = []
-        
-        # Check message content
-        for word, weight in self.crisis_keywords.items():
-            if word in message.content.lower():
-                risk_score = max(risk_score, weight)
-                crisis_indicators.append(word)
+        risk_score, crisis_indicators = self.scan_text(message.content)
         
         # Check conversation patterns if history provided
         if history:
@@ -38,7 +33,21 @@ class SafetyAgent:
             recommended_actions=self._get_recommendations(risk_score)
         )
     
-    def _evaluate_patterns(self, history: List[Message]) -> float:
+    def scan_text(self, text: str) -> Tuple[float, List[str]]:
+        """Keyword risk score and matched keywords for a single message's text."""
+        risk_score = 0.0
+        crisis_indicators = []
+        
+        # Check message content
+        content = text.lower()
+        for word, weight in self.crisis_keywords.items():
+            if word in content:
+                risk_score = max(risk_score, weight)
+                crisis_indicators.append(word)
+        
+        return risk_score, crisis_indicators
+    
+    def _evaluate_patterns(self, history: List[HistoryEntry]) -> float:
         """Evaluate conversation history for concerning patterns."""
         risk_score = 0.0
         # Implement pattern recognition logic
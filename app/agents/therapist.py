@@ -1,12 +1,13 @@
-from typing import Dict, List, Optional
-import groq
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 import logging
-import os
-from dotenv import load_dotenv
-import streamlit as st
+import time
 
+from app.config.settings import get_settings
 from app.models.message import Message
+from app.utils.circuit import CircuitBreaker, CircuitOpenError
+from app.utils.recording import current_turn
+from app.utils.tracing import tracer
 from app.models.state import (
     ConversationState, 
     TherapeuticFramework, 
@@ -21,24 +22,30 @@ class TherapistAgent:
     
     def __init__(self):
         try:
-            # Get API key from Streamlit secrets
-            self.api_key = st.secrets["GROQ_API_KEY"]
-            self.model_name = st.secrets.get("MODEL_NAME", "mixtral-8x7b-32768")
+            # Get API key from the shared application settings
+            settings = get_settings()
+            self.api_key = settings.GROQ_API_KEY
+            self.base_url = settings.GROQ_BASE_URL
+            self.model_name = settings.MODEL_NAME
             
             if not self.api_key:
-                raise ValueError("GROQ_API_KEY is missing in Streamlit secrets")
+                raise ValueError("GROQ_API_KEY is not configured")
             
-            # Initialize Groq client
-            self.client = groq.Groq(api_key=self.api_key)
-            logger.info("TherapistAgent initialized with Groq client")
+            # Groq clients are created on first use (see the properties below)
+            self._client = None
+            self._async_client = None
+            
+            # Fail fast with the fallback response while the provider is down
+            self.circuit = CircuitBreaker(
+                "llm_provider",
+                failure_threshold=settings.PROVIDER_FAILURE_THRESHOLD,
+                reset_timeout=settings.PROVIDER_RESET_TIMEOUT
+            )
+            logger.info("TherapistAgent initialized")
         
         except Exception as e:
             logger.error(f"Error initializing TherapistAgent: {e}")
             raise ValueError(f"Failed to initialize TherapistAgent: {str(e)}")
-
-        # Initialize Groq client
-        self.client = groq.Groq(api_key=self.api_key)
-        logger.info("TherapistAgent initialized with Groq client")
         
         self.framework_prompts = {
             TherapeuticFramework.CBT: self._get_cbt_prompt,
@@ -48,13 +55,143 @@ class TherapistAgent:
             TherapeuticFramework.SOLUTION_FOCUSED: self._get_solution_focused_prompt
         }
         
+    @property
+    def client(self):
+        """Synchronous Groq client, created (and the SDK imported) on first use."""
+        if self._client is None:
+            import groq
+            self._client = groq.Groq(api_key=self.api_key, base_url=self.base_url)
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
+    
+    @property
+    def async_client(self):
+        """Async Groq client used for generation, created on first use."""
+        if self._async_client is None:
+            import groq
+            self._async_client = groq.AsyncGroq(api_key=self.api_key, base_url=self.base_url)
+        return self._async_client
+    
+    @async_client.setter
+    def async_client(self, client):
+        self._async_client = client
+    
     async def generate_response(
         self, 
         message: Message, 
         state: ConversationState
     ) -> Message:
         """Generate therapeutic response based on user input and conversation state."""
+        record = current_turn()
+        messages = None
+        start = time.perf_counter()
+        try:
+            with tracer.span("therapist.build_prompt"):
+                messages = self._build_messages(message, state)
+            
+            # Generate response using Groq without blocking the event loop
+            start = time.perf_counter()
+            with tracer.span("therapist.completion", model=self.model_name) as span:
+                completion = await self.circuit.call(
+                    self.async_client.chat.completions.create,
+                    model=self.model_name,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=300
+                )
+                usage = getattr(completion, "usage", None)
+                if usage is not None:
+                    span.set("total_tokens", usage.total_tokens)
+            
+            content = completion.choices[0].message.content
+            if record is not None:
+                record.add_completion(messages, content, (time.perf_counter() - start) * 1000)
+            return self.build_response(content, state)
+            
+        except CircuitOpenError as e:
+            logger.warning(f"Using fallback response: {e}")
+            if record is not None:
+                record.add_completion(messages, None, 0.0, error=type(e).__name__)
+            return self._generate_fallback_response(state)
+        except Exception as e:
+            logger.error(f"Error generating response: {e}", exc_info=True)
+            if record is not None:
+                record.add_completion(
+                    messages, None, (time.perf_counter() - start) * 1000, error=type(e).__name__
+                )
+            return self._generate_fallback_response(state)
+    
+    async def stream_response(
+        self, 
+        message: Message, 
+        state: ConversationState
+    ) -> AsyncIterator[str]:
+        """
+        Stream the raw response text as it is generated.
+        
+        Callers accumulate the deltas and pass the full text to
+        ``build_response``; errors are raised rather than replaced by a
+        fallback so the caller can decide what the client sees.
+        """
+        record = current_turn()
+        messages = self._build_messages(message, state)
+        chunks: List[str] = []
+        start = time.perf_counter()
+        try:
+            self.circuit.check()
+        except CircuitOpenError as e:
+            if record is not None:
+                record.add_completion(messages, None, 0.0, stream=True, error=type(e).__name__)
+            raise
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=300,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if record is not None:
+                        chunks.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            self.circuit.record_failure()
+            if record is not None:
+                record.add_completion(
+                    messages, None, (time.perf_counter() - start) * 1000, stream=True, error=type(e).__name__
+                )
+            raise
+        except BaseException:
+            # Abandoned or cancelled mid-stream: says nothing about the provider
+            self.circuit.release()
+            raise
+        self.circuit.record_success()
+        if record is not None:
+            record.add_completion(messages, "".join(chunks), (time.perf_counter() - start) * 1000, stream=True)
+    
+    def build_response(self, content: str, state: ConversationState) -> Message:
+        """Wrap generated text into the bot response message."""
+        # Process and enhance the response
+        processed_response = self._process_response(content, state)
         
+        # Built from trusted values, so skip validation
+        return Message.model_construct(
+            content=processed_response,
+            sender="bot",
+            timestamp=datetime.utcnow().timestamp(),
+            metadata={
+                "therapeutic_intent": state.therapeutic_state.active_framework.value,
+                "emotional_target": state.emotional_state.primary_emotion
+            }
+        )
+    
+    def _build_messages(self, message: Message, state: ConversationState) -> List[Dict[str, str]]:
+        """Build the chat completion messages for the current turn."""
         # Build the conversation context
         context = self._build_context(message, state)
         
@@ -66,38 +203,10 @@ class TherapistAgent:
         # Construct the complete prompt
         prompt = self._construct_prompt(context, framework_prompt, state)
         
-        try:
-            # Generate response using Groq
-            completion = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": message.content}
-                ],
-                temperature=0.7,
-                max_tokens=300
-            )
-            
-            # Process and enhance the response
-            processed_response = self._process_response(
-                completion.choices[0].message.content,
-                state
-            )
-            
-            return Message(
-                id="response_" + str(datetime.utcnow().timestamp()),
-                content=processed_response,
-                sender="bot",
-                timestamp=datetime.utcnow().timestamp(),
-                metadata={
-                    "therapeutic_intent": state.therapeutic_state.active_framework.value,
-                    "emotional_target": state.emotional_state.primary_emotion
-                }
-            )
-            
-        except Exception as e:
-            logger.error(f"Error generating response: {e}", exc_info=True)
-            return self._generate_fallback_response(state)
+        return [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": message.content}
+        ]
     
     def _build_context(self, message: Message, state: ConversationState) -> str:
         """Build context string from conversation state."""
@@ -211,8 +320,7 @@ class TherapistAgent:
     
     def _generate_fallback_response(self, state: ConversationState) -> Message:
         """Generate a safe fallback response."""
-        return Message(
-            id="fallback_" + str(datetime.utcnow().timestamp()),
+        return Message.model_construct(
             content="I understand you're going through something important. " \
                    "Could you tell me more about what you're feeling?",
             sender="bot",
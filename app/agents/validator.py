@@ -1,6 +1,7 @@
 from typing import Optional
 import re
 from app.models.message import Message
+from app.utils.tracing import tracer
 
 class ValidatorAgent:
     """Response validation agent."""
@@ -18,6 +19,7 @@ class ValidatorAgent:
             "Please seek professional help"
         ]
     
+    @tracer.traced("validator.validate")
     async def validate(self, message: Message) -> Optional[str]:
         """Validate therapeutic response for safety and appropriateness."""
         content = message.content.lower()
@@ -0,0 +1,239 @@
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from app.config.settings import get_settings
+from .scoring import Session, init_worker, score_chunk
+
+logger = logging.getLogger("app.analyzer")
+
+CHECKPOINT = "checkpoint.jsonl"
+MESSAGES = "messages.jsonl"
+SESSIONS = "sessions.jsonl"
+
+def _dumps(obj: Any) -> bytes:
+    return (json.dumps(obj, separators=(",", ":"), default=str) + "\n").encode()
+
+def _check_message(message: Any) -> Optional[str]:
+    """Why ``message`` can't be scored, or None when it can."""
+    if not isinstance(message, dict):
+        return "message is not an object"
+    content = message.get("content")
+    if content is not None and not isinstance(content, str):
+        return "content is not a string"
+    return None
+
+def _check_record(record: Any) -> Optional[str]:
+    """Why a parsed line isn't a session or message record, or None when it is."""
+    if not isinstance(record, dict):
+        return "not an object"
+    if "messages" not in record:
+        return _check_message(record)
+    if not isinstance(record["messages"], list):
+        return "messages is not a list"
+    for message in record["messages"]:
+        problem = _check_message(message)
+        if problem is not None:
+            return problem
+    return None
+
+def read_sessions(path: str, stats: Dict[str, int]) -> Iterator[Session]:
+    """
+    Stream sessions from a JSONL transcript archive (``.gz`` allowed).
+
+    A line is either a whole session, ``{"session_id", "messages": [...]}``,
+    or one message, ``{"session_id", "content", "sender"?, "timestamp"?}``.
+    Message lines of a session must be contiguous; a message line without
+    a ``session_id`` is a session of its own. Lines that aren't valid JSON
+    or don't have that shape are skipped and counted in ``skipped_lines``.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    current_id: Optional[str] = None
+    current: List[Dict[str, Any]] = []
+    with opener(path, "rt", encoding="utf-8") as fp:
+        for line_no, line in enumerate(fp, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                problem = _check_record(record)
+                if problem is not None:
+                    raise ValueError(problem)
+            except ValueError as e:
+                stats["skipped_lines"] += 1
+                logger.warning(f"Skipping line {line_no}: {e}")
+                continue
+
+            session_id = record.get("session_id")
+            session_id = str(session_id) if session_id is not None else f"line-{line_no}"
+            if "messages" in record or session_id != current_id:
+                if current:
+                    yield current_id, current
+                current_id, current = session_id, []
+            if "messages" in record:
+                yield session_id, record["messages"]
+                current_id = None
+            else:
+                current.append(record)
+    if current:
+        yield current_id, current
+
+def chunked(sessions: Iterable[Session], size: int) -> Iterator[Tuple[int, List[Session]]]:
+    """Number consecutive groups of ``size`` sessions; the numbering is stable across runs."""
+    chunk: List[Session] = []
+    chunk_id = 0
+    for session in sessions:
+        chunk.append(session)
+        if len(chunk) >= size:
+            yield chunk_id, chunk
+            chunk_id, chunk = chunk_id + 1, []
+    if chunk:
+        yield chunk_id, chunk
+
+class ResultWriter:
+    """
+    Append chunk results to the output files and checkpoint each chunk.
+
+    The checkpoint records, per finished chunk, the output file sizes after
+    it was written. Resuming truncates the outputs back to the last
+    checkpoint, dropping any partly written chunk, and skips finished chunks.
+    """
+
+    def __init__(self, output: Path, header: Dict[str, Any], resume: bool):
+        self.output = output
+        self.done: Set[int] = set()
+        output.mkdir(parents=True, exist_ok=True)
+        checkpoint = output / CHECKPOINT
+        sizes = {MESSAGES: 0, SESSIONS: 0}
+
+        if checkpoint.exists():
+            if not resume:
+                raise FileExistsError(f"{output} already holds results; pass --resume to continue them")
+            with open(checkpoint) as fp:
+                lines = [json.loads(line) for line in fp if line.strip()]
+            if lines and lines[0] != header:
+                raise ValueError(f"{output} was started with different settings: {lines[0]}")
+            for entry in lines[1:]:
+                self.done.add(entry["chunk"])
+                sizes = {MESSAGES: entry["messages_bytes"], SESSIONS: entry["sessions_bytes"]}
+        else:
+            with open(checkpoint, "w") as fp:
+                fp.write(json.dumps(header) + "\n")
+
+        self._files: Dict[str, IO[bytes]] = {}
+        for name, size in sizes.items():
+            fp = open(output / name, "ab")
+            fp.truncate(size)
+            fp.seek(size)
+            self._files[name] = fp
+        self._checkpoint = open(checkpoint, "a")
+
+    def write(self, chunk_id: int, messages: List[Dict[str, Any]], sessions: List[Dict[str, Any]]):
+        for name, rows in ((MESSAGES, messages), (SESSIONS, sessions)):
+            fp = self._files[name]
+            fp.write(b"".join(_dumps(row) for row in rows))
+            fp.flush()
+            os.fsync(fp.fileno())
+        self._checkpoint.write(json.dumps({
+            "chunk": chunk_id,
+            "messages_bytes": self._files[MESSAGES].tell(),
+            "sessions_bytes": self._files[SESSIONS].tell()
+        }) + "\n")
+        self._checkpoint.flush()
+        os.fsync(self._checkpoint.fileno())
+        self.done.add(chunk_id)
+
+    def close(self):
+        for fp in self._files.values():
+            fp.close()
+        self._checkpoint.close()
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    header = {"input": os.path.abspath(args.input), "chunk_size": args.chunk_size}
+    writer = ResultWriter(Path(args.output), header, args.resume)
+    stats = {"skipped_lines": 0}
+    totals = {"chunks": 0, "sessions": 0, "messages": 0, "resumed_chunks": len(writer.done)}
+    threshold = get_settings().CRISIS_THRESHOLD
+    start = last_report = time.perf_counter()
+
+    def record(result: Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]]]):
+        nonlocal last_report
+        chunk_id, messages, sessions = result
+        writer.write(chunk_id, messages, sessions)
+        totals["chunks"] += 1
+        totals["sessions"] += len(sessions)
+        totals["messages"] += len(messages)
+        if time.perf_counter() - last_report >= 10:
+            last_report = time.perf_counter()
+            rate = totals["messages"] / (last_report - start)
+            logger.info(f"{totals['sessions']} sessions, {totals['messages']} messages ({rate:.0f}/s)")
+
+    chunks = (
+        (chunk_id, sessions)
+        for chunk_id, sessions in chunked(read_sessions(args.input, stats), args.chunk_size)
+        if chunk_id not in writer.done
+    )
+    try:
+        if args.workers == 0:
+            init_worker()
+            for chunk_id, sessions in chunks:
+                record(score_chunk(chunk_id, sessions, threshold))
+        else:
+            # Keep a bounded number of chunks in flight so memory stays flat
+            max_in_flight = args.workers * 2
+            with ProcessPoolExecutor(args.workers, initializer=init_worker) as pool:
+                in_flight: Set[Future] = set()
+                for chunk_id, sessions in chunks:
+                    if len(in_flight) >= max_in_flight:
+                        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            record(future.result())
+                    in_flight.add(pool.submit(score_chunk, chunk_id, sessions, threshold))
+                for future in wait(in_flight).done:
+                    record(future.result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        **totals,
+        "skipped_lines": stats["skipped_lines"],
+        "elapsed_s": round(elapsed, 3),
+        "messages_per_s": round(totals["messages"] / elapsed, 1) if elapsed else None,
+        "output": str(writer.output)
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.analyzer",
+        description="Score JSONL conversation transcripts with the assessment and safety agents"
+    )
+    parser.add_argument("input", help="Transcripts as JSON lines (.gz allowed)")
+    parser.add_argument("output", help="Directory for messages.jsonl, sessions.jsonl and the checkpoint")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes; 0 scores in this process")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Sessions per work unit")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run in OUTPUT")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    # Per-call agent logging would swamp the progress lines
+    logging.getLogger("app.agents").setLevel(logging.WARNING)
+
+    try:
+        summary = run(args)
+    except (FileExistsError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(json.dumps(summary, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from app.agents.assessor import AssessmentAgent
+    from app.agents.safety import SafetyAgent
+
+# One input session: its id and the transcript's messages, in order
+Session = Tuple[str, List[Dict[str, Any]]]
+
+# Agents of this worker process, created by init_worker
+_assessor: Optional["AssessmentAgent"] = None
+_safety: Optional["SafetyAgent"] = None
+
+def init_worker():
+    """Pool initializer: build the agents and load the sentiment lexicon once per process."""
+    global _assessor, _safety
+    from app.agents.assessor import AssessmentAgent, sentiment
+    from app.agents.safety import SafetyAgent
+
+    _assessor = AssessmentAgent()
+    _safety = SafetyAgent()
+    sentiment("Warming up the sentiment lexicon.")
+
+def score_chunk(
+    chunk_id: int,
+    sessions: List[Session],
+    crisis_threshold: float
+) -> Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Score a chunk of sessions with the live assessment and safety logic.
+
+    Each distinct text in the chunk is scored once, in its ``normalize_text``
+    form as on the live path. User messages get the ``AssessmentAgent``
+    emotion and risk, and the ``SafetyAgent`` keyword risk; other senders
+    only contribute history. As in ``CoordinatorAgent``, which adds a
+    message to the history before analyzing it, the history risk covers
+    the message itself and the two before it.
+
+    Returns:
+        The chunk id, per-message results and per-session results
+    """
+    if _assessor is None:
+        init_worker()
+    from app.agents.assessor import normalize_text
+
+    texts: Dict[str, Any] = {}
+    message_results = []
+    session_results = []
+    for session_id, messages in sessions:
+        polarities: List[float] = []
+        summary = _SessionSummary(session_id)
+        for index, message in enumerate(messages):
+            content = message.get("content") or ""
+            assessment = texts.get(content)
+            if assessment is None:
+                assessment = texts[content] = _assessor.assess_text(normalize_text(content))
+            emotion = assessment.emotion
+            polarities.append(emotion.valence)
+            del polarities[:-3]
+
+            if message.get("sender", "user") == "user":
+                risk = min(1.0, max(assessment.risk_score, _assessor.history_risk(polarities)))
+                safety_risk, safety_indicators = _safety.scan_text(content)
+                result = {
+                    "session_id": session_id,
+                    "index": index,
+                    "timestamp": message.get("timestamp"),
+                    "primary_emotion": emotion.primary_emotion,
+                    "intensity": emotion.intensity,
+                    "valence": emotion.valence,
+                    "arousal": emotion.arousal,
+                    "risk_level": risk,
+                    "crisis_indicators": list(assessment.crisis_indicators),
+                    "safety_risk": safety_risk,
+                    "safety_indicators": safety_indicators,
+                    "crisis": max(risk, safety_risk) >= crisis_threshold
+                }
+                message_results.append(result)
+                summary.add(result)
+        summary.messages = len(messages)
+        session_results.append(summary.as_dict())
+    return chunk_id, message_results, session_results
+
+class _SessionSummary:
+    """Running per-session aggregates over the scored user messages."""
+
+    __slots__ = ("session_id", "messages", "user_messages", "valence_total", "max_risk",
+                 "crisis_turns", "first_crisis_index", "emotions")
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.messages = 0
+        self.user_messages = 0
+        self.valence_total = 0.0
+        self.max_risk = 0.0
+        self.crisis_turns = 0
+        self.first_crisis_index: Optional[int] = None
+        self.emotions: Dict[str, int] = {}
+
+    def add(self, result: Dict[str, Any]):
+        self.user_messages += 1
+        self.valence_total += result["valence"]
+        self.max_risk = max(self.max_risk, result["risk_level"], result["safety_risk"])
+        if result["crisis"]:
+            self.crisis_turns += 1
+            if self.first_crisis_index is None:
+                self.first_crisis_index = result["index"]
+        emotion = result["primary_emotion"]
+        self.emotions[emotion] = self.emotions.get(emotion, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "messages": self.messages,
+            "user_messages": self.user_messages,
+            "mean_valence": self.valence_total / self.user_messages if self.user_messages else None,
+            "max_risk": self.max_risk,
+            "crisis_turns": self.crisis_turns,
+            "first_crisis_index": self.first_crisis_index,
+            "emotions": self.emotions
+        }
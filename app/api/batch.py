@@ -0,0 +1,117 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import logging
+from datetime import datetime
+from ..graphs.therapeutic_flow import TherapeuticFlow
+from ..models.message import Message
+from ..utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+class BatchProcessor:
+    """Bulk message processing for offline tooling (analytics, QA)."""
+
+    def __init__(
+        self,
+        flow: TherapeuticFlow,
+        max_concurrency: int = 8,
+        max_items: int = 5000
+    ):
+        self.flow = flow
+        self.max_concurrency = max_concurrency
+        self.max_items = max_items
+
+    async def run(self, items: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process session-tagged messages and yield one result per item as it completes.
+
+        Items sharing a ``session_id`` run in order against one ephemeral
+        conversation state; different sessions run concurrently, with at most
+        ``max_concurrency`` turns in flight. A failing item produces an
+        ``error`` result and never aborts the rest of the batch. The last
+        record is a summary.
+
+        Args:
+            items: Dicts with ``content`` and optional ``session_id`` and ``metadata``
+        """
+        results: asyncio.Queue = asyncio.Queue()
+        messages: List[Optional[Message]] = []
+        sessions: Dict[str, List[int]] = {}
+        errors = 0
+
+        for index, item in enumerate(items):
+            session_id = item.get("session_id") if isinstance(item, dict) else None
+            try:
+                messages.append(self._build_message(item))
+            except Exception as e:
+                messages.append(None)
+                errors += 1
+                yield self._error(index, session_id, f"Invalid message: {e}")
+                continue
+            # Untagged messages are independent single-turn sessions
+            key = str(session_id) if session_id is not None else f"_item_{index}"
+            sessions.setdefault(key, []).append(index)
+
+        # Message-level assessment for the whole batch in one pass, through
+        # the assessment cache and executor
+        valid = [(index, message) for index, message in enumerate(messages) if message]
+        try:
+            assessed = await self.flow.assessor.analyze_batch([message for _, message in valid])
+            text_assessments = {index: result for (index, _), result in zip(valid, assessed)}
+        except Exception as e:
+            logger.error(f"Batch assessment failed, assessing per item: {e}", exc_info=True)
+            text_assessments = {}
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_session(session_id: str, indices: List[int]):
+            state = self.flow.coordinator._initialize_state()
+            for index in indices:
+                tag = items[index].get("session_id")
+                try:
+                    async with semaphore:
+                        with tracer.span("batch.item", trace_id=f"batch:{messages[index].id}", index=index):
+                            result = await self.flow.process(
+                                messages[index],
+                                state,
+                                text_assessments.get(index)
+                            )
+                    state = result["state"] or state
+                    await results.put({
+                        "index": index,
+                        "session_id": tag,
+                        "response": result["response"].model_dump(mode="json"),
+                        "metadata": result["metadata"]
+                    })
+                except Exception as e:
+                    logger.error(f"Error processing batch item {index}: {e}", exc_info=True)
+                    await results.put(self._error(index, tag, f"Error processing message: {e}"))
+
+        tasks = [
+            asyncio.create_task(run_session(session_id, indices))
+            for session_id, indices in sessions.items()
+        ]
+        try:
+            for _ in range(len(valid)):
+                result = await results.get()
+                if "error" in result:
+                    errors += 1
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        yield {"summary": True, "total": len(items), "errors": errors}
+
+    def _build_message(self, item: Dict[str, Any]) -> Message:
+        """Create the user message for a batch item."""
+        return Message(
+            content=item["content"],
+            timestamp=datetime.now().timestamp(),
+            sender="user",
+            metadata=item.get("metadata", {})
+        )
+
+    def _error(self, index: int, session_id: Any, detail: str) -> Dict[str, Any]:
+        return {"index": index, "session_id": session_id, "error": detail}
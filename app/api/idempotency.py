@@ -0,0 +1,118 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+from functools import partial
+import asyncio
+import hashlib
+import json
+import time
+
+class IdempotencyConflict(ValueError):
+    """An idempotency key was reused with a different request body."""
+
+def fingerprint(payload: Any) -> str:
+    """Stable hash of a JSON request body."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class IdempotencyCache:
+    """
+    Completed-response cache keyed by ``Idempotency-Key``.
+
+    A key's computation runs at most once: concurrent duplicates await the
+    same in-flight task, and later retries within ``ttl`` seconds get the
+    cached result. Failed computations, and results ``cacheable`` rejects
+    (e.g. a fallback answer), are not cached so the client can retry them.
+    """
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (expires_at, fingerprint, result), oldest first
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Tuple[str, asyncio.Task]] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    async def run(
+        self,
+        key: str,
+        request_fingerprint: str,
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Return the result for ``key``, computing it only if nobody has yet.
+
+        A result for which ``cacheable`` returns False still goes to the
+        callers waiting on it, but the next retry computes it again.
+
+        Returns:
+            Tuple of (result, replayed) where ``replayed`` is True when the
+            result came from the cache or another in-flight request
+
+        Raises:
+            IdempotencyConflict: the key was used with a different body
+        """
+        self._evict(time.monotonic())
+
+        cached = self._entries.get(key)
+        if cached is not None:
+            _, cached_fingerprint, result = cached
+            self._check(cached_fingerprint, request_fingerprint)
+            self.hits += 1
+            return result, True
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            inflight_fingerprint, task = inflight
+            self._check(inflight_fingerprint, request_fingerprint)
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+
+        # Run detached so a disconnecting first caller doesn't cancel the duplicates
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = (request_fingerprint, task)
+        task.add_done_callback(partial(self._complete, key, request_fingerprint, cacheable))
+        self.misses += 1
+        return await asyncio.shield(task), False
+
+    def stats(self) -> Dict[str, int]:
+        """Cache size and hit counters."""
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses
+        }
+
+    def _check(self, expected: str, actual: str):
+        if expected != actual:
+            raise IdempotencyConflict("Idempotency key was already used with a different request body")
+
+    def _complete(
+        self,
+        key: str,
+        request_fingerprint: str,
+        cacheable: Optional[Callable[[Any], bool]],
+        task: asyncio.Task
+    ):
+        """Move a finished computation from in-flight to the cache."""
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if cacheable is not None and not cacheable(task.result()):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, request_fingerprint, task.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _evict(self, now: float):
+        """Drop expired entries; insertion order is expiry order."""
+        while self._entries:
+            key, (expires_at, _, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[key]
@@ -1,27 +1,119 @@
-from fastapi import APIRouter, WebSocket, HTTPException, Depends
+from fastapi import APIRouter, WebSocket, HTTPException, Depends, Header, Query, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.security import APIKeyHeader
-from typing import Dict, Optional
-import uuid
+from typing import AsyncIterator, Dict, Optional
+from contextlib import nullcontext
+import logging
+import secrets
 from datetime import datetime
+from .batch import BatchProcessor
+from .idempotency import IdempotencyCache, IdempotencyConflict, fingerprint
+from .serialization import dumps, encode_sse
+from .warmup import Warmup
 from .websocket import ChatWebSocket
 from app.models.message import Message
-from app.config.settings import Settings
+from app.models.state import initial_conversation_state
+from app.utils.startup import startup_report
+from app.utils import metrics
+from app.utils.assessment_cache import get_assessment_cache
+from app.utils.executor import get_assessment_executor
+from app.utils.profiling import ProfileStore, profiling_authorized
+from app.utils.recording import recorder
+from app.utils.tracing import enable_opentelemetry, tracer
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
-chat_handler = ChatWebSocket()
+settings = get_settings()
+
+profile_store = ProfileStore(
+    capacity=settings.PROFILE_STORE_SIZE,
+    sample_interval=settings.PROFILE_SAMPLE_INTERVAL
+)
+chat_handler = ChatWebSocket(
+    max_pending=settings.WS_MAX_PENDING,
+    cancel_stale=settings.WS_CANCEL_STALE,
+    reap_interval=settings.WS_REAP_INTERVAL,
+    idle_timeout=settings.WS_IDLE_TIMEOUT,
+    max_coalesce_ms=settings.WS_MAX_COALESCE_MS,
+    profile_store=profile_store
+)
+batch_processor = BatchProcessor(
+    chat_handler.flow,
+    max_concurrency=settings.BATCH_MAX_CONCURRENCY,
+    max_items=settings.BATCH_MAX_ITEMS
+)
+idempotency_cache = IdempotencyCache(ttl=settings.IDEMPOTENCY_TTL)
+warmup = Warmup(chat_handler)
+
+tracer.resize(settings.TRACE_BUFFER_SIZE)
+if settings.TRACE_OTEL:
+    enable_opentelemetry()
+if settings.RECORD_PATH:
+    recorder.open(settings.RECORD_PATH, settings.RECORD_SAMPLE_RATE)
+
+# Pipeline metrics come from tracing spans; connection gauges are read at scrape time
+metrics.install()
+metrics.registry.gauge(
+    "chat_websocket_connections",
+    "Open WebSocket connections"
+).labels().set_function(lambda: chat_handler.stats()["active_sockets"])
+metrics.registry.gauge(
+    "chat_session_states",
+    "Conversation states held for WebSocket clients"
+).labels().set_function(lambda: len(chat_handler.manager.session_states))
+metrics.registry.gauge(
+    "chat_queued_messages",
+    "Messages waiting in WebSocket session inboxes"
+).labels().set_function(lambda: chat_handler.stats()["queued_messages"])
+metrics.registry.gauge(
+    "assessment_executor_in_flight",
+    "Assessment calls running in or queued for the executor's workers"
+).labels().set_function(lambda: get_assessment_executor().in_flight)
+metrics.registry.gauge(
+    "assessment_cache_entries",
+    "Message-level assessments held in the cache"
+).labels().set_function(lambda: len(get_assessment_cache()))
+metrics.registry.gauge(
+    "assessment_cache_hit_ratio",
+    "Share of message texts served from the assessment cache since startup"
+).labels().set_function(lambda: get_assessment_cache().hit_ratio())
 
 # API key security
 api_key_header = APIKeyHeader(name="X-API-Key")
 
 async def verify_api_key(api_key: str = Depends(api_key_header)):
     """Verify API key."""
-    if api_key != Settings().API_KEY:
+    expected = get_settings().API_KEY
+    if not expected:
+        raise HTTPException(
+            status_code=503,
+            detail="API key authentication is not configured"
+        )
+    # Compare bytes: compare_digest rejects non-ASCII str, and headers are
+    # decoded as latin-1, so any byte >= 0x80 would otherwise be a 500
+    if not secrets.compare_digest(api_key.encode(), expected.encode()):
         raise HTTPException(
             status_code=403,
             detail="Invalid API key"
         )
     return api_key
 
+def _build_user_message(payload: dict) -> Message:
+    """Create the user message for a REST request body."""
+    return Message(
+        content=payload['content'],
+        timestamp=datetime.now().timestamp(),
+        sender="user",
+        metadata=payload.get('metadata', {})
+    )
+
+def _completed_turn(result: Dict) -> bool:
+    """Whether a /message result may be replayed: not an error or fallback answer."""
+    metadata = result.get("metadata") or {}
+    return not (metadata.get("error") or metadata.get("fallback"))
+
 @router.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
     """WebSocket endpoint for chat communication."""
@@ -30,34 +122,212 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
 @router.post("/message", response_model=Dict)
 async def process_message(
     message: dict,
-    api_key: str = Depends(verify_api_key)
+    response: Response,
+    api_key: str = Depends(verify_api_key),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    debug_profile: Optional[str] = Header(None, alias="X-Debug-Profile")
 ):
-    """REST endpoint for processing messages (alternative to WebSocket)."""
+    """
+    REST endpoint for processing messages (alternative to WebSocket).
+    
+    Each request is a conversation of its own; no state carries over
+    between REST calls or leaks into WebSocket sessions.
+    
+    With an ``Idempotency-Key`` header the turn runs at most once per key:
+    retries and concurrent duplicates get the original response (marked
+    with ``Idempotent-Replayed: true``) instead of a new generation. Error
+    and fallback answers are not kept, so a retry after a provider failure
+    runs the turn again.
+    
+    With a valid ``X-Debug-Profile`` token the turn runs under the profiler
+    and the ``X-Profile-Id`` header names the artifact under ``/debug/profiles``.
+    """
+    if debug_profile is not None:
+        if not profiling_authorized(debug_profile, get_settings().PROFILE_TOKEN):
+            raise HTTPException(status_code=403, detail="Invalid debug profile token")
+    
+    async def compute() -> Dict:
+        try:
+            # Create message object
+            msg = _build_user_message(message)
+            trace_id = f"rest:{msg.id}"
+            response.headers["X-Trace-Id"] = trace_id
+            
+            profile = profile_store.profile(trace_id) if debug_profile is not None else nullcontext()
+            
+            # Process message through therapeutic flow. Each REST request is
+            # its own session, so no state is shared between callers.
+            with profile as profile_id, recorder.turn(trace_id, "rest", msg), tracer.span(
+                "rest.turn", trace_id=trace_id
+            ):
+                result = await chat_handler.flow.process(msg, initial_conversation_state())
+            if profile_id:
+                response.headers["X-Profile-Id"] = profile_id
+            
+            return {
+                "response": result['response'].model_dump(),
+                "metadata": result['metadata']
+            }
+            
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error processing message: {str(e)}"
+            )
+    
+    if idempotency_key is None:
+        return await compute()
+    
     try:
-        # Create message object
-        msg = Message(
-            id=str(uuid.uuid4()),
-            content=message['content'],
-            timestamp=datetime.now().timestamp(),
-            sender="user",
-            metadata=message.get('metadata', {})
+        result, replayed = await idempotency_cache.run(
+            f"{api_key}:{idempotency_key}",
+            fingerprint(message),
+            compute,
+            _completed_turn
         )
-        
-        # Process message through therapeutic flow
-        result = await chat_handler.flow.process(msg)
-        
-        return {
-            "response": result['response'].dict(),
-            "metadata": result['metadata']
-        }
-        
-    except Exception as e:
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+@router.post("/message/stream")
+async def stream_message(
+    message: dict,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Streaming variant of ``/message`` using Server-Sent Events.
+    
+    Emits ``assessment``, then ``delta`` events carrying generated text and
+    a final ``message`` event with the validated response (or ``error``).
+    """
+    if 'content' not in message:
+        raise HTTPException(status_code=422, detail="Message content is required")
+    msg = _build_user_message(message)
+    trace_id = f"rest:{msg.id}"
+    
+    async def events() -> AsyncIterator[str]:
+        try:
+            # Like /message, every request runs against a state of its own
+            with recorder.turn(trace_id, "stream", msg), tracer.span("rest.stream", trace_id=trace_id):
+                async for event, data in chat_handler.flow.stream(msg, initial_conversation_state()):
+                    yield encode_sse(event, data)
+        except Exception as e:
+            logger.error(f"Error streaming message: {e}", exc_info=True)
+            yield encode_sse("error", {"detail": f"Error processing message: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Trace-Id": trace_id}
+    )
+
+@router.post("/message/batch")
+async def process_batch(
+    batch: dict,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Process many messages in one request, streaming results as NDJSON.
+    
+    The body is ``{"messages": [{"session_id": ..., "content": ...}, ...]}``.
+    Each output line carries the item ``index``; failures are reported per
+    item and the final line is a summary.
+    """
+    items = batch.get('messages')
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=422, detail="'messages' must be a non-empty list")
+    if len(items) > batch_processor.max_items:
         raise HTTPException(
-            status_code=500,
-            detail=f"Error processing message: {str(e)}"
+            status_code=413,
+            detail=f"Batch exceeds {batch_processor.max_items} messages"
         )
+    
+    async def lines() -> AsyncIterator[str]:
+        async for result in batch_processor.run(items):
+            yield dumps(result) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get("/connections", response_model=Dict)
+async def connection_stats(api_key: str = Depends(verify_api_key)):
+    """Live WebSocket connection counts and idle-reaper statistics."""
+    return chat_handler.stats()
+
+@router.get("/startup", response_model=Dict)
+async def startup_stats(api_key: str = Depends(verify_api_key)):
+    """Startup phase timings and which heavy dependencies are loaded."""
+    return startup_report.as_dict()
+
+@router.get("/debug/traces", response_model=Dict)
+async def recent_traces(
+    trace_id: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=5000),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Recently finished spans, oldest first.
+    
+    Filter by ``trace_id`` (the ``X-Trace-Id`` response header, or
+    ``<client_id>:<message id>`` for WebSocket turns) to see where one
+    turn spent its time.
+    """
+    return {"spans": [span.as_dict() for span in tracer.recent(limit, trace_id)]}
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Pipeline latency histograms, counters and connection gauges (Prometheus text format)."""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.registry.content_type)
+
+@router.get("/debug/profiles", response_model=Dict)
+async def list_profiles(api_key: str = Depends(verify_api_key)):
+    """Stored turn profiles, newest first."""
+    return {"profiles": profile_store.list()}
+
+def _get_profile(profile_id: str):
+    artifact = profile_store.get(profile_id)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return artifact
+
+@router.get("/debug/profiles/{profile_id}", response_model=Dict)
+async def profile_summary(profile_id: str, api_key: str = Depends(verify_api_key)):
+    """Profile metadata and the top functions by cumulative time."""
+    artifact = _get_profile(profile_id)
+    return {**artifact.as_dict(), "summary": artifact.summary()}
+
+@router.get("/debug/profiles/{profile_id}/pstats")
+async def download_pstats(profile_id: str, api_key: str = Depends(verify_api_key)):
+    """cProfile stats, loadable with ``pstats.Stats(path)`` or snakeviz."""
+    artifact = _get_profile(profile_id)
+    return Response(
+        artifact.pstats,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{artifact.id}.pstats"'}
+    )
+
+@router.get("/debug/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+async def download_collapsed(profile_id: str, api_key: str = Depends(verify_api_key)):
+    """Sampled stacks in collapsed format, for flamegraph.pl or speedscope."""
+    return PlainTextResponse(_get_profile(profile_id).collapsed)
 
 @router.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
\ No newline at end of file
+    """Liveness check: the process is up and serving requests."""
+    return {"status": "healthy"}
+
+@router.get("/ready", response_model=Dict)
+async def readiness_check(response: Response):
+    """
+    Readiness check for load balancers and autoscalers.
+    
+    Returns 503 until the startup warmup has finished, while either LLM
+    provider circuit (regular or crisis path) is open, or when session
+    inboxes are nearly full.
+    """
+    report = warmup.readiness(get_settings().READY_MAX_QUEUE_SATURATION)
+    if not report["ready"]:
+        response.status_code = 503
+    return report
\ No newline at end of file
@@ -0,0 +1,210 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+import asyncio
+import json
+import logging
+from fastapi import WebSocket
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional: binary frames are only offered when installed
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+Payload = Union[BaseModel, Dict[str, Any]]
+Frame = Union[str, bytes]
+
+def dumps(obj: Any) -> str:
+    """Encode a JSON value compactly, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode a JSON document, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def encode_sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Events record."""
+    return f"event: {event}\ndata: {dumps(data)}\n\n"
+
+# Frames whose content never changes; each codec encodes them once at startup
+STATIC_FRAMES: Dict[str, Dict[str, Any]] = {
+    "typing_on": {"type": "typing_indicator", "typing": True},
+    "typing_off": {"type": "typing_indicator", "typing": False},
+    "pong": {"type": "pong"}
+}
+
+class JsonCodec:
+    """Compact JSON text frames (the default encoding)."""
+
+    name = "json"
+
+    def __init__(self):
+        self.static = {name: self.encode(payload) for name, payload in STATIC_FRAMES.items()}
+
+    def encode(self, payload: Payload) -> Frame:
+        """Encode a model or plain dict into a single frame."""
+        if isinstance(payload, BaseModel):
+            return payload.model_dump_json()
+        return dumps(payload)
+
+    def decode(self, frame: Frame) -> Dict[str, Any]:
+        """Decode an inbound frame."""
+        return loads(frame)
+
+    def template(self, message: BaseModel) -> Callable[[str, float], Frame]:
+        """
+        Pre-encode a message whose body never changes.
+
+        Returns:
+            Function rendering the frame for a given message id and timestamp
+        """
+        body = message.model_dump_json(exclude={"id", "timestamp"})
+        rest = body[1:] if body == "{}" else "," + body[1:]
+
+        def render(message_id: str, timestamp: float) -> Frame:
+            return '{"id":' + dumps(message_id) + ',"timestamp":' + repr(float(timestamp)) + rest
+
+        return render
+
+    def encode_batch(self, frames: List[Frame]) -> Frame:
+        """Wrap already-encoded frames into one ``batch`` frame without re-encoding."""
+        return '{"type":"batch","frames":[' + ",".join(frames) + "]}"
+
+    async def send(self, websocket: WebSocket, frame: Frame):
+        """Write an encoded frame to the socket."""
+        await websocket.send_text(frame)
+
+    async def receive(self, websocket: WebSocket) -> Dict[str, Any]:
+        """Read and decode the next inbound frame."""
+        return self.decode(await websocket.receive_text())
+
+class MsgpackCodec(JsonCodec):
+    """Binary MessagePack frames, negotiated via the ``msgpack`` subprotocol."""
+
+    name = "msgpack"
+
+    def encode(self, payload: Payload) -> Frame:
+        if isinstance(payload, BaseModel):
+            payload = payload.model_dump(mode="json")
+        return msgpack.packb(payload)
+
+    def decode(self, frame: Frame) -> Dict[str, Any]:
+        return msgpack.unpackb(frame)
+
+    def template(self, message: BaseModel) -> Callable[[str, float], Frame]:
+        body = message.model_dump(mode="json", exclude={"id", "timestamp"})
+        header = msgpack.Packer().pack_map_header(len(body) + 2)
+        rest = b"".join(msgpack.packb(k) + msgpack.packb(v) for k, v in body.items())
+        id_key, timestamp_key = msgpack.packb("id"), msgpack.packb("timestamp")
+
+        def render(message_id: str, timestamp: float) -> Frame:
+            return (
+                header
+                + id_key + msgpack.packb(message_id)
+                + timestamp_key + msgpack.packb(float(timestamp))
+                + rest
+            )
+
+        return render
+
+    def encode_batch(self, frames: List[Frame]) -> Frame:
+        return (
+            msgpack.Packer().pack_map_header(2)
+            + msgpack.packb("type") + msgpack.packb("batch")
+            + msgpack.packb("frames") + msgpack.Packer().pack_array_header(len(frames))
+            + b"".join(frames)
+        )
+
+    async def send(self, websocket: WebSocket, frame: Frame):
+        await websocket.send_bytes(frame)
+
+    async def receive(self, websocket: WebSocket) -> Dict[str, Any]:
+        return self.decode(await websocket.receive_bytes())
+
+class FrameBatcher:
+    """
+    Coalesce adjacent small frames sent to one socket within a short window.
+
+    Frames queued with ``flush=False`` are held for up to ``window`` seconds
+    and sent together as a single ``batch`` frame; a ``flush=True`` frame
+    (e.g. a final response) goes out immediately with anything pending.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        codec: JsonCodec,
+        window: float,
+        max_frames: int = 32,
+        max_bytes: int = 16384
+    ):
+        self.websocket = websocket
+        self.codec = codec
+        self.window = window
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self._pending: List[Frame] = []
+        self._pending_bytes = 0
+        self._timer: Optional[asyncio.Task] = None
+
+    async def send(self, frame: Frame, flush: bool = False):
+        """Queue a frame, sending immediately when flushing or over budget."""
+        self._pending.append(frame)
+        self._pending_bytes += len(frame)
+        if flush or len(self._pending) >= self.max_frames or self._pending_bytes >= self.max_bytes:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def flush(self):
+        """Send everything pending as one frame."""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+        frames, self._pending, self._pending_bytes = self._pending, [], 0
+        if not frames:
+            return
+        frame = frames[0] if len(frames) == 1 else self.codec.encode_batch(frames)
+        await self.codec.send(self.websocket, frame)
+
+    def close(self):
+        """Drop pending frames and stop the flush timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending, self._pending_bytes = [], 0
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.debug(f"Dropped coalesced frames for a closed socket: {e}")
+
+JSON_CODEC = JsonCodec()
+CODECS: Dict[str, JsonCodec] = {JSON_CODEC.name: JSON_CODEC}
+if msgpack is not None:
+    CODECS[MsgpackCodec.name] = MsgpackCodec()
+
+def negotiate_codec(requested: Iterable[str]) -> Optional[JsonCodec]:
+    """
+    Pick the first supported codec from the client's requested subprotocols.
+
+    Returns:
+        The matching codec, or None when none of the requested ones is known
+    """
+    for name in requested:
+        if name in CODECS:
+            return CODECS[name]
+    return None
@@ -0,0 +1,139 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+from types import SimpleNamespace
+import asyncio
+import logging
+import time
+from ..agents.assessor import sentiment
+from ..config.settings import get_settings
+from ..graphs.therapeutic_flow import TherapeuticFlow
+from ..models.message import Message
+from ..utils import metrics
+from ..utils.executor import get_assessment_executor
+from ..utils.startup import startup_report
+from ..utils.tracing import tracer
+from .websocket import ChatWebSocket
+
+logger = logging.getLogger(__name__)
+
+WARMUP_REPLY = (
+    "Thank you for sharing that with me. It sounds like a lot to carry; "
+    "what feels most important to talk about right now?"
+)
+
+class FakeProvider:
+    """Stand-in for the async Groq client that answers every completion with canned text."""
+
+    def __init__(self, content: str = WARMUP_REPLY):
+        self.content = content
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))],
+            usage=SimpleNamespace(total_tokens=0)
+        )
+
+class Warmup:
+    """
+    Startup warmup for a chat handler, and the readiness report built on it.
+
+    Loads the sentiment lexicon, starts the assessment executor's workers,
+    compiles the flow graph, builds the provider client object and runs one
+    synthetic turn against ``FakeProvider`` so the first real user doesn't
+    pay for any of it. No request is made to the real provider, so its
+    first connection is still opened by the first real turn. The synthetic
+    turn uses its own flow instance, so live sessions and the real client
+    are never touched, and its spans are kept out of the metrics.
+    """
+
+    def __init__(self, handler: ChatWebSocket):
+        self.handler = handler
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> Optional[asyncio.Task]:
+        """Run the warmup in the background, unless disabled by WARMUP_ENABLED (idempotent)."""
+        if not get_settings().WARMUP_ENABLED:
+            self.status = "skipped"
+            return None
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def run(self):
+        self.status = "running"
+        start = time.perf_counter()
+        flow = self.handler.flow
+        try:
+            with startup_report.phase("warmup_lexicons"):
+                await asyncio.to_thread(sentiment, "Warming up the sentiment lexicon.")
+            with startup_report.phase("warmup_assessment_executor"):
+                await get_assessment_executor().start()
+            with startup_report.phase("warmup_graph"):
+                await asyncio.to_thread(lambda: flow.graph)
+            with startup_report.phase("warmup_provider_client"):
+                await asyncio.to_thread(lambda: flow.therapist.async_client)
+            with startup_report.phase("warmup_synthetic_turn"):
+                await self._synthetic_turn()
+            self.status = "ready"
+        except Exception as e:
+            logger.error(f"Warmup failed: {e}", exc_info=True)
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            self.duration = time.perf_counter() - start
+            startup_report.log()
+
+    async def _synthetic_turn(self):
+        """Run one turn end to end through a private flow and the fake provider."""
+        probe = await asyncio.to_thread(TherapeuticFlow)
+        probe.therapist.async_client = FakeProvider()
+        message = Message(
+            content="I've been feeling a bit stressed about work this week.",
+            timestamp=datetime.now().timestamp(),
+            sender="user",
+            metadata={"warmup": True}
+        )
+        with metrics.suppressed(), tracer.span("warmup.turn", trace_id="warmup"):
+            result = await probe.process(message, probe.coordinator._initialize_state())
+        if result["metadata"].get("error"):
+            raise RuntimeError(f"Synthetic turn failed: {result['response'].content}")
+
+    def readiness(self, max_queue_saturation: float) -> Dict:
+        """
+        Whether this worker should receive traffic, with the reasons.
+
+        Ready means warmed up, neither provider circuit open (the flow's
+        therapist, and the coordinator's, which the crisis path uses), and
+        session inboxes below ``max_queue_saturation`` of their capacity.
+        """
+        stats = self.handler.stats()
+        capacity = stats["sessions"] * self.handler.max_pending
+        saturation = stats["queued_messages"] / capacity if capacity else 0.0
+        flow = self.handler.flow
+        provider = flow.therapist.circuit.stats()
+        crisis_provider = flow.coordinator.therapist_agent.circuit.stats()
+
+        return {
+            "ready": (
+                self.status in ("ready", "skipped")
+                and provider["state"] != "open"
+                and crisis_provider["state"] != "open"
+                and saturation < max_queue_saturation
+            ),
+            "warmup": {
+                "status": self.status,
+                "error": self.error,
+                "duration": round(self.duration, 4) if self.duration is not None else None
+            },
+            "provider": provider,
+            "crisis_provider": crisis_provider,
+            "queue": {
+                "queued_messages": stats["queued_messages"],
+                "capacity": capacity,
+                "saturation": round(saturation, 4)
+            }
+        }
@@ -1,114 +1,484 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set, Optional
+from typing import Awaitable, Callable, Dict, List, Set, Optional
+import asyncio
 import json
 import logging
+import time
+from contextlib import nullcontext
 from datetime import datetime
+from ..config.settings import get_settings
 from ..models.message import Message
 from ..graphs.therapeutic_flow import TherapeuticFlow
 from ..models.state import ConversationState
+from ..utils.ids import new_id
+from ..utils.profiling import ProfileStore, profiling_authorized
+from ..utils.recording import recorder
+from ..utils.tracing import tracer
+from .serialization import (
+    CODECS,
+    JSON_CODEC,
+    Frame,
+    FrameBatcher,
+    JsonCodec,
+    Payload,
+    negotiate_codec
+)
 
 logger = logging.getLogger(__name__)
 
+# Body of the greeting sent on connect; id and timestamp are filled per socket
+WELCOME_MESSAGE = Message(
+    id="",
+    content="Hello! I'm here to listen and support you. How are you feeling today?",
+    timestamp=0.0,
+    sender="bot",
+    metadata={"message_type": "welcome"}
+)
+
+ERROR_REPLY = "I apologize, but I'm having trouble processing your message. Could you try rephrasing it?"
+
 class ConnectionManager:
     """Manage WebSocket connections."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        reap_interval: float = 60.0,
+        idle_timeout: float = 1800.0,
+        max_coalesce_ms: int = 100
+    ):
         self.active_connections: Dict[str, WebSocket] = {}
         self.session_states: Dict[str, ConversationState] = {}
+        # Every open socket per client; the newest one receives responses
+        self._sockets: Dict[str, List[WebSocket]] = {}
+        
+        # Negotiated frame codec per socket and pre-encoded message templates
+        self._codecs: Dict[int, JsonCodec] = {}
+        self._templates: Dict[str, Dict[str, Callable[[str, float], Frame]]] = {}
+        
+        # Optional per-socket frame coalescing, requested with ?coalesce_ms=N
+        self.max_coalesce_ms = max_coalesce_ms
+        self._batchers: Dict[int, FrameBatcher] = {}
+        
+        # Idle reaping, keyed by id() of the socket. Liveness is left to the
+        # server's protocol-level pings, which close dead sockets on their own.
+        self.reap_interval = reap_interval
+        self.idle_timeout = idle_timeout
+        self._last_seen: Dict[int, float] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self.reaped_total = 0
+        self.last_reap_at: Optional[float] = None
     
     async def connect(self, websocket: WebSocket, client_id: str):
         """Handle new WebSocket connection."""
-        await websocket.accept()
+        requested = websocket.scope.get("subprotocols") or []
+        codec = negotiate_codec(requested)
+        await websocket.accept(subprotocol=codec.name if codec else None)
+        self._codecs[id(websocket)] = codec or JSON_CODEC
+        self._configure_batching(websocket)
+        self._sockets.setdefault(client_id, []).append(websocket)
         self.active_connections[client_id] = websocket
+        self.touch(websocket)
+        self.start_reaper()
         logger.info(f"Client {client_id} connected")
     
-    def disconnect(self, client_id: str):
-        """Handle WebSocket disconnection."""
+    def disconnect(self, client_id: str, websocket: Optional[WebSocket] = None):
+        """
+        Handle WebSocket disconnection.
+        
+        When ``websocket`` is given and the client still has other sockets
+        open, only that socket is dropped and the session state is kept.
+        """
+        sockets = self._sockets.get(client_id, [])
+        if websocket is not None:
+            # Sockets are Mappings, so compare by identity rather than ==
+            remaining = [s for s in sockets if s is not websocket]
+            if len(remaining) == len(sockets):
+                return  # already released, e.g. by the reaper
+            self._release_socket(websocket)
+            if remaining:
+                self._sockets[client_id] = remaining
+                self.active_connections[client_id] = remaining[-1]
+                logger.info(f"Client {client_id} closed one of {len(sockets)} sockets")
+                return
+        for socket in sockets:
+            self._release_socket(socket)
+        self._sockets.pop(client_id, None)
         if client_id in self.active_connections:
             del self.active_connections[client_id]
         if client_id in self.session_states:
             del self.session_states[client_id]
         logger.info(f"Client {client_id} disconnected")
     
-    async def send_message(self, client_id: str, message: dict):
-        """Send message to specific client."""
-        if client_id in self.active_connections:
-            await self.active_connections[client_id].send_json(message)
+    def _configure_batching(self, websocket: WebSocket):
+        """Enable frame coalescing if the client asked for a window."""
+        try:
+            coalesce_ms = int(websocket.query_params.get("coalesce_ms", 0))
+        except ValueError:
+            coalesce_ms = 0
+        coalesce_ms = min(coalesce_ms, self.max_coalesce_ms)
+        if coalesce_ms > 0:
+            self._batchers[id(websocket)] = FrameBatcher(
+                websocket,
+                self.codec_for(websocket),
+                coalesce_ms / 1000
+            )
+    
+    def _release_socket(self, websocket: WebSocket):
+        """Forget per-socket bookkeeping."""
+        self._last_seen.pop(id(websocket), None)
+        self._codecs.pop(id(websocket), None)
+        batcher = self._batchers.pop(id(websocket), None)
+        if batcher is not None:
+            batcher.close()
+    
+    async def send_frame(self, websocket: WebSocket, frame: Frame, flush: bool = True):
+        """Send a frame directly or through the socket's batcher."""
+        batcher = self._batchers.get(id(websocket))
+        if batcher is not None:
+            await batcher.send(frame, flush=flush)
+        else:
+            await self.codec_for(websocket).send(websocket, frame)
+    
+    def codec_for(self, websocket: WebSocket) -> JsonCodec:
+        """Codec negotiated for a socket (JSON unless the client asked otherwise)."""
+        return self._codecs.get(id(websocket), JSON_CODEC)
+    
+    def register_template(self, name: str, message: Message):
+        """Pre-encode a fixed-body message for every codec."""
+        self._templates[name] = {
+            codec_name: codec.template(message) for codec_name, codec in CODECS.items()
+        }
+    
+    async def send_message(self, client_id: str, message: Payload, flush: bool = True):
+        """
+        Send message to specific client.
+        
+        With ``flush=False`` the frame may be coalesced with adjacent frames
+        on sockets that negotiated a coalescing window.
+        """
+        websocket = self.active_connections.get(client_id)
+        if websocket is not None:
+            await self.send_frame(websocket, self.codec_for(websocket).encode(message), flush)
+    
+    async def send_static(self, client_id: str, name: str, flush: bool = True):
+        """Send a pre-encoded static frame such as ``typing_on``."""
+        websocket = self.active_connections.get(client_id)
+        if websocket is not None:
+            await self.send_frame(websocket, self.codec_for(websocket).static[name], flush)
+    
+    async def send_template(self, client_id: str, name: str, message_id: str, timestamp: float):
+        """Send a registered template rendered with a fresh id and timestamp."""
+        websocket = self.active_connections.get(client_id)
+        if websocket is not None:
+            codec = self.codec_for(websocket)
+            await self.send_frame(websocket, self._templates[name][codec.name](message_id, timestamp))
+    
+    def touch(self, websocket: WebSocket):
+        """Record activity on a socket (any inbound frame)."""
+        self._last_seen[id(websocket)] = time.monotonic()
+    
+    def start_reaper(self):
+        """Start the background reaper task if it is not running."""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_loop())
+    
+    async def stop_reaper(self):
+        """Stop the background reaper task."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+    
+    async def _reap_loop(self):
+        """Reap idle sockets every reap interval."""
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"Error in connection reaper: {e}", exc_info=True)
+    
+    async def reap(self) -> int:
+        """
+        Close sockets that sent nothing for ``idle_timeout``.
+        
+        Returns:
+            Number of sockets reaped
+        """
+        now = time.monotonic()
+        stale = []
+        for client_id, sockets in list(self._sockets.items()):
+            for websocket in list(sockets):
+                idle = now - self._last_seen.get(id(websocket), now)
+                if idle > self.idle_timeout:
+                    stale.append((client_id, websocket))
+        
+        for client_id, websocket in stale:
+            try:
+                await websocket.close(code=1001)
+            except Exception:
+                pass  # socket is already gone
+            self.disconnect(client_id, websocket)
+            logger.info(f"Reaped idle socket for client {client_id}")
+        
+        self.reaped_total += len(stale)
+        self.last_reap_at = time.time()
+        return len(stale)
+    
+    def stats(self) -> Dict:
+        """Connection counts and reaper statistics."""
+        return {
+            "active_clients": len(self._sockets),
+            "active_sockets": sum(len(sockets) for sockets in self._sockets.values()),
+            "session_states": len(self.session_states),
+            "reaped_total": self.reaped_total,
+            "last_reap_at": self.last_reap_at,
+            "reap_interval": self.reap_interval,
+            "idle_timeout": self.idle_timeout,
+            "coalescing_sockets": len(self._batchers)
+        }
+
+class ClientSession:
+    """Serialized turn processing for a single client session."""
+    
+    def __init__(
+        self,
+        client_id: str,
+        handler: Callable[[str, dict, asyncio.Event], Awaitable[None]],
+        max_pending: int = 8,
+        cancel_stale: bool = True
+    ):
+        self.client_id = client_id
+        self.inbox: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.cancel_stale = cancel_stale
+        self.connections = 0
+        self._handler = handler
+        self._current: Optional[asyncio.Task] = None
+        # Set to supersede the in-flight turn; the handler decides what stops
+        self._superseded: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the worker that drains the inbox."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+    
+    def submit(self, data: dict):
+        """
+        Queue a message, superseding a stale in-flight turn if configured.
+        
+        Superseding only signals the turn: it stops generating a response
+        that is now stale, but still finishes assessment and always answers
+        a crisis.
+        """
+        if self.cancel_stale and self._superseded is not None:
+            self._superseded.set()
+        if self.inbox.full():
+            self.inbox.get_nowait()
+            self.inbox.task_done()
+            logger.warning(f"Inbox full for client {self.client_id}, dropped oldest message")
+        self.inbox.put_nowait(data)
+    
+    async def close(self):
+        """Stop the worker and any in-flight turn."""
+        tasks = [task for task in (self._current, self._worker) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _run(self):
+        """Process queued messages one at a time, in arrival order."""
+        while True:
+            data = await self.inbox.get()
+            self._superseded = asyncio.Event()
+            self._current = asyncio.create_task(
+                self._handler(self.client_id, data, self._superseded)
+            )
+            try:
+                # wait() keeps a cancelled turn from cancelling the worker itself
+                await asyncio.wait({self._current})
+            except asyncio.CancelledError:
+                self._current.cancel()
+                raise
+            finally:
+                self.inbox.task_done()
+            
+            if not self._current.cancelled() and self._current.exception():
+                logger.error(
+                    f"Unhandled error in turn for client {self.client_id}",
+                    exc_info=self._current.exception()
+                )
+            self._current = None
+            self._superseded = None
 
 class ChatWebSocket:
     """WebSocket handler for chat communication."""
     
-    def __init__(self):
-        self.manager = ConnectionManager()
+    def __init__(
+        self,
+        max_pending: int = 8,
+        cancel_stale: bool = True,
+        reap_interval: float = 60.0,
+        idle_timeout: float = 1800.0,
+        max_coalesce_ms: int = 100,
+        profile_store: Optional[ProfileStore] = None
+    ):
+        self.manager = ConnectionManager(reap_interval, idle_timeout, max_coalesce_ms)
+        self.manager.register_template("welcome", WELCOME_MESSAGE)
         self.flow = TherapeuticFlow()
+        self.sessions: Dict[str, ClientSession] = {}
+        self.max_pending = max_pending
+        self.cancel_stale = cancel_stale
+        self.profile_store = profile_store
+    
+    def _open_session(self, client_id: str) -> ClientSession:
+        """Get or create the session shared by all sockets of a client."""
+        session = self.sessions.get(client_id)
+        if session is None:
+            session = ClientSession(
+                client_id,
+                self.handle_message,
+                max_pending=self.max_pending,
+                cancel_stale=self.cancel_stale
+            )
+            self.sessions[client_id] = session
+        session.connections += 1
+        session.start()
+        return session
+    
+    def stats(self) -> Dict:
+        """Connection, session and reaper statistics."""
+        stats = self.manager.stats()
+        stats["sessions"] = len(self.sessions)
+        stats["queued_messages"] = sum(s.inbox.qsize() for s in self.sessions.values())
+        return stats
+    
+    async def _release_session(self, session: ClientSession):
+        """Drop a socket's reference and stop the session once unused."""
+        session.connections -= 1
+        if session.connections <= 0:
+            if self.sessions.get(session.client_id) is session:
+                del self.sessions[session.client_id]
+            await session.close()
         
     async def handle_connection(self, websocket: WebSocket, client_id: str):
         """Handle WebSocket connection lifecycle."""
+        session: Optional[ClientSession] = None
         try:
             await self.manager.connect(websocket, client_id)
+            session = self._open_session(client_id)
             
             # Send welcome message
-            welcome_msg = Message(
-                id=str(datetime.now().timestamp()),
-                content="Hello! I'm here to listen and support you. How are you feeling today?",
-                timestamp=datetime.now().timestamp(),
-                sender="bot",
-                metadata={"message_type": "welcome"}
+            await self.manager.send_template(
+                client_id, "welcome", new_id(), datetime.now().timestamp()
             )
-            await self.manager.send_message(client_id, welcome_msg.dict())
+            codec = self.manager.codec_for(websocket)
             
-            # Handle messages
+            # Read messages; the session worker processes them in order
             try:
                 while True:
-                    message = await websocket.receive_json()
-                    await self.handle_message(client_id, message)
+                    message = await codec.receive(websocket)
+                    self.manager.touch(websocket)
+                    if not isinstance(message, dict):
+                        await self.manager.send_frame(websocket, codec.encode(self._error_reply()))
+                        continue
+                    
+                    # Application-level pings are answered here and never queued
+                    frame_type = message.get("type")
+                    if frame_type == "pong":
+                        continue
+                    if frame_type == "ping":
+                        await self.manager.send_frame(websocket, codec.static["pong"])
+                        continue
+                    
+                    session.submit(message)
             except WebSocketDisconnect:
-                self.manager.disconnect(client_id)
+                pass
                 
         except Exception as e:
             logger.error(f"Error in WebSocket connection: {e}", exc_info=True)
-            self.manager.disconnect(client_id)
+        finally:
+            self.manager.disconnect(client_id, websocket)
+            if session is not None:
+                await self._release_session(session)
     
-    async def handle_message(self, client_id: str, data: dict):
-        """Process incoming message and generate response."""
+    async def handle_message(
+        self,
+        client_id: str,
+        data: dict,
+        superseded: Optional[asyncio.Event] = None
+    ):
+        """
+        Process incoming message and generate response.
+        
+        When ``superseded`` is set by a newer message while the response is
+        being generated, the turn keeps its assessment but sends no
+        response. ``typing_off`` is sent however the turn ends.
+        
+        A message carrying a valid ``debug_profile`` token runs under the
+        profiler; the client then gets a ``{"type": "profile", "id": ...}``
+        frame naming the stored artifact.
+        """
         try:
             # Create message object
             message = Message(
-                id=str(datetime.now().timestamp()),
                 content=data['content'],
                 timestamp=datetime.now().timestamp(),
                 sender="user",
                 metadata=data.get('metadata', {})
             )
             
-            # Send typing indicator
-            await self.manager.send_message(
-                client_id,
-                {"type": "typing_indicator", "typing": True}
-            )
-            
-            # Process message through therapeutic flow
-            current_state = self.manager.session_states.get(client_id)
-            result = await self.flow.process(message)
-            
-            # Update session state
-            self.manager.session_states[client_id] = result['state']
+            # One trace per turn, correlated by client and message id
+            profile = self._profile_context(client_id, message, data)
+            with profile as profile_id, recorder.turn(client_id, "ws", message), tracer.span(
+                "ws.turn", trace_id=f"{client_id}:{message.id}", client_id=client_id
+            ):
+                # Send typing indicator
+                await self.manager.send_static(client_id, "typing_on", flush=False)
+                
+                try:
+                    # Process message through therapeutic flow
+                    current_state = (
+                        self.manager.session_states.get(client_id)
+                        or self.flow.coordinator._initialize_state()
+                    )
+                    result = await self.flow.process(message, current_state, superseded=superseded)
+                    
+                    # Update session state
+                    self.manager.session_states[client_id] = result['state']
+                finally:
+                    # Also on errors and cancellation, so the indicator never sticks
+                    await self.manager.send_static(client_id, "typing_off", flush=False)
+                
+                # Send response
+                if result['response'] is None:
+                    logger.info(f"Superseded in-flight turn for client {client_id}")
+                else:
+                    with tracer.span("ws.send"):
+                        await self.manager.send_message(client_id, result['response'])
             
-            # Send response
-            await self.manager.send_message(
-                client_id,
-                {"type": "typing_indicator", "typing": False}
-            )
-            await self.manager.send_message(client_id, result['response'].dict())
+            if profile_id:
+                await self.manager.send_message(client_id, {"type": "profile", "id": profile_id})
             
         except Exception as e:
             logger.error(f"Error processing message: {e}", exc_info=True)
-            # Send error message
-            error_msg = Message(
-                id=str(datetime.now().timestamp()),
-                content="I apologize, but I'm having trouble processing your message. Could you try rephrasing it?",
-                timestamp=datetime.now().timestamp(),
-                sender="bot",
-                metadata={"error": True}
-            )
-            await self.manager.send_message(client_id, error_msg.dict())
\ No newline at end of file
+            await self.manager.send_message(client_id, self._error_reply())
+    
+    def _error_reply(self) -> Message:
+        """Reply to a message that could not be processed."""
+        return Message(
+            content=ERROR_REPLY,
+            timestamp=datetime.now().timestamp(),
+            sender="bot",
+            metadata={"error": True}
+        )
+    
+    def _profile_context(self, client_id: str, message: Message, data: dict):
+        """Profiler context for a flagged turn, or a no-op one."""
+        token = data.get('debug_profile')
+        if token is None or self.profile_store is None:
+            return nullcontext()
+        if not profiling_authorized(token, get_settings().PROFILE_TOKEN):
+            logger.warning(f"Ignoring debug_profile flag with an invalid token from {client_id}")
+            return nullcontext()
+        return self.profile_store.profile(f"ws:{client_id}:{message.id}")
\ No newline at end of file
@@ -0,0 +1,86 @@
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+import argparse
+import json
+import logging
+import sys
+from .suite import compare, run_suite
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+def format_table(report: Dict[str, Any], rows: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Plain-text results, with the baseline comparison when there is one."""
+    lines = [f"{'benchmark':<28}{'median us/op':>14}{'min us/op':>12}"
+             + (f"{'baseline min':>14}{'ratio':>8}  status" if rows is not None else "")]
+    compared = {row["name"]: row for row in rows or []}
+    for name, result in report["results"].items():
+        line = f"{name:<28}{result['median_us']:>14.3f}{result['min_us']:>12.3f}"
+        if rows is not None:
+            row = compared[name]
+            baseline = f"{row['baseline_us']:.3f}" if row["baseline_us"] is not None else "-"
+            ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else "-"
+            line += f"{baseline:>14}{ratio:>8}  {row['status']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.benchmarks",
+        description="Micro-benchmarks for the per-message agent work over a fixed corpus"
+    )
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round")
+    parser.add_argument("--runs", type=int,
+                        help="Repeat the suite and keep each benchmark's fastest run "
+                             "(default 1, or 3 with --check; use 3+ when saving a baseline)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store this run as the baseline (merged into an existing one when filtered)")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with status 1 when a benchmark regressed against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed slowdown of the fastest round before it counts as a regression")
+    parser.add_argument("--output", type=Path, help="Also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    # Keep the agents' info logs out of the table
+    logging.basicConfig(level=logging.WARNING)
+
+    # A single run is too noisy to gate on
+    runs = args.runs if args.runs is not None else (3 if args.check else 1)
+    report = run_suite(args.filter, args.rounds, args.min_time, runs)
+
+    rows = None
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("environment") != report["environment"]:
+            print("warning: baseline was recorded in a different environment", file=sys.stderr)
+        try:
+            rows = compare(report, baseline, args.tolerance)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        report["comparison"] = rows
+    elif args.check:
+        print(f"error: no baseline at {args.baseline}", file=sys.stderr)
+        return 2
+
+    print(format_table(report, rows))
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.save_baseline:
+        stored = report
+        if args.filter and args.baseline.exists():
+            stored = json.loads(args.baseline.read_text())
+            stored["results"].update(report["results"])
+        args.baseline.write_text(json.dumps(stored, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+
+    if args.check and rows is not None and any(row["status"] == "regressed" for row in rows):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+from typing import List, Tuple
+
+# Fixed corpus of representative user messages. Never edit these in place:
+# the stored baseline is only comparable while the inputs stay the same.
+# Add a new corpus version instead and regenerate the baseline.
+CORPUS_VERSION = 1
+
+MESSAGES: List[str] = [
+    "Hi",
+    "ok",
+    "Thanks, that actually makes sense.",
+    "Hi, I've been feeling really anxious lately.",
+    "It's mostly about work. I can't stop thinking about deadlines.",
+    "I don't sleep well and I feel tired all the time.",
+    "Sometimes I just feel like nothing I do is good enough.",
+    "I tried going for walks, which helped a little.",
+    "I don't know, maybe I need to talk to someone about it.",
+    "My sister and I had a huge fight and now she won't talk to me.",
+    "I'm so angry at myself for messing up the presentation in front of everyone.",
+    "Today was actually a really good day! I finally finished my project.",
+    "I feel calm after the breathing exercise you suggested.",
+    "I'm excited about starting my new job next week, but also nervous.",
+    "Everything feels pointless and I feel hopeless about the future.",
+    "I feel worthless, like everyone would be better off without me.",
+    "Sometimes I want to hurt myself when it gets this bad.",
+    "I keep thinking I want to die and I don't know what to do.",
+    "I've been having thoughts of suicide again.",
+    "I want it all to end.",
+    "My boss told me I'd be fired if I miss another deadline, and I can't focus at all "
+    "because my mind keeps racing at night. I lie awake until 3am going over every "
+    "mistake I made that day, and then I'm exhausted and make even more mistakes. "
+    "It feels like a cycle I can't break no matter what I try.",
+    "I used to love painting but I haven't picked up a brush in months. My friends "
+    "invite me out and I always cancel at the last minute. I don't really know why. "
+    "I just feel flat, like nothing is interesting anymore, and then I feel guilty "
+    "for letting everyone down.",
+    "Can you help me figure out how to set better boundaries with my parents? They call "
+    "every day and get upset if I don't answer, and I end up feeling responsible for "
+    "their mood all the time.",
+    "I had a panic attack on the train this morning. My heart was pounding and I "
+    "couldn't breathe and I thought I was going to pass out in front of strangers.",
+    "I think I'm doing better. I journaled every day this week and noticed I'm kinder "
+    "to myself when I write things down.",
+    "why does this keep happening to me",
+    "I'm fine. Really. It's nothing.",
+    "I'm not sure therapy is working for me, to be honest.",
+    "Work is stressful but I'm managing okay with the routine we talked about.",
+    "I feel lonely since moving to a new city and I don't know anyone here."
+]
+
+# Representative model outputs for the validator: clean replies, short
+# ones and ones that trigger the safety-disclaimer and boundary checks.
+RESPONSES: List[Tuple[str, bool]] = [
+    ("That sounds really difficult, and it makes sense that you feel this way. "
+     "Can you tell me more about what has been weighing on you the most?", False),
+    ("Thank you for sharing that with me. It takes courage to talk about these things. "
+     "What do you notice in your body when those thoughts come up?", False),
+    ("I hear you.", False),
+    ("It sounds like you're carrying a lot right now. What would feel most supportive "
+     "for us to focus on in this conversation?", False),
+    ("I'm really concerned to hear you're having thoughts of suicide. You deserve support "
+     "right now; please reach out to a crisis hotline or emergency services, and consider "
+     "professional help as soon as you can.", True),
+    ("When you say you want to harm yourself, I want to make sure you're safe. Is there "
+     "someone you can be with right now while we talk?", True),
+    ("I am not a licensed therapist, but I'm here to listen. Please seek professional help "
+     "if these feelings become overwhelming, and contact emergency services if you're in "
+     "danger.", True),
+    ("Let's try a short grounding exercise together: notice five things you can see, four "
+     "you can touch, three you can hear, two you can smell and one you can taste.", False)
+]
@@ -0,0 +1,263 @@
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+from dataclasses import dataclass
+from datetime import datetime
+import asyncio
+import gc
+import platform
+import statistics
+import sys
+import time
+from app.config.settings import configure_settings, get_settings
+from app.models.message import HistoryEntry, Message
+from app.models.state import ConversationState, TherapeuticFramework, initial_conversation_state
+from .corpus import CORPUS_VERSION, MESSAGES, RESPONSES
+
+if TYPE_CHECKING:
+    from app.agents.assessor import AssessmentAgent
+
+@dataclass
+class Benchmark:
+    """One hot path, timed as a full pass over the corpus."""
+    name: str
+    run: Callable[[], Any]
+    # Operations per pass, so results are reported per message
+    ops: int
+
+def _messages(texts: List[str], sender: str = "user") -> List[Message]:
+    base = 1700000000.0
+    return [
+        Message(content=text, timestamp=base + i, sender=sender, metadata={})
+        for i, text in enumerate(texts)
+    ]
+
+def _conversation(
+    history: List[Message],
+    assessor: "AssessmentAgent",
+    loop: asyncio.AbstractEventLoop
+) -> ConversationState:
+    """A mid-session state, as the therapist and serializers see it."""
+    state = initial_conversation_state()
+    state.messages.extend(HistoryEntry.from_message(message) for message in history)
+    emotional_state, safety_status = loop.run_until_complete(
+        assessor.analyze(history[-1], state.messages[-4:-1])
+    )
+    state.emotional_state = emotional_state
+    state.safety_status = safety_status
+    state.edit_therapeutic_state().session_goals.extend(["Reduce anxiety", "Improve sleep"])
+    state.metadata["last_update"] = datetime(2024, 1, 1).timestamp()
+    return state
+
+def build_suite(loop: asyncio.AbstractEventLoop) -> List[Benchmark]:
+    """The benchmarks for the per-message CPU work, over the fixed corpus."""
+    from app.agents.assessor import AssessmentAgent
+    from app.agents.safety import SafetyAgent
+    from app.agents.therapist import TherapistAgent
+    from app.agents.validator import ValidatorAgent
+    from app.utils.assessment_cache import AssessmentCache
+
+    # The therapist needs a key to construct; no request is ever made
+    if not get_settings().GROQ_API_KEY:
+        configure_settings(GROQ_API_KEY="benchmark")
+
+    # Uncached, so assessor.analyze keeps timing the scoring itself
+    assessor = AssessmentAgent(cache=AssessmentCache(0))
+    cached_assessor = AssessmentAgent(cache=AssessmentCache(len(MESSAGES)))
+    safety = SafetyAgent()
+    validator = ValidatorAgent()
+    therapist = TherapistAgent()
+
+    messages = _messages(MESSAGES)
+    history = [HistoryEntry.from_message(message) for message in messages[:3]]
+    responses = [
+        Message(content=text, timestamp=0.0, sender="bot", metadata={"crisis": crisis})
+        for text, crisis in RESPONSES
+    ]
+    state = _conversation(messages[:10], assessor, loop)
+    state_json = state.model_dump_json()
+    states = []
+    for framework in TherapeuticFramework:
+        framed = state.model_copy(deep=True)
+        framed.therapeutic_state.active_framework = framework
+        states.append(framed)
+    grid = [(p / 10, s / 10) for p in range(-10, 11) for s in range(0, 11)]
+
+    async def analyze():
+        for message in messages:
+            await assessor.analyze(message, history)
+
+    async def analyze_cached():
+        for message in messages:
+            await cached_assessor.analyze(message, history)
+
+    async def evaluate_risk():
+        for message in messages:
+            await safety.evaluate_risk(message, history)
+
+    async def validate():
+        for response in responses:
+            await validator.validate(response)
+
+    def assess_text():
+        for message in messages:
+            assessor.assess_text(message.content)
+
+    def map_to_emotion():
+        for polarity, subjectivity in grid:
+            assessor._map_to_emotion(polarity, subjectivity)
+
+    def build_messages():
+        for framed in states:
+            for message in messages:
+                therapist._build_messages(message, framed)
+
+    def initial_state():
+        for _ in messages:
+            initial_conversation_state()
+
+    def message_validate():
+        for text in MESSAGES:
+            Message(content=text, timestamp=0.0, sender="user", metadata={})
+
+    return [
+        Benchmark("assessor.analyze", lambda: loop.run_until_complete(analyze()), len(messages)),
+        Benchmark("assessor.analyze_cached", lambda: loop.run_until_complete(analyze_cached()), len(messages)),
+        Benchmark("assessor.assess_text", assess_text, len(messages)),
+        Benchmark("assessor.map_to_emotion", map_to_emotion, len(grid)),
+        Benchmark("safety.evaluate_risk", lambda: loop.run_until_complete(evaluate_risk()), len(messages)),
+        Benchmark("validator.validate", lambda: loop.run_until_complete(validate()), len(responses)),
+        Benchmark("therapist.build_messages", build_messages, len(states) * len(messages)),
+        Benchmark("state.initial", initial_state, len(messages)),
+        Benchmark("state.validate_json", lambda: ConversationState.model_validate_json(state_json), 1),
+        Benchmark("state.dump_json", state.model_dump_json, 1),
+        Benchmark("message.validate", message_validate, len(MESSAGES))
+    ]
+
+def measure(benchmark: Benchmark, rounds: int = 7, min_time: float = 0.2) -> Dict[str, float]:
+    """
+    Time a benchmark like ``timeit``: calibrate the passes per round to take
+    at least ``min_time``, then keep per-operation timings of each round.
+
+    Returns:
+        Median and minimum microseconds per operation, and the passes per round
+    """
+    benchmark.run()  # warm up: lexicons, lazy imports, caches
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            benchmark.run()
+        if time.perf_counter() - start >= min_time:
+            break
+        number *= 2
+
+    timings = []
+    # Start from a clean heap so garbage left by the previous benchmark is
+    # not collected (or grown) on this one's time
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                benchmark.run()
+            timings.append((time.perf_counter() - start) / (number * benchmark.ops))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        "median_us": round(statistics.median(timings) * 1e6, 3),
+        "min_us": round(min(timings) * 1e6, 3),
+        "passes": number
+    }
+
+def run_suite(
+    name_filter: Optional[str] = None,
+    rounds: int = 7,
+    min_time: float = 0.2,
+    runs: int = 1
+) -> Dict[str, Any]:
+    """
+    Measure every benchmark (optionally only names containing ``name_filter``).
+
+    With ``runs`` > 1 the whole suite is repeated and each benchmark keeps
+    its fastest run, so a burst of load elsewhere on the machine does not
+    end up in a stored baseline.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        benchmarks = [
+            benchmark for benchmark in build_suite(loop)
+            if not name_filter or name_filter in benchmark.name
+        ]
+        results: Dict[str, Dict[str, float]] = {}
+        for _ in range(runs):
+            for benchmark in benchmarks:
+                result = measure(benchmark, rounds, min_time)
+                best = results.get(benchmark.name)
+                if best is None or result["min_us"] < best["min_us"]:
+                    results[benchmark.name] = result
+        return {
+            "corpus_version": CORPUS_VERSION,
+            "environment": environment(),
+            "results": results
+        }
+    finally:
+        loop.close()
+
+def environment() -> Dict[str, str]:
+    """Where the numbers came from; baselines only compare on the same machine."""
+    import pydantic
+
+    return {
+        "python": platform.python_version(),
+        "implementation": sys.implementation.name,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "pydantic": pydantic.VERSION
+    }
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.5
+) -> List[Dict[str, Any]]:
+    """
+    Compare a run against the stored baseline.
+
+    A benchmark regresses when its fastest round is more than ``tolerance``
+    (a fraction) slower than the baseline's. The minimum is compared rather
+    than the median because interference from the rest of the machine only
+    ever adds time, so it is the most repeatable of the timings.
+
+    Returns:
+        One row per benchmark with the ratio to the baseline and its status
+        (``ok``, ``faster``, ``regressed`` or ``new``)
+
+    Raises:
+        ValueError: the baseline was recorded against a different corpus
+    """
+    if baseline.get("corpus_version") != report["corpus_version"]:
+        raise ValueError(
+            f"Baseline is for corpus version {baseline.get('corpus_version')}, "
+            f"this run used {report['corpus_version']}; regenerate the baseline"
+        )
+
+    rows = []
+    for name, result in report["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            rows.append({"name": name, "min_us": result["min_us"], "baseline_us": None,
+                         "ratio": None, "status": "new"})
+            continue
+        ratio = result["min_us"] / reference["min_us"]
+        if ratio > 1 + tolerance:
+            status = "regressed"
+        elif ratio < 1 - tolerance:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append({"name": name, "min_us": result["min_us"], "baseline_us": reference["min_us"],
+                     "ratio": round(ratio, 3), "status": status})
+    return rows
@@ -1,3 +1,17 @@
-from .settings import Settings
+from .settings import (
+    Settings,
+    configure_settings,
+    get_settings,
+    reload_settings,
+    stop_watching_settings,
+    watch_settings
+)
 
-__all__ = ['Settings']
\ No newline at end of file
+__all__ = [
+    'Settings',
+    'configure_settings',
+    'get_settings',
+    'reload_settings',
+    'stop_watching_settings',
+    'watch_settings'
+]
\ No newline at end of file
@@ -1,10 +1,166 @@
+from typing import Any, Dict, Optional
+from pathlib import Path
+import logging
+import threading
 from pydantic_settings import BaseSettings
 
+logger = logging.getLogger(__name__)
+
 class Settings(BaseSettings):
     """Application settings."""
-    OPENAI_API_KEY: str
+    API_KEY: Optional[str] = None
+    GROQ_API_KEY: Optional[str] = None
+    # Alternative endpoint for the Groq API, e.g. the load-test fake provider
+    GROQ_BASE_URL: Optional[str] = None
+    MODEL_NAME: str = "mixtral-8x7b-32768"
+    OPENAI_API_KEY: Optional[str] = None
     MAX_HISTORY: int = 10
     CRISIS_THRESHOLD: float = 0.7
-    
+
+    # WebSocket sessions (read when the handler is created)
+    WS_MAX_PENDING: int = 8
+    WS_CANCEL_STALE: bool = True
+    # Liveness: protocol-level pings sent by uvicorn; a socket whose pong
+    # doesn't arrive within WS_PING_TIMEOUT is closed
+    WS_HEARTBEAT_INTERVAL: float = 20.0
+    WS_PING_TIMEOUT: float = 20.0
+    # Sockets with no inbound frame for this long are closed even though
+    # they are alive; users often pause for minutes, so keep it generous
+    WS_IDLE_TIMEOUT: float = 1800.0
+    WS_REAP_INTERVAL: float = 60.0
+    WS_MAX_COALESCE_MS: int = 100
+
+    # REST batch and idempotency
+    BATCH_MAX_CONCURRENCY: int = 8
+    BATCH_MAX_ITEMS: int = 5000
+    IDEMPOTENCY_TTL: float = 600.0
+
+    # Tracing: spans kept for /debug/traces, and optional OpenTelemetry export
+    TRACE_BUFFER_SIZE: int = 2048
+    TRACE_OTEL: bool = False
+
+    # LLM provider circuit breaker
+    PROVIDER_FAILURE_THRESHOLD: int = 5
+    PROVIDER_RESET_TIMEOUT: float = 30.0
+
+    # Where assessment CPU work runs: inline (on the event loop), thread or process.
+    # Workers default to the CPU count.
+    ASSESSMENT_EXECUTOR: str = "inline"
+    ASSESSMENT_WORKERS: Optional[int] = None
+    # Message-level assessments cached by normalized text (LRU); 0 disables
+    ASSESSMENT_CACHE_SIZE: int = 10000
+
+    # Startup warmup and readiness (/ready)
+    WARMUP_ENABLED: bool = True
+    READY_MAX_QUEUE_SATURATION: float = 0.9
+
+    # On-demand profiling of flagged turns; disabled while PROFILE_TOKEN is unset
+    PROFILE_TOKEN: Optional[str] = None
+    PROFILE_STORE_SIZE: int = 20
+    PROFILE_SAMPLE_INTERVAL: float = 0.005
+
+    # Record sampled sessions' turns (JSON lines, .gz to compress) for offline replay
+    RECORD_PATH: Optional[str] = None
+    RECORD_SAMPLE_RATE: float = 1.0
+
+    # Re-read the env file when it changes
+    SETTINGS_HOT_RELOAD: bool = False
+    SETTINGS_RELOAD_INTERVAL: float = 2.0
+
     class Config:
-        env_file = ".env"
\ No newline at end of file
+        env_file = ".env"
+        extra = "ignore"
+
+_settings: Optional[Settings] = None
+_overrides: Dict[str, Any] = {}
+_lock = threading.Lock()
+_watcher: Optional["SettingsWatcher"] = None
+
+def get_settings() -> Settings:
+    """
+    Shared settings instance, loaded once on first use.
+
+    Read values through this at the point of use (rather than copying them
+    at construction) so hot-reloaded thresholds take effect immediately.
+    """
+    settings = _settings
+    if settings is None:
+        with _lock:
+            if _settings is None:
+                _load()
+            settings = _settings
+    return settings
+
+def reload_settings() -> Settings:
+    """Re-read the environment and env file and swap in the new settings."""
+    with _lock:
+        return _load()
+
+def configure_settings(**overrides: Any) -> Settings:
+    """
+    Set explicit values (e.g. Streamlit secrets) that take precedence over
+    the environment, and reload.
+    """
+    with _lock:
+        _overrides.update(overrides)
+        return _load()
+
+def _load() -> Settings:
+    global _settings
+    _settings = Settings(**_overrides)
+    return _settings
+
+class SettingsWatcher(threading.Thread):
+    """Poll the env file and reload settings when it changes."""
+
+    def __init__(self, path: Path, interval: float):
+        super().__init__(name="settings-watcher", daemon=True)
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._mtime = self._read_mtime()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            mtime = self._read_mtime()
+            if mtime == self._mtime:
+                continue
+            self._mtime = mtime
+            try:
+                reload_settings()
+                logger.info(f"Reloaded settings from {self.path}")
+            except Exception as e:
+                # Keep serving with the last good settings
+                logger.error(f"Failed to reload settings: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _read_mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+def watch_settings() -> Optional[SettingsWatcher]:
+    """Start the env-file watcher once, if SETTINGS_HOT_RELOAD is enabled."""
+    global _watcher
+    settings = get_settings()
+    if not settings.SETTINGS_HOT_RELOAD:
+        return None
+    with _lock:
+        if _watcher is None:
+            _watcher = SettingsWatcher(
+                Path(Settings.Config.env_file),
+                settings.SETTINGS_RELOAD_INTERVAL
+            )
+            _watcher.start()
+    return _watcher
+
+def stop_watching_settings():
+    """Stop the env-file watcher started by ``watch_settings``, if any."""
+    global _watcher
+    with _lock:
+        if _watcher is not None:
+            _watcher.stop()
+            _watcher = None
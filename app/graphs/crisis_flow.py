@@ -1,9 +1,14 @@
-from typing import Dict, Any, List, TypedDict, Optional
-from langgraph.graph import StateGraph, END
+from typing import TYPE_CHECKING, Dict, Any, List, TypedDict, Optional
 from datetime import datetime
 from app.agents import SafetyAgent
 from app.models.message import Message
 from app.models.state import SafetyStatus
+from app.utils.tracing import tracer
+
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
+
+END = "__end__"  # langgraph.graph.END, see therapeutic_flow
 
 class CrisisContext(TypedDict):
     message: Message
@@ -18,15 +23,23 @@ class CrisisFlow:
     
     def __init__(self):
         self.safety_agent = SafetyAgent()
-        self.graph = self._build_graph()
+        self._graph: Optional["CompiledStateGraph"] = None
+    
+    @property
+    def graph(self) -> "CompiledStateGraph":
+        """Compiled flow graph, built on first use."""
+        if self._graph is None:
+            self._graph = self._build_graph()
+        return self._graph
+        
+    def _build_graph(self) -> "CompiledStateGraph":
+        """Build and compile the crisis intervention flow graph."""
+        from langgraph.graph import StateGraph
         
-    def _build_graph(self) -> StateGraph:
-        """Build the crisis intervention flow graph."""
         workflow = StateGraph(CrisisContext)
         
         # Define nodes
         workflow.add_node("evaluate_risk", self._evaluate_risk)
-        workflow.add_node("check_escalation", self._check_escalation)
         workflow.add_node("generate_response", self._generate_response)
         workflow.add_node("escalate_crisis", self._escalate_crisis)
         workflow.add_node("handle_error", self._handle_error)
@@ -34,14 +47,16 @@ class CrisisFlow:
         # Define flow
         workflow.set_entry_point("evaluate_risk")
         
-        workflow.add_edge("evaluate_risk", "check_escalation")
-        workflow.add_edge("check_escalation", "generate_response")
-        workflow.add_edge("check_escalation", "escalate_crisis")
+        workflow.add_conditional_edges(
+            "evaluate_risk",
+            self._check_escalation,
+            ["generate_response", "escalate_crisis", "handle_error"]
+        )
         workflow.add_edge("generate_response", END)
         workflow.add_edge("escalate_crisis", END)
         workflow.add_edge("handle_error", END)
         
-        return workflow
+        return workflow.compile()
     
     async def handle_crisis(self, message: Message, history: List[Message] = None) -> Dict[str, Any]:
         """Handle crisis situation through the flow."""
@@ -57,7 +72,8 @@ class CrisisFlow:
             }
             
             # Execute the workflow
-            final_context = await self.graph.invoke(context)
+            with tracer.span("crisis_flow.handle_crisis"):
+                final_context = await self.graph.ainvoke(context)
             
             return {
                 "response": final_context["response"],
@@ -78,6 +94,7 @@ class CrisisFlow:
                 "error": str(e)
             }
     
+    @tracer.traced("crisis_flow.evaluate_risk")
     async def _evaluate_risk(self, context: CrisisContext) -> CrisisContext:
         """Evaluate risk level of the crisis situation."""
         try:
@@ -90,14 +107,16 @@ class CrisisFlow:
             context["error"] = f"Risk evaluation error: {str(e)}"
             return context
     
-    async def _check_escalation(self, context: CrisisContext) -> str:
+    def _check_escalation(self, context: CrisisContext) -> str:
         """Determine if crisis requires escalation."""
         if not context["safety_status"]:
             return "handle_error"
             
-        context["requires_escalation"] = context["safety_status"].risk_level > 0.8
-        return "escalate_crisis" if context["requires_escalation"] else "generate_response"
+        # Routing can't update the context; escalate_crisis sets the flag
+        requires_escalation = context["safety_status"].risk_level > 0.8
+        return "escalate_crisis" if requires_escalation else "generate_response"
     
+    @tracer.traced("crisis_flow.generate_response")
     async def _generate_response(self, context: CrisisContext) -> CrisisContext:
         """Generate appropriate crisis response."""
         if not context["safety_status"]:
@@ -126,8 +145,10 @@ class CrisisFlow:
         
         return context
     
+    @tracer.traced("crisis_flow.escalate_crisis")
     async def _escalate_crisis(self, context: CrisisContext) -> CrisisContext:
         """Handle high-risk crisis situations."""
+        context["requires_escalation"] = True
         escalation_text = (
             "🚨 YOUR SAFETY IS MY TOP PRIORITY 🚨\n\n"
             "I need you to know:\n"
@@ -155,6 +176,7 @@ class CrisisFlow:
         
         return context
     
+    @tracer.traced("crisis_flow.handle_error")
     async def _handle_error(self, context: CrisisContext) -> CrisisContext:
         """Handle errors during crisis management."""
         error_text = (
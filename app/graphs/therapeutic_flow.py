@@ -1,72 +1,151 @@
-from typing import Dict, Any, Optional, Annotated, Tuple, TypedDict
-import datetime
-from langgraph.graph import StateGraph, END
+from typing import TYPE_CHECKING, Dict, Any, AsyncIterator, Optional, Annotated, Tuple, TypedDict
+from datetime import datetime
+import asyncio
+import logging
+import time
 from app.agents import CoordinatorAgent, AssessmentAgent, TherapistAgent, ValidatorAgent
+from app.agents.assessor import TextAssessment
 from app.models.message import Message
 from app.models.state import ConversationState, EmotionalState, SafetyStatus, TherapeuticState
+from app.utils.recording import current_turn
+from app.utils.tracing import current_span, tracer
+
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
+    from app.utils.executor import AssessmentExecutor
+
+# Same value as langgraph.graph.END; defined here so importing the flow
+# doesn't load langgraph before the graph is first needed
+END = "__end__"
+
+# Initial generation plus one regeneration after failed validation
+MAX_GENERATION_ATTEMPTS = 2
+
+logger = logging.getLogger(__name__)
 
 class ConversationContext(TypedDict):
     message: Message
     state: ConversationState
     assessment: Optional[Tuple[EmotionalState, SafetyStatus]]
+    text_assessment: Optional[TextAssessment]
     response: Optional[Message]
     validated: bool
+    attempts: int
     error: Optional[str]
+    # Set by the caller when a newer message makes this turn's answer stale
+    superseded: Optional[asyncio.Event]
 
 class TherapeuticFlow:
     """Main conversation flow orchestrator using LangGraph."""
     
-    def __init__(self):
+    def __init__(self, executor: Optional["AssessmentExecutor"] = None):
+        # Assessment is dispatched to ``executor``, or to the shared one
+        # configured by ASSESSMENT_EXECUTOR when omitted
         self.coordinator = CoordinatorAgent()
-        self.assessor = AssessmentAgent()
+        self.coordinator.assessment_agent.executor = executor
+        self.assessor = AssessmentAgent(executor)
         self.therapist = TherapistAgent()
         self.validator = ValidatorAgent()
         self.current_state: Optional[ConversationState] = None
-        self.graph = self._build_graph()
+        self._graph: Optional["CompiledStateGraph"] = None
+    
+    @property
+    def graph(self) -> "CompiledStateGraph":
+        """Compiled flow graph, built on first use."""
+        if self._graph is None:
+            self._graph = self._build_graph()
+        return self._graph
         
-    def _build_graph(self) -> StateGraph:
-        """Build the therapeutic conversation flow graph."""
+    def _build_graph(self) -> "CompiledStateGraph":
+        """Build and compile the therapeutic conversation flow graph."""
+        from langgraph.graph import StateGraph
         
         workflow = StateGraph(ConversationContext)
         
-        # Define state transitions
+        # Define state transitions. The crisis check and validation decide the
+        # route but also record errors on the context, so they run as nodes and
+        # the conditional edges read the outcome back from the context.
         workflow.add_node("assess", self._assess_message)
-        workflow.add_node("check_crisis", self._check_crisis)
+        workflow.add_node("check_crisis", self._check_crisis_node)
         workflow.add_node("generate_response", self._generate_response)
-        workflow.add_node("validate_response", self._validate_response)
+        workflow.add_node("validate_response", self._validate_response_node)
         workflow.add_node("handle_error", self._handle_error)
         
         # Define the flow
         workflow.set_entry_point("assess")
         
         workflow.add_edge("assess", "check_crisis")
-        workflow.add_edge("check_crisis", "generate_response")
-        workflow.add_edge("check_crisis", "handle_error")  # For crisis situations
-        workflow.add_edge("generate_response", "validate_response")
-        workflow.add_edge("validate_response", END)
-        workflow.add_edge("validate_response", "generate_response")  # For invalid responses
+        workflow.add_conditional_edges(
+            "check_crisis",
+            self._route_after_crisis_check,
+            ["generate_response", "handle_error"]  # For crisis situations
+        )
+        workflow.add_conditional_edges(
+            "generate_response",
+            self._route_after_generation,
+            ["validate_response", END]  # Superseded turns end without a response
+        )
+        workflow.add_conditional_edges(
+            "validate_response",
+            self._route_after_validation,
+            ["generate_response", "handle_error", END]  # Regenerate invalid responses
+        )
         workflow.add_edge("handle_error", END)
         
-        return workflow
+        return workflow.compile()
         
-    async def process(self, message: Message) -> Dict[str, Any]:
-        """Process message through the therapeutic flow."""
+    async def process(
+        self,
+        message: Message,
+        state: Optional[ConversationState] = None,
+        text_assessment: Optional[TextAssessment] = None,
+        superseded: Optional[asyncio.Event] = None
+    ) -> Dict[str, Any]:
+        """
+        Process message through the therapeutic flow.
+        
+        Args:
+            message: Incoming message to process
+            state: Session state to run the turn against. When omitted the
+                flow falls back to its own shared ``current_state``.
+            text_assessment: Precomputed message-level assessment from
+                ``AssessmentAgent.analyze_batch`` or ``assess_texts``, i.e.
+                of the normalized text, as ``analyze`` would compute it
+            superseded: Event set when a newer message makes this turn stale.
+                Only response generation is abandoned: assessment always
+                completes and crisis turns never generate, so their
+                response is always produced.
+            
+        Returns:
+            Dict with the response message (None for a superseded turn),
+            updated state and metadata
+        """
         try:
             # Initialize conversation context
             context: ConversationContext = {
                 "message": message,
-                "state": self.current_state or await self.coordinator._initialize_state(),
+                "state": state or self.current_state or self.coordinator._initialize_state(),
                 "assessment": None,
+                "text_assessment": text_assessment,
                 "response": None,
                 "validated": False,
-                "error": None
+                "attempts": 0,
+                "error": None,
+                "superseded": superseded
             }
             
             # Execute the workflow
-            final_context = await self.graph.invoke(context)
+            with tracer.span("flow.process"):
+                final_context = await self.graph.ainvoke(context)
             
-            # Update current state
-            self.current_state = final_context["state"]
+            # Only a turn on the flow's own state may replace it; a caller's
+            # session state must never become the shared fallback
+            if state is None:
+                self.current_state = final_context["state"]
+            
+            record = current_turn()
+            if record is not None and final_context["response"]:
+                record.set_response(final_context["response"])
             
             return {
                 "response": final_context["response"],
@@ -82,23 +161,100 @@ class TherapeuticFlow:
                 timestamp=datetime.now().timestamp(),
                 metadata={"error": str(e)}
             )
-            return {"response": error_response, "state": self.current_state, "metadata": {"error": True}}
+            return {"response": error_response, "state": state or self.current_state, "metadata": {"error": True}}
     
+    async def stream(
+        self,
+        message: Message,
+        state: Optional[ConversationState] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run a turn through the same stages as ``process``, yielding events as they happen.
+        
+        Yields ``("assessment", ...)`` once assessment completes, ``("delta", ...)``
+        for each generated text chunk and finally ``("message", ...)`` with the
+        validated response. The final message is authoritative: it may add a
+        safety disclaimer or replace the streamed text if validation failed.
+        """
+        context: ConversationContext = {
+            "message": message,
+            "state": state or self.current_state or self.coordinator._initialize_state(),
+            "assessment": None,
+            "text_assessment": None,
+            "response": None,
+            "validated": False,
+            "attempts": 0,
+            "error": None,
+            "superseded": None
+        }
+        
+        started = time.perf_counter()
+        context = await self._assess_message(context)
+        if context["assessment"]:
+            emotional_state, safety_status = context["assessment"]
+            yield "assessment", {
+                "emotional_state": emotional_state.model_dump(mode="json"),
+                "safety_status": safety_status.model_dump(mode="json")
+            }
+        
+        if await self._check_crisis(context) == "generate_response":
+            chunks = []
+            try:
+                with tracer.span("flow.stream_response") as span:
+                    async for delta in self.therapist.stream_response(message, context["state"]):
+                        if not chunks:
+                            span.set("ttft_ms", (time.perf_counter() - started) * 1000)
+                        chunks.append(delta)
+                        yield "delta", {"content": delta}
+                    span.set("chunks", len(chunks))
+                context["response"] = self.therapist.build_response("".join(chunks), context["state"])
+                context["attempts"] = 1
+            except Exception as e:
+                logger.error(f"Error streaming response: {e}", exc_info=True)
+                context["response"] = self.therapist._generate_fallback_response(context["state"])
+            
+            # A streamed answer can't be un-sent, so regenerate at most once
+            if await self._validate_response(context) == "generate_response":
+                context = await self._generate_response(context)
+                if context["response"] and await self._validate_response(context) == END:
+                    context["error"] = None
+        
+        if not context["response"] or (context["error"] and not context["validated"]):
+            context = await self._handle_error(context)
+        
+        if state is None:
+            self.current_state = context["state"]
+        
+        response = context["response"]
+        record = current_turn()
+        if record is not None:
+            record.set_response(response)
+        yield "message", {
+            "response": response.model_dump(mode="json"),
+            "metadata": response.metadata or {}
+        }
+    
+    @tracer.traced("flow.assess")
     async def _assess_message(self, context: ConversationContext) -> ConversationContext:
         """Assess incoming message for emotional content and safety."""
         try:
             emotional_state, safety_status = await self.assessor.analyze(
                 context["message"],
-                context["state"].messages
+                context["state"].messages,
+                context.get("text_assessment")
             )
             context["assessment"] = (emotional_state, safety_status)
             context["state"].emotional_state = emotional_state
             context["state"].safety_status = safety_status
+            record = current_turn()
+            if record is not None:
+                record.set_assessment(emotional_state, safety_status)
             return context
         except Exception as e:
             context["error"] = f"Assessment error: {str(e)}"
             return context
     
+    @tracer.traced("flow.check_crisis")
     async def _check_crisis(self, context: ConversationContext) -> str:
         """Check for crisis situations and determine next step."""
         if not context["assessment"]:
@@ -107,23 +263,47 @@ class TherapeuticFlow:
         _, safety_status = context["assessment"]
         if safety_status.risk_level >= self.coordinator.crisis_threshold:
             context["error"] = "Crisis situation detected"
+            current_span().set("crisis", True)
             return "handle_error"
             
         return "generate_response"
     
+    @tracer.traced("flow.generate_response")
     async def _generate_response(self, context: ConversationContext) -> ConversationContext:
         """Generate therapeutic response."""
+        context["attempts"] = context.get("attempts", 0) + 1
+        current_span().set("attempt", context["attempts"])
         try:
-            response = await self.therapist.generate_response(
+            generation = self.therapist.generate_response(
                 context["message"],
                 context["state"]
             )
-            context["response"] = response
+            superseded = context.get("superseded")
+            if superseded is None:
+                context["response"] = await generation
+                return context
+            
+            # Race generation against a newer message arriving
+            generate = asyncio.ensure_future(generation)
+            stale = asyncio.ensure_future(superseded.wait())
+            try:
+                await asyncio.wait({generate, stale}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                stale.cancel()
+                if not generate.done():
+                    generate.cancel()
+                    await asyncio.gather(generate, return_exceptions=True)
+            if generate.cancelled():
+                current_span().set("superseded", True)
+                context["response"] = None
+                return context
+            context["response"] = generate.result()
             return context
         except Exception as e:
             context["error"] = f"Response generation error: {str(e)}"
             return context
     
+    @tracer.traced("flow.validate_response")
     async def _validate_response(self, context: ConversationContext) -> str:
         """Validate generated response."""
         if not context["response"]:
@@ -137,6 +317,35 @@ class TherapeuticFlow:
         context["validated"] = True
         return END
     
+    async def _check_crisis_node(self, context: ConversationContext) -> ConversationContext:
+        """Graph node for ``_check_crisis``."""
+        await self._check_crisis(context)
+        return context
+    
+    def _route_after_crisis_check(self, context: ConversationContext) -> str:
+        if context["error"] or not context["assessment"]:
+            return "handle_error"
+        return "generate_response"
+    
+    def _route_after_generation(self, context: ConversationContext) -> str:
+        superseded = context.get("superseded")
+        if superseded is not None and superseded.is_set() and not context["response"]:
+            return END
+        return "validate_response"
+    
+    async def _validate_response_node(self, context: ConversationContext) -> ConversationContext:
+        """Graph node for ``_validate_response``."""
+        await self._validate_response(context)
+        return context
+    
+    def _route_after_validation(self, context: ConversationContext) -> str:
+        if context["validated"]:
+            return END
+        if context["response"] and context["attempts"] < MAX_GENERATION_ATTEMPTS:
+            return "generate_response"
+        return "handle_error"
+    
+    @tracer.traced("flow.handle_error")
     async def _handle_error(self, context: ConversationContext) -> ConversationContext:
         """Handle errors and generate appropriate responses."""
         error_message = "I apologize, but I need to ensure your safety and well-being. "
@@ -0,0 +1,229 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from .clients import SessionStats, rest_session, sse_session, websocket_session
+from .fake_provider import add_profile_arguments
+
+if TYPE_CHECKING:
+    import httpx
+
+LOADTEST_API_KEY = "loadtest"
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (0 < q <= 100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(q / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max in milliseconds."""
+    return {
+        name: round(value * 1000, 1) if value is not None else None
+        for name, value in (
+            ("p50_ms", percentile(values, 50)),
+            ("p95_ms", percentile(values, 95)),
+            ("p99_ms", percentile(values, 99)),
+            ("max_ms", max(values) if values else None)
+        )
+    }
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def raise_fd_limit():
+    """Lift the soft open-files limit to the hard limit; each session holds sockets on both ends."""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+async def wait_until(client: "httpx.AsyncClient", url: str, timeout: float):
+    """Poll ``url`` until it answers 200."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except Exception:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{url} did not become ready within {timeout}s")
+        await asyncio.sleep(0.2)
+
+def start_servers(args: argparse.Namespace) -> Dict[str, Any]:
+    """Start the fake provider and the app as subprocesses."""
+    provider_port = free_port()
+    app_port = free_port()
+    provider_args = [
+        "--latency-ms", str(args.latency_ms),
+        "--distribution", args.distribution,
+        "--jitter-ms", str(args.jitter_ms),
+        "--sigma", str(args.sigma),
+        "--tokens-per-second", str(args.tokens_per_second),
+        "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate)
+    ]
+    provider = subprocess.Popen(
+        [sys.executable, "-m", "app.loadtest.fake_provider", "--port", str(provider_port), *provider_args]
+    )
+    env = {
+        **os.environ,
+        "GROQ_API_KEY": "loadtest",
+        "GROQ_BASE_URL": f"http://127.0.0.1:{provider_port}",
+        "API_KEY": LOADTEST_API_KEY,
+        # Keep the circuit closed by default so injected errors show up as per-turn fallbacks
+        "PROVIDER_FAILURE_THRESHOLD": str(args.circuit_threshold)
+    }
+    app = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(app_port),
+            "--ws", "websockets", "--log-level", "warning"
+        ],
+        env=env
+    )
+    return {
+        "provider": provider,
+        "app": app,
+        "provider_url": f"http://127.0.0.1:{provider_port}",
+        "app_url": f"http://127.0.0.1:{app_port}"
+    }
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    servers = None
+    app_url, app_pid = args.app_url, args.app_pid
+    if app_url is None:
+        servers = start_servers(args)
+        app_url, app_pid = servers["app_url"], servers["app"].pid
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    client = httpx.AsyncClient(base_url=app_url, timeout=args.timeout, limits=limits)
+    try:
+        if servers is not None:
+            await wait_until(client, f"{servers['provider_url']}/stats", args.startup_timeout)
+        await wait_until(client, "/ready", args.startup_timeout)
+
+        baseline_rss = rss_bytes(app_pid) if app_pid else None
+        peak_rss = baseline_rss
+        stats = SessionStats()
+
+        async def session(index: int):
+            await asyncio.sleep(index * args.ramp_up / max(1, args.sessions))
+            if args.mode == "ws":
+                await websocket_session(app_url, f"load-{index}", args.turns, args.think_time, args.timeout, stats)
+            elif args.mode == "rest":
+                await rest_session(client, LOADTEST_API_KEY, args.turns, args.think_time, stats)
+            else:
+                await sse_session(client, LOADTEST_API_KEY, args.turns, args.think_time, stats)
+
+        async def sample_memory():
+            nonlocal peak_rss
+            while True:
+                rss = rss_bytes(app_pid) if app_pid else None
+                if rss is not None and (peak_rss is None or rss > peak_rss):
+                    peak_rss = rss
+                await asyncio.sleep(0.5)
+
+        sampler = asyncio.create_task(sample_memory())
+        start = time.perf_counter()
+        await asyncio.gather(*(session(i) for i in range(args.sessions)))
+        elapsed = time.perf_counter() - start
+        sampler.cancel()
+
+        turns = stats.turns
+        ok = [turn for turn in turns if turn.ok]
+        ttfts = [turn.ttft for turn in turns if turn.ttft is not None]
+        memory: Dict[str, Any] = {"baseline_rss_mb": None, "peak_rss_mb": None, "per_session_kb": None}
+        if baseline_rss is not None and peak_rss is not None:
+            memory = {
+                "baseline_rss_mb": round(baseline_rss / 2**20, 1),
+                "peak_rss_mb": round(peak_rss / 2**20, 1),
+                "per_session_kb": round((peak_rss - baseline_rss) / max(1, args.sessions) / 1024, 1)
+            }
+
+        report = {
+            "mode": args.mode,
+            "sessions": args.sessions,
+            "sessions_failed": stats.sessions_failed,
+            "turns": len(turns),
+            "turns_ok": len(ok),
+            "fallbacks": sum(1 for turn in turns if turn.fallback),
+            "errors": sum(1 for turn in turns if not turn.ok),
+            "elapsed_s": round(elapsed, 2),
+            "throughput_turns_per_s": round(len(turns) / elapsed, 2) if elapsed else None,
+            "latency": summarize([turn.latency for turn in ok]),
+            # Streamed channels (sse) only; null for ws and rest
+            "ttft": summarize(ttfts) if ttfts else None,
+            "memory": memory,
+            "connect_errors": stats.connect_errors[:10]
+        }
+        if servers is not None:
+            report["provider"] = (await client.get(f"{servers['provider_url']}/stats")).json()
+        return report
+    finally:
+        await client.aclose()
+        if servers is not None:
+            for process in (servers["app"], servers["provider"]):
+                process.terminate()
+            for process in (servers["app"], servers["provider"]):
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.loadtest",
+        description="Drive simulated chat sessions against the app backed by a local fake LLM provider"
+    )
+    parser.add_argument("--mode", choices=["ws", "rest", "sse"], default="ws")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=5, help="Messages per session")
+    parser.add_argument("--think-time", type=float, default=2.0, help="Mean seconds between a user's messages")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="Seconds over which sessions start")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-turn timeout")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--circuit-threshold", type=int, default=1000000,
+                        help="Provider failures before the app's circuit opens")
+    parser.add_argument("--app-url", help="Target an already running app instead of starting one")
+    parser.add_argument("--app-pid", type=int, help="PID of --app-url's server, for memory sampling")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    raise_fd_limit()
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    return 0 if report["errors"] == 0 and report["sessions_failed"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
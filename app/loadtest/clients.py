@@ -0,0 +1,176 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from dataclasses import dataclass, field
+import asyncio
+import json
+import random
+import time
+
+if TYPE_CHECKING:
+    import httpx
+
+# A short scripted conversation each simulated user walks through
+SCRIPT = [
+    "Hi, I've been feeling really anxious lately.",
+    "It's mostly about work. I can't stop thinking about deadlines.",
+    "I don't sleep well and I feel tired all the time.",
+    "Sometimes I just feel like nothing I do is good enough.",
+    "I tried going for walks, which helped a little.",
+    "I don't know, maybe I need to talk to someone about it.",
+    "Thanks, that actually makes sense.",
+    "ok"
+]
+
+@dataclass
+class TurnResult:
+    latency: float
+    # Time to the first streamed token; only the SSE channel streams
+    ttft: Optional[float] = None
+    ok: bool = True
+    fallback: bool = False
+    error: Optional[str] = None
+
+@dataclass
+class SessionStats:
+    """Outcomes of all simulated sessions."""
+    turns: List[TurnResult] = field(default_factory=list)
+    sessions_started: int = 0
+    sessions_failed: int = 0
+    connect_errors: List[str] = field(default_factory=list)
+
+    def record(self, result: TurnResult):
+        self.turns.append(result)
+
+def think_time(mean: float) -> float:
+    """Pause before the next user message, +/-50% around ``mean``."""
+    return random.uniform(0.5 * mean, 1.5 * mean) if mean > 0 else 0.0
+
+def _bot_message(frame: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The bot response in a decoded frame, unwrapping coalesced batches."""
+    if frame.get("type") == "batch":
+        for inner in frame.get("frames", []):
+            message = _bot_message(inner)
+            if message is not None:
+                return message
+        return None
+    if frame.get("sender") == "bot" and (frame.get("metadata") or {}).get("message_type") != "welcome":
+        return frame
+    return None
+
+async def websocket_session(
+    base_url: str,
+    client_id: str,
+    turns: int,
+    mean_think_time: float,
+    timeout: float,
+    stats: SessionStats
+):
+    """
+    One user chatting over ``/ws/{client_id}``; latency is send-to-response.
+
+    WebSocket turns aren't streamed: the first bot frame carries the whole
+    response. No time-to-first-token is recorded, since it would only
+    repeat the latency and isn't comparable with the SSE figure.
+    """
+    import websockets
+
+    url = base_url.replace("http", "ws", 1).rstrip("/") + f"/ws/{client_id}"
+    try:
+        async with websockets.connect(url, max_size=None, open_timeout=timeout) as ws:
+            stats.sessions_started += 1
+            await asyncio.wait_for(ws.recv(), timeout)  # welcome
+            for turn in range(turns):
+                await asyncio.sleep(think_time(mean_think_time))
+                content = SCRIPT[turn % len(SCRIPT)]
+                start = time.perf_counter()
+                await ws.send(json.dumps({"content": content}))
+                try:
+                    while True:
+                        frame = json.loads(await asyncio.wait_for(ws.recv(), timeout))
+                        message = _bot_message(frame)
+                        if message is not None:
+                            break
+                except asyncio.TimeoutError:
+                    stats.record(TurnResult(time.perf_counter() - start, ok=False, error="timeout"))
+                    continue
+                metadata = message.get("metadata") or {}
+                stats.record(TurnResult(
+                    time.perf_counter() - start,
+                    ok=not metadata.get("error"),
+                    fallback=bool(metadata.get("fallback"))
+                ))
+    except Exception as e:
+        stats.sessions_failed += 1
+        stats.connect_errors.append(f"{type(e).__name__}: {e}")
+
+async def rest_session(
+    client: "httpx.AsyncClient",
+    api_key: str,
+    turns: int,
+    mean_think_time: float,
+    stats: SessionStats
+):
+    """
+    One user posting to ``/message``.
+
+    The server keeps no state between REST requests, so every turn is an
+    independent one-message conversation.
+    """
+    stats.sessions_started += 1
+    for turn in range(turns):
+        await asyncio.sleep(think_time(mean_think_time))
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                "/message",
+                json={"content": SCRIPT[turn % len(SCRIPT)]},
+                headers={"X-API-Key": api_key}
+            )
+            response.raise_for_status()
+            metadata = response.json().get("metadata") or {}
+            stats.record(TurnResult(
+                time.perf_counter() - start,
+                ok=not metadata.get("error"),
+                fallback=bool(metadata.get("fallback"))
+            ))
+        except Exception as e:
+            stats.record(TurnResult(time.perf_counter() - start, ok=False, error=type(e).__name__))
+
+async def sse_session(
+    client: "httpx.AsyncClient",
+    api_key: str,
+    turns: int,
+    mean_think_time: float,
+    stats: SessionStats
+):
+    """One user on ``/message/stream``; records time to the first ``delta`` event."""
+    stats.sessions_started += 1
+    for turn in range(turns):
+        await asyncio.sleep(think_time(mean_think_time))
+        start = time.perf_counter()
+        ttft = None
+        event = None
+        final: Dict[str, Any] = {}
+        try:
+            async with client.stream(
+                "POST",
+                "/message/stream",
+                json={"content": SCRIPT[turn % len(SCRIPT)]},
+                headers={"X-API-Key": api_key}
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line.startswith("event: "):
+                        event = line[7:]
+                        if event == "delta" and ttft is None:
+                            ttft = time.perf_counter() - start
+                    elif line.startswith("data: ") and event in ("message", "error"):
+                        final = json.loads(line[6:])
+            metadata = final.get("metadata") or {}
+            stats.record(TurnResult(
+                time.perf_counter() - start,
+                ttft=ttft,
+                ok=event == "message" and not metadata.get("error"),
+                fallback=bool(metadata.get("fallback"))
+            ))
+        except Exception as e:
+            stats.record(TurnResult(time.perf_counter() - start, ok=False, error=type(e).__name__))
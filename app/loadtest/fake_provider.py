@@ -0,0 +1,168 @@
+from typing import Any, AsyncIterator, Dict, List
+from dataclasses import dataclass
+import argparse
+import asyncio
+import json
+import random
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Canned replies, long enough to pass ValidatorAgent's length check
+REPLIES = [
+    "That sounds really difficult, and it makes sense that you feel this way. "
+    "Can you tell me more about what has been weighing on you the most?",
+    "Thank you for sharing that with me. It takes courage to talk about these things. "
+    "What do you notice in your body when those thoughts come up?",
+    "I hear how tiring this has been for you. Let's take it one step at a time; "
+    "what is one small thing that helped even a little in the past?",
+    "It sounds like you're carrying a lot right now. What would feel most supportive "
+    "for us to focus on in this conversation?"
+]
+
+@dataclass
+class ProviderProfile:
+    """Latency, throughput and failure behaviour of the fake provider."""
+    latency_ms: float = 500.0
+    # fixed | uniform (latency_ms +/- jitter_ms) | lognormal (median latency_ms, sigma)
+    distribution: str = "lognormal"
+    jitter_ms: float = 200.0
+    sigma: float = 0.5
+    tokens_per_second: float = 80.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+    def first_token_delay(self) -> float:
+        """Seconds before the first token, drawn from the configured distribution."""
+        if self.distribution == "fixed":
+            delay = self.latency_ms
+        elif self.distribution == "uniform":
+            delay = random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+        else:
+            delay = random.lognormvariate(0, self.sigma) * self.latency_ms
+        return max(0.0, delay) / 1000
+
+def _tokens(text: str) -> List[str]:
+    """Split text into word-sized pseudo tokens that join back to the original."""
+    words = text.split(" ")
+    return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+def create_provider_app(profile: ProviderProfile) -> FastAPI:
+    """
+    OpenAI-compatible chat completions server with synthetic latency.
+
+    Serves ``/openai/v1/chat/completions`` (the path the Groq SDK uses) and
+    ``/v1/chat/completions``, streaming and non-streaming.
+    """
+    app = FastAPI(title="fake-llm-provider")
+    app.state.requests = 0
+    app.state.errors = 0
+
+    async def completions(request: Request):
+        body: Dict[str, Any] = await request.json()
+        app.state.requests += 1
+
+        roll = random.random()
+        if roll < profile.error_rate:
+            app.state.errors += 1
+            await asyncio.sleep(profile.first_token_delay())
+            return JSONResponse({"error": {"message": "Injected upstream error", "type": "server_error"}}, status_code=500)
+        if roll < profile.error_rate + profile.rate_limit_rate:
+            app.state.errors += 1
+            return JSONResponse(
+                {"error": {"message": "Injected rate limit", "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": "1"}
+            )
+
+        reply = random.choice(REPLIES)
+        tokens = _tokens(reply)
+        completion_id = f"chatcmpl-fake-{app.state.requests}"
+        created = int(time.time())
+        model = body.get("model", "fake-model")
+        usage = {
+            "prompt_tokens": sum(len(str(m.get("content", "")).split()) for m in body.get("messages", [])),
+            "completion_tokens": len(tokens)
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        token_interval = 1 / profile.tokens_per_second if profile.tokens_per_second > 0 else 0.0
+
+        if body.get("stream"):
+            async def events() -> AsyncIterator[str]:
+                await asyncio.sleep(profile.first_token_delay())
+                for token in tokens:
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(token_interval)
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                    "x_groq": {"usage": usage}
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(profile.first_token_delay() + token_interval * len(tokens))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        }
+
+    app.add_api_route("/openai/v1/chat/completions", completions, methods=["POST"])
+    app.add_api_route("/v1/chat/completions", completions, methods=["POST"])
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests, "errors": app.state.errors}
+
+    return app
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="Median time to first token")
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--jitter-ms", type=float, default=200.0, help="Spread for the uniform distribution")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Shape of the lognormal distribution")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests failing with 429")
+
+def profile_from_args(args: argparse.Namespace) -> ProviderProfile:
+    return ProviderProfile(
+        latency_ms=args.latency_ms,
+        distribution=args.distribution,
+        jitter_ms=args.jitter_ms,
+        sigma=args.sigma,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate
+    )
+
+if __name__ == "__main__":
+    # python -m app.loadtest.fake_provider --port 9100 --latency-ms 800
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM provider")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_provider_app(profile_from_args(args)), host=args.host, port=args.port, log_level="warning")
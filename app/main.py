@@ -0,0 +1,63 @@
+from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import logging
+from app.utils.startup import startup_report
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up in the background (/ready reports 503 until it finishes) and
+    watch the env file while serving, when SETTINGS_HOT_RELOAD is set.
+    """
+    from app.api.routes import warmup
+    from app.config.settings import stop_watching_settings, watch_settings
+    from app.utils.executor import get_assessment_executor
+    from app.utils.recording import recorder
+    
+    watch_settings()
+    warmup.start()
+    yield
+    stop_watching_settings()
+    recorder.close()
+    get_assessment_executor().shutdown()
+
+def create_app() -> FastAPI:
+    """Create the FastAPI application serving the chat API."""
+    with startup_report.phase("import_api"):
+        from app.api import router
+    
+    with startup_report.phase("create_app"):
+        app = FastAPI(title="mytherapist", lifespan=lifespan)
+        app.include_router(router)
+    
+    startup_report.log()
+    return app
+
+app = create_app()
+
+def run(host: str = "0.0.0.0", port: int = 8000):
+    """
+    Serve the API with uvicorn.
+    
+    uvicorn's default WebSocket implementation negotiates permessage-deflate
+    with clients that offer it, so chat frames are compressed on the wire
+    without any application-level changes. Its protocol-level pings
+    (WS_HEARTBEAT_INTERVAL, WS_PING_TIMEOUT) close dead connections
+    without any client cooperation.
+    """
+    import uvicorn
+    from app.config.settings import get_settings
+    
+    settings = get_settings()
+    uvicorn.run(
+        app,
+        host=host,
+        port=port,
+        ws_ping_interval=settings.WS_HEARTBEAT_INTERVAL,
+        ws_ping_timeout=settings.WS_PING_TIMEOUT
+    )
+
+if __name__ == "__main__":
+    run()
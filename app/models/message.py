@@ -1,10 +1,30 @@
-from pydantic import BaseModel
+from dataclasses import dataclass
+from pydantic import BaseModel, Field
 from typing import Dict, List, Optional
+from app.utils.ids import new_id
 
 class Message(BaseModel):
     """Message data model."""
+    id: str = Field(default_factory=new_id)
+    content: str
+    timestamp: float
+    sender: str
+    metadata: Optional[Dict] = None
+
+@dataclass(slots=True)
+class HistoryEntry:
+    """
+    A message as kept in a session's history.
+
+    Later turns only read what was said, by whom and when, so history holds
+    these slotted records instead of full ``Message`` models. Conversion
+    shares the message's field objects rather than copying them.
+    """
     id: str
     content: str
     timestamp: float
     sender: str
-    metadata: Optional[Dict] = None
\ No newline at end of file
+
+    @classmethod
+    def from_message(cls, message: Message) -> "HistoryEntry":
+        return cls(message.id, message.content, message.timestamp, message.sender)
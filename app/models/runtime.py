@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Tuple
+from app.models.state import EmotionalState
+from app.models.vocab import EMOTIONS
+
+# Hot-path values produced by the agents on every turn. They are trusted
+# (computed here, not received from clients), so they are kept as slotted
+# dataclasses and turned into the pydantic models with model_construct,
+# which skips validation and reuses the same field objects.
+
+@dataclass(slots=True)
+class EmotionReading:
+    """Emotion derived from sentiment for a single message."""
+    emotion_code: int
+    intensity: float
+    valence: float
+    arousal: float
+    
+    @property
+    def primary_emotion(self) -> str:
+        return EMOTIONS[self.emotion_code]
+    
+    def to_model(self) -> EmotionalState:
+        return EmotionalState.model_construct(
+            primary_emotion=self.primary_emotion,
+            intensity=self.intensity,
+            secondary_emotions=[],
+            valence=self.valence,
+            arousal=self.arousal
+        )
+
+@dataclass(slots=True)
+class TextAssessment:
+    """Message-level assessment that does not depend on conversation history."""
+    emotion: EmotionReading
+    risk_score: float
+    crisis_indicators: Tuple[str, ...]
@@ -1,8 +1,8 @@
 from enum import Enum
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, List, Dict, Optional
 from datetime import datetime
-from app.models.message import Message
+from app.models.message import HistoryEntry
 
 class EmotionalState(BaseModel):
     """Emotional state assessment model."""
@@ -35,10 +35,83 @@ class SafetyStatus(BaseModel):
 
 class ConversationState(BaseModel):
     """Enhanced conversation state model."""
-    messages: List[Message]
+    messages: List[HistoryEntry]
     emotional_state: EmotionalState
     therapeutic_state: TherapeuticState
     safety_status: SafetyStatus
-    metadata: Dict[str, any] = {}
+    metadata: Dict[str, Any] = {}
+    
+    def edit_therapeutic_state(self) -> TherapeuticState:
+        """
+        The therapeutic state, ready to be changed in place.
+        
+        New sessions share a frozen default; the first edit gives the
+        session its own copy.
+        """
+        therapeutic_state = self.therapeutic_state
+        if isinstance(therapeutic_state, _SharedTherapeuticState):
+            therapeutic_state = self.therapeutic_state = TherapeuticState.model_construct(
+                active_framework=therapeutic_state.active_framework,
+                session_goals=list(therapeutic_state.session_goals),
+                progress_markers=dict(therapeutic_state.progress_markers),
+                interventions_used=list(therapeutic_state.interventions_used)
+            )
+        return therapeutic_state
+
+# Copy-on-write defaults shared by every new session. The models are frozen
+# and their containers refuse in-place changes, so no caller can alter
+# another session's state through them. Assessment replaces the emotional
+# state wholesale; the therapeutic state is copied by the first edit.
+
+class _ReadOnlyList(list):
+    def _read_only(self, *args: Any, **kwargs: Any):
+        raise TypeError("Shared default state is read-only")
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+class _ReadOnlyDict(dict):
+    def _read_only(self, *args: Any, **kwargs: Any):
+        raise TypeError("Shared default state is read-only")
+    __setitem__ = __delitem__ = update = pop = popitem = clear = setdefault = __ior__ = _read_only
+
+class _SharedEmotionalState(EmotionalState):
+    model_config = ConfigDict(frozen=True)
+
+class _SharedTherapeuticState(TherapeuticState):
+    model_config = ConfigDict(frozen=True)
+
+_NEUTRAL_EMOTION = _SharedEmotionalState.model_construct(
+    primary_emotion="neutral",
+    intensity=0.0,
+    secondary_emotions=_ReadOnlyList(),
+    valence=0.0,
+    arousal=0.0
+)
+_INITIAL_THERAPY = _SharedTherapeuticState.model_construct(
+    active_framework=TherapeuticFramework.PERSON_CENTERED,
+    session_goals=_ReadOnlyList(),
+    progress_markers=_ReadOnlyDict(),
+    interventions_used=_ReadOnlyList()
+)
 
+def initial_conversation_state() -> ConversationState:
+    """
+    Fresh conversation state for a new session.
 
+    Shares the frozen emotional and therapeutic defaults until the session
+    changes them (see ``ConversationState.edit_therapeutic_state``); only
+    the history, metadata and the safety status, stamped with the time
+    the session starts, are built per session, without validation.
+    """
+    return ConversationState.model_construct(
+        messages=[],
+        emotional_state=_NEUTRAL_EMOTION,
+        therapeutic_state=_INITIAL_THERAPY,
+        safety_status=SafetyStatus.model_construct(
+            risk_level=0.0,
+            crisis_indicators=[],
+            last_assessment=datetime.now(),
+            recommended_actions=[]
+        ),
+        metadata={}
+    )
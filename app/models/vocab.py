@@ -0,0 +1,26 @@
+from typing import Dict, Tuple
+
+# Closed vocabulary of primary emotions produced by the assessor. Runtime
+# records carry the integer code; states and messages share the canonical
+# string decoded from it, so no per-turn copies are allocated.
+EMOTIONS: Tuple[str, ...] = (
+    "neutral",
+    "detached",
+    "sad",
+    "distressed",
+    "tired",
+    "anxious",
+    "frustrated",
+    "focused",
+    "engaged",
+    "calm",
+    "pleased",
+    "happy",
+    "content",
+    "excited",
+    "elated"
+)
+
+EMOTION_CODES: Dict[str, int] = {name: code for code, name in enumerate(EMOTIONS)}
+
+NEUTRAL = EMOTION_CODES["neutral"]
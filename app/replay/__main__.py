@@ -0,0 +1,53 @@
+from typing import List, Optional
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import sys
+from app.utils.recording import read_records
+from .engine import group_sessions, replay
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.replay",
+        description="Replay recorded sessions through the pipeline with the model responses stubbed"
+    )
+    parser.add_argument("recording", help="Recording written with RECORD_PATH (.jsonl or .jsonl.gz)")
+    parser.add_argument("--target", choices=["flow", "coordinator"], default="flow",
+                        help="Run turns through TherapeuticFlow (as the API does) or CoordinatorAgent")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Replay model latency and think time divided by this; 0 replays without waiting")
+    parser.add_argument("--concurrency", type=int, default=64, help="Sessions replayed at once")
+    parser.add_argument("--sessions", type=int, help="Only replay the first N sessions")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--diffs", help="Write the diverged turns, with both versions, as JSON lines")
+    parser.add_argument("--fail-on-divergence", action="store_true",
+                        help="Exit with status 1 when any replayed turn differs from the recording")
+    args = parser.parse_args(argv)
+
+    # Replayed provider failures log as errors on purpose; the report counts them
+    logging.basicConfig(level=logging.CRITICAL)
+
+    sessions = group_sessions(read_records(args.recording))
+    if args.sessions is not None:
+        sessions = dict(itertools.islice(sessions.items(), args.sessions))
+
+    report = asyncio.run(replay(sessions, args.target, args.speed, args.concurrency))
+    outcomes = report.pop("outcomes")
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    if args.diffs:
+        with open(args.diffs, "w") as diffs:
+            for outcome in outcomes:
+                if outcome.divergences:
+                    diffs.write(json.dumps(outcome.as_dict(), default=str) + "\n")
+
+    return 1 if args.fail_on_divergence and report["diverged_turns"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+import asyncio
+import sys
+import time
+from app.config.settings import configure_settings, get_settings
+from app.models.message import Message
+from app.models.state import ConversationState, initial_conversation_state
+from app.utils.circuit import CircuitBreaker
+from app.utils.recording import TurnRecord, capture_turn
+
+class ReplayedProviderError(RuntimeError):
+    """A model call that failed in the recording fails the same way on replay."""
+
+class ReplayMissError(RuntimeError):
+    """The pipeline made a model call the recording has no response for."""
+
+@dataclass
+class ReplayTurn:
+    """Recorded model responses for the turn being replayed, served in order."""
+    completions: List[Dict[str, Any]]
+    speed: float
+    served: int = 0
+    prompt_changed: bool = False
+
+    def next(self, prompt: List[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        if self.served >= len(self.completions):
+            self.served += 1
+            return None
+        completion = self.completions[self.served]
+        self.served += 1
+        if completion.get("prompt") is not None and completion["prompt"] != prompt:
+            self.prompt_changed = True
+        return completion
+
+_replay_turn: ContextVar[Optional[ReplayTurn]] = ContextVar("replay_turn", default=None)
+
+class ReplayProvider:
+    """
+    Stand-in for the async Groq client answering from the recording.
+
+    Each call returns the next recorded completion of the current turn,
+    after the recorded latency divided by the replay speed (no wait at
+    speed 0). Recorded failures are raised again so the pipeline takes the
+    same fallback path.
+    """
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, messages: List[Dict[str, str]], stream: bool = False, **kwargs: Any) -> Any:
+        turn = _replay_turn.get()
+        completion = turn.next(messages) if turn is not None else None
+        if completion is None:
+            raise ReplayMissError("No recorded completion for this call")
+        if turn.speed > 0:
+            await asyncio.sleep(completion["latency_ms"] / 1000 / turn.speed)
+        if completion["error"]:
+            raise ReplayedProviderError(completion["error"])
+
+        output = completion["output"] or ""
+        if stream:
+            return self._chunks(output)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=output))],
+            usage=None
+        )
+
+    async def _chunks(self, output: str) -> AsyncIterator[Any]:
+        words = output.split(" ")
+        for i, word in enumerate(words):
+            content = word if i == 0 else " " + word
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+@dataclass
+class TurnOutcome:
+    """A replayed turn compared with its recording."""
+    session_id: str
+    index: int
+    recorded_ms: float
+    replayed_ms: float
+    recorded_stages: Dict[str, float]
+    replayed_stages: Dict[str, float]
+    divergences: List[str] = field(default_factory=list)
+    recorded: Optional[Dict[str, Any]] = None
+    replayed: Optional[Dict[str, Any]] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "index": self.index,
+            "recorded_ms": round(self.recorded_ms, 3),
+            "replayed_ms": round(self.replayed_ms, 3),
+            "divergences": self.divergences,
+            "recorded": self.recorded,
+            "replayed": self.replayed
+        }
+
+def group_sessions(records: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Turn records grouped by session, each session in recorded order."""
+    sessions: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        sessions.setdefault(record["session_id"], []).append(record)
+    return sessions
+
+def compare_turn(recorded: Dict[str, Any], replayed: TurnRecord, turn: ReplayTurn) -> List[str]:
+    """Names of the outputs that differ between the recording and the replay."""
+    divergences = []
+    before, after = recorded.get("assessment"), replayed.assessment
+    if (before is None) != (after is None):
+        divergences.append("assessment")
+    elif before is not None:
+        if before["emotional_state"]["primary_emotion"] != after["emotional_state"]["primary_emotion"]:
+            divergences.append("emotion")
+        if abs(before["safety_status"]["risk_level"] - after["safety_status"]["risk_level"]) > 1e-9:
+            divergences.append("risk_level")
+    if turn.prompt_changed:
+        divergences.append("prompt")
+    if turn.served != len(recorded["completions"]):
+        divergences.append("model_calls")
+    recorded_content = (recorded.get("response") or {}).get("content")
+    replayed_content = (replayed.response or {}).get("content")
+    if recorded_content != replayed_content:
+        divergences.append("response")
+    return divergences
+
+class Replayer:
+    """
+    Run recorded sessions back through the pipeline with stubbed model responses.
+
+    Sessions replay concurrently (up to ``concurrency`` at a time) against one
+    shared ``TherapeuticFlow`` or ``CoordinatorAgent``, as in production; the
+    turns of a session run in order against that session's state. At
+    ``speed`` 0 nothing waits, otherwise model latency and the pauses between
+    a session's turns are replayed divided by ``speed``.
+    """
+
+    def __init__(self, target: str = "flow", speed: float = 0.0, concurrency: int = 64):
+        if target not in ("flow", "coordinator"):
+            raise ValueError(f"Unknown replay target: {target}")
+        # The therapist needs a key to construct; the provider is never called
+        if not get_settings().GROQ_API_KEY:
+            configure_settings(GROQ_API_KEY="replay")
+
+        self.target = target
+        self.speed = speed
+        self.concurrency = concurrency
+        if target == "flow":
+            from app.graphs.therapeutic_flow import TherapeuticFlow
+            self.flow = TherapeuticFlow()
+            self.coordinator = self.flow.coordinator
+            therapists = [self.flow.therapist, self.coordinator.therapist_agent]
+        else:
+            from app.agents.coordinator import CoordinatorAgent
+            self.flow = None
+            self.coordinator = CoordinatorAgent()
+            therapists = [self.coordinator.therapist_agent]
+
+        provider = ReplayProvider()
+        for therapist in therapists:
+            therapist.async_client = provider
+            # Recorded failures must not open the circuit and skew later turns
+            therapist.circuit = CircuitBreaker("replay", failure_threshold=sys.maxsize)
+
+    async def run(self, sessions: Dict[str, List[Dict[str, Any]]]) -> List[TurnOutcome]:
+        """Replay every session; outcomes are grouped by session, in turn order."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_session(session_id: str, records: List[Dict[str, Any]]) -> List[TurnOutcome]:
+            async with semaphore:
+                return await self.replay_session(session_id, records)
+
+        results = await asyncio.gather(*(
+            run_session(session_id, records) for session_id, records in sessions.items()
+        ))
+        return [outcome for outcomes in results for outcome in outcomes]
+
+    async def replay_session(self, session_id: str, records: List[Dict[str, Any]]) -> List[TurnOutcome]:
+        state = initial_conversation_state()
+        outcomes = []
+        previous: Optional[Dict[str, Any]] = None
+        for index, recorded in enumerate(records):
+            if self.speed > 0 and previous is not None:
+                pause = recorded["started_at"] - previous["started_at"] - previous["duration_ms"] / 1000
+                if pause > 0:
+                    await asyncio.sleep(pause / self.speed)
+            previous = recorded
+
+            message = Message.model_validate(recorded["message"])
+            turn = ReplayTurn(recorded["completions"], self.speed)
+            token = _replay_turn.set(turn)
+            try:
+                with capture_turn(session_id, recorded["channel"], message) as replayed:
+                    state = await self._run_turn(recorded["channel"], message, state)
+            finally:
+                _replay_turn.reset(token)
+
+            outcome = TurnOutcome(
+                session_id=session_id,
+                index=index,
+                recorded_ms=recorded["duration_ms"],
+                replayed_ms=replayed.duration_ms,
+                recorded_stages=recorded.get("stages", {}),
+                replayed_stages=replayed.stages,
+                divergences=compare_turn(recorded, replayed, turn)
+            )
+            if outcome.divergences:
+                outcome.recorded = {
+                    "assessment": recorded.get("assessment"),
+                    "response": recorded.get("response")
+                }
+                outcome.replayed = {"assessment": replayed.assessment, "response": replayed.response}
+            outcomes.append(outcome)
+        return outcomes
+
+    async def _run_turn(self, channel: str, message: Message, state: ConversationState) -> ConversationState:
+        """Run one turn the way it ran live, returning the session's next state."""
+        if self.flow is None:
+            _, state = await self.coordinator.process_message(message, state)
+            return state
+        if channel == "stream":
+            # The streaming path updates the given state in place
+            async for _ in self.flow.stream(message, state):
+                pass
+            return state
+        result = await self.flow.process(message, state)
+        return result["state"] or state
+
+def summarize_replay(
+    outcomes: List[TurnOutcome],
+    sessions: Dict[str, List[Dict[str, Any]]],
+    elapsed: float
+) -> Dict[str, Any]:
+    """Divergence counts, and recorded vs replayed latency overall and per stage."""
+    divergences: Dict[str, int] = {}
+    for outcome in outcomes:
+        for name in outcome.divergences:
+            divergences[name] = divergences.get(name, 0) + 1
+
+    starts = [records[0]["started_at"] for records in sessions.values() if records]
+    ends = [
+        records[-1]["started_at"] + records[-1]["duration_ms"] / 1000
+        for records in sessions.values() if records
+    ]
+    recorded_span = max(ends) - min(starts) if starts else 0.0
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    names = sorted({name for outcome in outcomes for name in (*outcome.recorded_stages, *outcome.replayed_stages)})
+    for name in names:
+        stages[name] = {
+            "recorded": _latency([o.recorded_stages[name] for o in outcomes if name in o.recorded_stages]),
+            "replayed": _latency([o.replayed_stages[name] for o in outcomes if name in o.replayed_stages])
+        }
+
+    return {
+        "sessions": len(sessions),
+        "turns": len(outcomes),
+        "diverged_turns": sum(1 for outcome in outcomes if outcome.divergences),
+        "divergences": divergences,
+        "elapsed_s": round(elapsed, 3),
+        "recorded_span_s": round(recorded_span, 3),
+        "speedup": round(recorded_span / elapsed, 1) if elapsed > 0 else None,
+        "turn_latency": {
+            "recorded": _latency([outcome.recorded_ms for outcome in outcomes]),
+            "replayed": _latency([outcome.replayed_ms for outcome in outcomes])
+        },
+        "stages": stages
+    }
+
+def _latency(values: List[float]) -> Optional[Dict[str, float]]:
+    """p50/p95/p99/max of millisecond values (nearest rank)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        return ordered[max(1, min(len(ordered), round(q / 100 * len(ordered) + 0.5))) - 1]
+
+    return {
+        "p50_ms": round(rank(50), 3),
+        "p95_ms": round(rank(95), 3),
+        "p99_ms": round(rank(99), 3),
+        "max_ms": round(ordered[-1], 3)
+    }
+
+async def replay(
+    sessions: Dict[str, List[Dict[str, Any]]],
+    target: str = "flow",
+    speed: float = 0.0,
+    concurrency: int = 64
+) -> Dict[str, Any]:
+    """Replay sessions and summarize; the outcomes are returned under ``outcomes``."""
+    replayer = Replayer(target, speed, concurrency)
+    start = time.perf_counter()
+    outcomes = await replayer.run(sessions)
+    elapsed = time.perf_counter() - start
+    summary = summarize_replay(outcomes, sessions, elapsed)
+    summary["target"] = target
+    summary["speed"] = speed
+    summary["outcomes"] = outcomes
+    return summary
@@ -2,7 +2,7 @@ import streamlit as st
 import sys
 import os
 from datetime import datetime
-import uuid
+from typing import NamedTuple, Optional
 import logging
 
 # Add the project root directory to the Python path
@@ -16,28 +16,101 @@ logger = logging.getLogger(__name__)
 
 # Now the imports should work
 from app.agents.coordinator import CoordinatorAgent
+from app.config.settings import configure_settings, watch_settings
 from app.models.message import Message
+from app.utils.event_loop import BackgroundLoop
+
+# Most recent messages rendered on every rerun; older ones are paged on demand
+RECENT_MESSAGES = 20
+HISTORY_PAGE_SIZE = 20
+
+class ChatBlock(NamedTuple):
+    """Render-ready view of a chat message, built once when it is added."""
+    role: str
+    content: str
+    caption: Optional[str]
+    crisis: bool
+
+def to_block(message: Message) -> ChatBlock:
+    """Derive everything the chat view needs from a message."""
+    metadata = message.metadata or {}
+    role = "user" if message.sender == "user" else "assistant"
+    caption = None
+    if role == "assistant" and metadata.get('therapeutic_intent'):
+        caption = f"Therapeutic approach: {metadata['therapeutic_intent']}"
+    return ChatBlock(role, message.content, caption, role == "assistant" and bool(metadata.get('crisis')))
+
+def add_message(message: Message) -> ChatBlock:
+    """Record a message and its render block."""
+    block = to_block(message)
+    st.session_state.messages.append(message)
+    st.session_state.blocks.append(block)
+    return block
+
+def render_block(block: ChatBlock):
+    """Render one message body inside the current chat container."""
+    st.markdown(block.content)
+    if block.caption:
+        st.caption(block.caption)
+    if block.crisis:
+        st.error("⚠️ Crisis Support Resources ⚠️")
+        st.info("Emergency: 911 | Crisis Hotline: 988")
+
+def render_history():
+    """Render recent messages; older history is collapsed and paged."""
+    blocks = st.session_state.blocks
+    older, recent = blocks[:-RECENT_MESSAGES], blocks[-RECENT_MESSAGES:]
+    
+    if older and st.toggle(f"Show {len(older)} earlier messages", key="show_history"):
+        pages = (len(older) + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+        page = 1
+        if pages > 1:
+            page = int(st.number_input("Page (1 = most recent)", 1, pages, 1, key="history_page"))
+        end = len(older) - (page - 1) * HISTORY_PAGE_SIZE
+        for block in older[max(0, end - HISTORY_PAGE_SIZE):end]:
+            with st.chat_message(block.role):
+                render_block(block)
+        st.divider()
+    
+    for block in recent:
+        with st.chat_message(block.role):
+            render_block(block)
+
+def load_secrets() -> dict:
+    """Read top-level Streamlit secrets, if any are configured."""
+    try:
+        return {key: value for key, value in st.secrets.items() if isinstance(value, (str, int, float, bool))}
+    except FileNotFoundError:
+        return {}
+
+@st.cache_resource
+def get_coordinator() -> CoordinatorAgent:
+    """Coordinator (and its Groq clients) shared by every browser session."""
+    # Load configuration, letting Streamlit secrets override the environment
+    configure_settings(**load_secrets())
+    watch_settings()
+    logger.info("Configuration loaded successfully")
+    
+    logger.info("Initializing coordinator...")
+    coordinator = CoordinatorAgent()
+    logger.info("Coordinator initialized successfully")
+    return coordinator
+
+@st.cache_resource
+def get_event_loop() -> BackgroundLoop:
+    """Long-lived event loop that every session submits its turns to."""
+    return BackgroundLoop(name="streamlit-agents").start()
 
 def init_session_state():
     """Initialize session state with better error handling"""
     if 'initialized' not in st.session_state:
         try:
-            # Load configuration from Streamlit secrets
-            st.session_state.config = {
-                "GROQ_API_KEY": st.secrets["GROQ_API_KEY"],
-                "MODEL_NAME": st.secrets.get("MODEL_NAME", "mixtral-8x7b-32768"),
-                "MAX_HISTORY": int(st.secrets.get("MAX_HISTORY", 10)),
-                "CRISIS_THRESHOLD": float(st.secrets.get("CRISIS_THRESHOLD", 0.7))
-            }
-            logger.info("Configuration loaded successfully")
+            # Surface configuration errors before the first message
+            get_coordinator()
             
-            # Initialize messages list
+            # Initialize messages list and their render blocks
             st.session_state.messages = []
-            
-            # Initialize coordinator
-            logger.info("Initializing coordinator...")
-            st.session_state.coordinator = CoordinatorAgent()
-            logger.info("Coordinator initialized successfully")
+            st.session_state.blocks = []
             
             # Initialize conversation state
             st.session_state.conversation_state = None
@@ -62,39 +135,29 @@ def main():
         st.stop()
     
     # Display chat messages
-    for message in st.session_state.messages:
-        with st.chat_message(message.sender):
-            st.markdown(message.content)
-            if message.sender == "assistant":
-                if message.metadata and message.metadata.get('therapeutic_intent'):
-                    st.caption(f"Therapeutic approach: {message.metadata['therapeutic_intent']}")
-                if message.metadata and message.metadata.get('crisis'):
-                    st.error("⚠️ Crisis Support Resources ⚠️")
-                    st.info("Emergency: 911 | Crisis Hotline: 988")
+    render_history()
     
     # Chat input
     if prompt := st.chat_input("Type your message here..."):
         # Add user message
         user_message = Message(
-            id=str(uuid.uuid4()),
             content=prompt,
             sender="user",
             timestamp=datetime.now().timestamp(),
             metadata={}
         )
-        st.session_state.messages.append(user_message)
+        user_block = add_message(user_message)
         
         # Display user message
         with st.chat_message("user"):
-            st.markdown(prompt)
+            render_block(user_block)
         
         # Generate and display response
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
                 try:
-                    import asyncio
-                    response_message, new_state = asyncio.run(
-                        st.session_state.coordinator.process_message(
+                    response_message, new_state = get_event_loop().run(
+                        get_coordinator().process_message(
                             user_message,
                             st.session_state.conversation_state
                         )
@@ -102,19 +165,10 @@ def main():
                     
                     # Update state and messages
                     st.session_state.conversation_state = new_state
-                    st.session_state.messages.append(response_message)
                     
-                    # Display response
-                    st.markdown(response_message.content)
+                    # Display response and its metadata
+                    render_block(add_message(response_message))
                     
-                    # Display metadata if available
-                    if response_message.metadata:
-                        if response_message.metadata.get('therapeutic_intent'):
-                            st.caption(f"Therapeutic approach: {response_message.metadata['therapeutic_intent']}")
-                        if response_message.metadata.get('crisis'):
-                            st.error("⚠️ Crisis Support Resources ⚠️")
-                            st.info("Emergency: 911 | Crisis Hotline: 988")
-                            
                 except Exception as e:
                     logger.error(f"Error generating response: {e}", exc_info=True)
                     st.error("Failed to generate response. Please try again.")
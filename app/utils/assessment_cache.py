@@ -0,0 +1,82 @@
+from typing import TYPE_CHECKING, Dict, Hashable, Optional
+from collections import OrderedDict
+import threading
+
+from app.config.settings import get_settings
+from app.utils import metrics
+
+if TYPE_CHECKING:
+    from app.models.runtime import TextAssessment
+
+class AssessmentCache:
+    """
+    Bounded LRU cache of message-level ``TextAssessment`` results.
+
+    Keys are built by ``AssessmentAgent`` from the assessor version and the
+    normalized message text; only history-independent results are stored,
+    so session history risk is still applied on every turn. Lookups happen
+    on the event loop, like the idempotency cache, so there is no locking.
+    ``max_entries`` 0 disables caching.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        # key -> assessment, least recently used first
+        self._entries: "OrderedDict[Hashable, TextAssessment]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional["TextAssessment"]:
+        assessment = self._entries.get(key)
+        if assessment is None:
+            self.misses += 1
+            metrics.ASSESSMENT_CACHE_MISSES.inc()
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        metrics.ASSESSMENT_CACHE_HITS.inc()
+        return assessment
+
+    def put(self, key: Hashable, assessment: "TextAssessment"):
+        self._entries[key] = assessment
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hit_ratio(), 4)
+        }
+
+_cache: Optional[AssessmentCache] = None
+_cache_lock = threading.Lock()
+
+def get_assessment_cache() -> AssessmentCache:
+    """Shared cache sized by ASSESSMENT_CACHE_SIZE."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AssessmentCache(get_settings().ASSESSMENT_CACHE_SIZE)
+    return _cache
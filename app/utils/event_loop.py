@@ -0,0 +1,50 @@
+from typing import Any, Coroutine, Optional
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class BackgroundLoop:
+    """
+    A long-lived asyncio event loop running in a daemon thread.
+    
+    Synchronous code (e.g. a Streamlit script) submits coroutines with
+    ``run`` instead of paying for a new loop per call via ``asyncio.run``.
+    """
+    
+    def __init__(self, name: str = "background-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_forever, name=name, daemon=True)
+        self._started = threading.Event()
+    
+    def start(self) -> "BackgroundLoop":
+        """Start the loop thread (idempotent)."""
+        if not self._thread.is_alive():
+            self._thread.start()
+            self._started.wait()
+        return self
+    
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and block until it finishes."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+    
+    def stop(self):
+        """Stop the loop and wait for its thread to exit."""
+        if self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+    
+    def _run_forever(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._started.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+            logger.info("Background event loop stopped")
@@ -0,0 +1,146 @@
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import os
+import threading
+
+from app.config.settings import get_settings
+
+if TYPE_CHECKING:
+    from app.agents.assessor import AssessmentAgent, ScoringConfig
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+# Agents of a process-pool worker, one per scoring config it was sent
+_worker_agents: Dict["ScoringConfig", "AssessmentAgent"] = {}
+
+def _warm_lexicon():
+    from app.agents.assessor import sentiment
+
+    sentiment("Warming up the sentiment lexicon.")
+
+def _init_worker():
+    """Process initializer: build the default-configured agent and load the lexicon."""
+    from app.agents.assessor import AssessmentAgent
+
+    agent = AssessmentAgent()
+    _worker_agents[agent.scoring_config()] = agent
+    _warm_lexicon()
+
+def _call_worker(config: "ScoringConfig", method: str, *args: Any) -> Any:
+    agent = _worker_agents.get(config)
+    if agent is None:
+        from app.agents.assessor import AssessmentAgent
+
+        agent = _worker_agents[config] = AssessmentAgent.from_scoring_config(config)
+    return getattr(agent, method)(*args)
+
+def _ready() -> bool:
+    return True
+
+class AssessmentExecutor:
+    """
+    Where ``AssessmentAgent``'s CPU work (sentiment, keyword scanning) runs.
+
+    - ``inline``: on the calling thread, i.e. the event loop (the default)
+    - ``thread``: a thread pool; keeps the loop responsive between calls,
+      but the work still shares the GIL
+    - ``process``: a process pool, so assessment scales across cores.
+      Calls send the agent's ``scoring_config`` and the method to run
+      rather than the agent; each worker keeps one agent per config, so a
+      customized agent scores the same as inline.
+
+    Pools start on first use, or ahead of traffic with ``start``, which also
+    loads the lexicon in every worker.
+    """
+
+    def __init__(self, mode: str = "inline", workers: Optional[int] = None):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode {mode!r}; expected one of {EXECUTOR_MODES}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.submitted = 0
+        self.in_flight = 0
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.mode == "thread":
+                        self._pool = ThreadPoolExecutor(
+                            self.workers,
+                            thread_name_prefix="assessment",
+                            initializer=_warm_lexicon
+                        )
+                    else:
+                        # spawn: workers don't inherit the server's threads and sockets
+                        self._pool = ProcessPoolExecutor(
+                            self.workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=_init_worker
+                        )
+                    logger.info(f"Started {self.mode} assessment executor with {self.workers} workers")
+        return self._pool
+
+    async def start(self):
+        """Start the pool and wait until every worker is initialized (no-op inline)."""
+        if self.mode == "inline":
+            return
+        pool = self._get_pool()
+        loop = asyncio.get_running_loop()
+        # One call per worker makes the pool spawn all of them
+        await asyncio.gather(*(loop.run_in_executor(pool, _ready) for _ in range(self.workers)))
+
+    async def call(self, assessor: "AssessmentAgent", method: str, *args: Any) -> Any:
+        """Run ``assessor.<method>(*args)`` in this executor."""
+        self.submitted += 1
+        if self.mode == "inline":
+            return getattr(assessor, method)(*args)
+
+        loop = asyncio.get_running_loop()
+        if self.mode == "thread":
+            # Keep the caller's span (trace parent) and metrics suppression
+            func = partial(contextvars.copy_context().run, getattr(assessor, method), *args)
+        else:
+            func = partial(_call_worker, assessor.scoring_config(), method, *args)
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self._get_pool(), func)
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers if self.mode != "inline" else 0,
+            "started": self._pool is not None,
+            "submitted": self.submitted,
+            "in_flight": self.in_flight
+        }
+
+_executor: Optional[AssessmentExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_assessment_executor() -> AssessmentExecutor:
+    """Shared executor configured by ASSESSMENT_EXECUTOR and ASSESSMENT_WORKERS."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                settings = get_settings()
+                _executor = AssessmentExecutor(settings.ASSESSMENT_EXECUTOR, settings.ASSESSMENT_WORKERS)
+    return _executor
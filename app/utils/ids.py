@@ -0,0 +1,56 @@
+import os
+import threading
+import time
+
+# ULID layout: 48-bit millisecond timestamp + 80 random bits, Crockford base32
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_LIMIT = 1 << _RANDOM_BITS
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+def new_id() -> str:
+    """
+    Generate a ULID-style message id.
+
+    Ids are 26-character strings that sort lexicographically by creation
+    time. Within one millisecond the random part is incremented rather than
+    redrawn, so ids from this process are strictly increasing and never
+    collide, even across threads.
+    """
+    global _last_ms, _last_random
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            _last_random = int.from_bytes(os.urandom(10), "big")
+        else:
+            # Same millisecond (or the clock stepped back): stay monotonic
+            _last_random += 1
+            if _last_random >= _RANDOM_LIMIT:
+                _last_ms += 1
+                _last_random = int.from_bytes(os.urandom(10), "big")
+        value = (_last_ms << _RANDOM_BITS) | _last_random
+
+    chars = []
+    for _ in range(26):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+def id_time(message_id: str) -> float:
+    """Creation time (Unix seconds) encoded in an id from ``new_id``."""
+    ms = 0
+    for char in message_id[:10]:
+        ms = (ms << 5) | _ALPHABET.index(char)
+    return ms / 1000
+
+def _reset_after_fork():
+    # A forked child must not continue the parent's sequence
+    global _last_ms, _last_random
+    _last_ms, _last_random = 0, 0
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
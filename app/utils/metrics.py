@@ -0,0 +1,262 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+import math
+
+from app.utils.tracing import Span, tracer
+
+# Metric updates are plain attribute arithmetic with no locks: recording
+# happens on the event loop thread, and a rare lost increment from a worker
+# thread is acceptable for monitoring data.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+class Counter:
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        return [f"{name}{labels} {_format(self.value)}"]
+
+class Gauge:
+    """Value that goes up and down, or is read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the value when metrics are collected."""
+        self.function = function
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        value = self.function() if self.function is not None else self.value
+        return [f"{name}{labels} {_format(value)}"]
+
+class Histogram:
+    """Observations counted into fixed cumulative buckets."""
+
+    kind = "histogram"
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        # One count per bucket plus +Inf; made cumulative only when rendered
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        inner = labels[1:-1] + "," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == math.inf else _format(bound)
+            lines.append(f'{name}_bucket{{{inner}le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{labels} {_format(self.sum)}")
+        lines.append(f"{name}_count{labels} {self.count}")
+        return lines
+
+class Family:
+    """A named metric and its children, one per label combination."""
+
+    def __init__(self, factory: Callable[[], object], name: str, help: str, labels: Sequence[str] = ()):
+        self.factory = factory
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.kind = factory().kind
+        self._children: Dict[LabelValues, object] = {}
+
+    def labels(self, *values: str):
+        """Child metric for the given label values (created once, then reused)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            child = self._children[values] = self.factory()
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            labels = ""
+            if values:
+                labels = "{" + ",".join(
+                    f'{key}="{_escape(value)}"' for key, value in zip(self.label_names, values)
+                ) + "}"
+            lines.extend(child.samples(self.name, labels))
+        return lines
+
+class Registry:
+    """Collection of metric families rendered in the Prometheus text format."""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._families: Dict[str, Family] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Family:
+        """Register a counter; ``_total`` is appended to the name."""
+        return self._register(Family(Counter, name + "_total", help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Family:
+        return self._register(Family(Gauge, name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Family:
+        return self._register(Family(lambda: Histogram(buckets), name, help, labels))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, family: Family) -> Family:
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} is already registered")
+        self._families[family.name] = family
+        return family
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+registry = Registry()
+
+# Pipeline metrics, recorded from finished tracing spans
+STAGE_SECONDS = registry.histogram(
+    "chat_stage_duration_seconds",
+    "Latency of one pipeline stage",
+    ["stage"]
+)
+TURN_SECONDS = registry.histogram(
+    "chat_turn_duration_seconds",
+    "End-to-end latency of a turn",
+    ["channel"]
+)
+TTFT_SECONDS = registry.histogram(
+    "chat_time_to_first_token_seconds",
+    "Time from receiving a streamed turn to its first generated token"
+).labels()
+TURNS = registry.counter("chat_turns", "Turns processed", ["channel"])
+CRISES = registry.counter("chat_crisis_turns", "Turns handled as a crisis").labels()
+FALLBACKS = registry.counter(
+    "chat_fallback_responses",
+    "Turns answered with a fallback because generation failed"
+).labels()
+VALIDATION_RETRIES = registry.counter(
+    "chat_validation_retries",
+    "Regenerations after a response failed validation"
+).labels()
+TOKENS = registry.counter("chat_tokens", "Completion tokens used, as reported by the provider").labels()
+
+# Message-level assessment cache (see app.utils.assessment_cache)
+ASSESSMENT_CACHE_HITS = registry.counter(
+    "assessment_cache_hits",
+    "Message texts whose assessment was served from the cache"
+).labels()
+ASSESSMENT_CACHE_MISSES = registry.counter(
+    "assessment_cache_misses",
+    "Message texts that had to be scored"
+).labels()
+
+# Span name -> stage or channel label
+_STAGES = {
+    "flow.assess": "assessment",
+    "flow.generate_response": "generation",
+    "flow.stream_response": "generation",
+    "flow.validate_response": "validation"
+}
+_TURNS = {
+    "ws.turn": "websocket",
+    "rest.turn": "rest",
+    "rest.stream": "stream",
+    "batch.item": "batch"
+}
+_stage_children = {name: STAGE_SECONDS.labels(stage) for name, stage in _STAGES.items()}
+_turn_children = {name: (TURN_SECONDS.labels(channel), TURNS.labels(channel)) for name, channel in _TURNS.items()}
+
+# Set while synthetic work (e.g. the startup warmup turn) runs
+_suppressed: ContextVar[bool] = ContextVar("metrics_suppressed", default=False)
+
+@contextmanager
+def suppressed():
+    """Keep the spans finished in this block (and tasks it starts) out of the metrics."""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+def observe_span(span: Span):
+    """Tracer listener turning spans into pipeline metrics."""
+    if _suppressed.get():
+        return
+    seconds = span.duration_ms / 1000
+    stage = _stage_children.get(span.name)
+    if stage is not None:
+        stage.observe(seconds)
+    turn = _turn_children.get(span.name)
+    if turn is not None:
+        turn[0].observe(seconds)
+        turn[1].inc()
+
+    attributes = span.attributes
+    if not attributes and span.error is None:
+        return
+    if "ttft_ms" in attributes:
+        TTFT_SECONDS.observe(attributes["ttft_ms"] / 1000)
+    if "total_tokens" in attributes:
+        TOKENS.inc(attributes["total_tokens"])
+    if attributes.get("crisis"):
+        CRISES.inc()
+    if attributes.get("attempt", 1) > 1:
+        VALIDATION_RETRIES.inc()
+    if span.error is not None and span.name in ("therapist.completion", "flow.stream_response"):
+        FALLBACKS.inc()
+
+_installed = False
+
+def install():
+    """Start recording pipeline metrics from tracing spans (idempotent)."""
+    global _installed
+    if not _installed:
+        tracer.add_listener(observe_span)
+        _installed = True
@@ -0,0 +1,165 @@
+from typing import Any, Dict, Iterator, List, Optional
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+import cProfile
+import io
+import logging
+import marshal
+import os
+import pstats
+import secrets
+import sys
+import threading
+import time
+
+from app.utils.ids import new_id
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class ProfileArtifact:
+    """Profile of one flagged turn."""
+    id: str
+    label: str
+    created_at: float
+    duration_ms: float
+    pstats: bytes
+    collapsed: str
+    samples: int
+
+    def summary(self, limit: int = 40) -> str:
+        """Top functions by cumulative time, as printed by pstats."""
+        stream = io.StringIO()
+        stats = pstats.Stats(_StatsSource(marshal.loads(self.pstats)), stream=stream)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def as_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "created_at": self.created_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "samples": self.samples
+        }
+
+class _StatsSource:
+    """Adapter letting pstats.Stats load raw stats without a file."""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+class StackSampler(threading.Thread):
+    """
+    Sample one thread's Python stack at a fixed interval.
+
+    The result is in the collapsed-stack format (``frame;frame;frame count``)
+    read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> str:
+        self._stop_event.set()
+        self.join()
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+class ProfileStore:
+    """
+    Runs flagged turns under the profilers and keeps the last ``capacity`` artifacts.
+
+    Each profiled turn gets a deterministic cProfile run (downloadable as a
+    ``.pstats`` file) and a stack sampler on the same thread (collapsed
+    stacks for flamegraphs). Both see the whole thread, so work for other
+    sessions sharing the event loop during the turn is included.
+    """
+
+    def __init__(self, capacity: int = 20, sample_interval: float = 0.005):
+        self.capacity = capacity
+        self.sample_interval = sample_interval
+        self._artifacts: "OrderedDict[str, ProfileArtifact]" = OrderedDict()
+        # Only one profiler can be active per interpreter
+        self._busy = threading.Lock()
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[Optional[str]]:
+        """
+        Profile the enclosed block.
+
+        Yields:
+            The artifact id, or None when another profile is already running
+            (the block then runs unprofiled)
+        """
+        if not self._busy.acquire(blocking=False):
+            logger.warning(f"Skipping profile of {label}: another profile is running")
+            yield None
+            return
+
+        artifact_id = new_id()
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident(), self.sample_interval)
+        created_at = time.time()
+        start = time.perf_counter()
+        try:
+            sampler.start()
+            profiler.enable()
+            try:
+                yield artifact_id
+            finally:
+                profiler.disable()
+                duration_ms = (time.perf_counter() - start) * 1000
+                collapsed = sampler.stop()
+                profiler.create_stats()
+                self._store(ProfileArtifact(
+                    id=artifact_id,
+                    label=label,
+                    created_at=created_at,
+                    duration_ms=duration_ms,
+                    pstats=marshal.dumps(profiler.stats),
+                    collapsed=collapsed,
+                    samples=sum(sampler.stacks.values())
+                ))
+                logger.info(f"Stored profile {artifact_id} for {label} ({duration_ms:.1f} ms)")
+        finally:
+            self._busy.release()
+
+    def get(self, artifact_id: str) -> Optional[ProfileArtifact]:
+        return self._artifacts.get(artifact_id)
+
+    def list(self) -> List[Dict]:
+        """Stored profiles, newest first."""
+        return [artifact.as_dict() for artifact in reversed(self._artifacts.values())]
+
+    def _store(self, artifact: ProfileArtifact):
+        self._artifacts[artifact.id] = artifact
+        while len(self._artifacts) > self.capacity:
+            self._artifacts.popitem(last=False)
+
+def profiling_authorized(token: Any, expected: Optional[str]) -> bool:
+    """Whether a debug-profile token matches the configured one (profiling is off when unset)."""
+    # WebSocket clients can send any JSON value as the token
+    if not isinstance(token, str) or not token or not expected:
+        return False
+    # Compare bytes: compare_digest rejects non-ASCII str, and headers are
+    # decoded as latin-1, so any byte >= 0x80 would otherwise be a 500
+    return secrets.compare_digest(token.encode(), expected.encode())
@@ -0,0 +1,203 @@
+from typing import IO, Any, Dict, Iterator, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import gzip
+import json
+import logging
+import threading
+import time
+import zlib
+
+from app.utils.tracing import Span, tracer
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the record layout changes incompatibly
+RECORD_VERSION = 1
+
+@dataclass(slots=True)
+class TurnRecord:
+    """Everything needed to replay one turn: input, intermediate results, output and timing."""
+    session_id: str
+    channel: str
+    message: Dict[str, Any]
+    started_at: float
+    assessment: Optional[Dict[str, Any]] = None
+    completions: List[Dict[str, Any]] = field(default_factory=list)
+    response: Optional[Dict[str, Any]] = None
+    duration_ms: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+
+    def set_assessment(self, emotional_state: Any, safety_status: Any):
+        self.assessment = {
+            "emotional_state": emotional_state.model_dump(mode="json"),
+            "safety_status": safety_status.model_dump(mode="json")
+        }
+
+    def add_completion(
+        self,
+        prompt: List[Dict[str, str]],
+        output: Optional[str],
+        latency_ms: float,
+        stream: bool = False,
+        error: Optional[str] = None
+    ):
+        """A model call: the prompt sent, and the text returned or the error raised."""
+        self.completions.append({
+            "prompt": prompt,
+            "output": output,
+            "latency_ms": round(latency_ms, 3),
+            "stream": stream,
+            "error": error
+        })
+
+    def set_response(self, response: Any):
+        self.response = response.model_dump(mode="json")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "v": RECORD_VERSION,
+            "session_id": self.session_id,
+            "channel": self.channel,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "message": self.message,
+            "assessment": self.assessment,
+            "completions": self.completions,
+            "response": self.response,
+            "stages": {name: round(ms, 3) for name, ms in self.stages.items()}
+        }
+
+_current_turn: ContextVar[Optional[TurnRecord]] = ContextVar("current_turn", default=None)
+
+def current_turn() -> Optional[TurnRecord]:
+    """The turn being recorded in this context, if recording is on."""
+    return _current_turn.get()
+
+@contextmanager
+def capture_turn(session_id: str, channel: str, message: Any) -> Iterator[TurnRecord]:
+    """Collect the record of the turn run inside the block, without writing it anywhere."""
+    record = TurnRecord(
+        session_id=session_id,
+        channel=channel,
+        message=message.model_dump(mode="json"),
+        started_at=time.time()
+    )
+    token = _current_turn.set(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.duration_ms = (time.perf_counter() - start) * 1000
+        try:
+            _current_turn.reset(token)
+        except ValueError:
+            # Closed from another context, e.g. an abandoned async generator
+            pass
+
+def _collect_stage(span: Span):
+    """Add a finished span's duration to the turn being captured, if any."""
+    record = _current_turn.get()
+    if record is not None:
+        record.stages[span.name] = record.stages.get(span.name, 0.0) + span.duration_ms
+
+tracer.add_listener(_collect_stage)
+
+class SessionRecorder:
+    """
+    Append each turn of sampled sessions to a JSON-lines log for replay.
+
+    Off until ``open`` is called. Sessions are sampled by a hash of their id,
+    so a sampled session is captured in full. Stage timings are collected
+    from the tracing spans finished during the turn. Paths ending in ``.gz``
+    are written gzip-compressed.
+    """
+
+    def __init__(self):
+        self.path: Optional[str] = None
+        self.sample_rate = 1.0
+        self.recorded = 0
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    def open(self, path: str, sample_rate: float = 1.0):
+        """Start recording to ``path`` (appending)."""
+        with self._lock:
+            if self._file is not None:
+                return
+            if path.endswith(".gz"):
+                self._file = gzip.open(path, "at", encoding="utf-8")
+            else:
+                self._file = open(path, "a", encoding="utf-8")
+            self.path = path
+            self.sample_rate = sample_rate
+        logger.info(f"Recording sessions to {path} (sample rate {sample_rate})")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def sampled(self, session_id: str) -> bool:
+        """Whether a session is recorded; stable for the session's lifetime."""
+        if self.sample_rate >= 1.0:
+            return True
+        return zlib.crc32(session_id.encode()) / 2**32 < self.sample_rate
+
+    @contextmanager
+    def turn(self, session_id: str, channel: str, message: Any) -> Iterator[Optional[TurnRecord]]:
+        """
+        Record the turn run inside the block.
+
+        Yields:
+            The turn record, or None when recording is off or the session isn't sampled
+        """
+        if self._file is None or not self.sampled(session_id):
+            yield None
+            return
+
+        record = None
+        try:
+            with capture_turn(session_id, channel, message) as record:
+                yield record
+        finally:
+            if record is not None:
+                self._write(record)
+
+    def _write(self, record: TurnRecord):
+        line = json.dumps(record.as_dict(), separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._file.write(line)
+                self._file.flush()
+                self.recorded += 1
+            except Exception as e:
+                logger.error(f"Failed to record turn: {e}")
+
+recorder = SessionRecorder()
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Turn records from a recording, in the order they were written."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fp:
+        for line in fp:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn last line from an interrupted writer
+                logger.warning(f"Skipping unreadable record in {path}")
+                continue
+            if record.get("v") != RECORD_VERSION:
+                raise ValueError(f"Unsupported record version {record.get('v')} in {path}")
+            yield record
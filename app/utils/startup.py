@@ -0,0 +1,65 @@
+from typing import Dict, List, Optional
+from contextlib import contextmanager
+import json
+import logging
+import subprocess
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# Dependencies that are expensive to import and should load only on first use
+HEAVY_MODULES = ["textblob", "langgraph", "groq", "streamlit", "transformers"]
+
+class StartupReport:
+    """Timings of named startup phases, plus which heavy modules got loaded."""
+    
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self._started = time.perf_counter()
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block of startup work under ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+    
+    def as_dict(self) -> Dict:
+        """Phase durations in seconds and the heavy modules imported so far."""
+        return {
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "elapsed": round(time.perf_counter() - self._started, 4),
+            "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in sys.modules]
+        }
+    
+    def log(self):
+        logger.info(f"Startup report: {json.dumps(self.as_dict())}")
+
+startup_report = StartupReport()
+
+def measure_import(module: str, python: Optional[str] = None) -> Optional[float]:
+    """Cold import time of a module in a fresh interpreter, or None if it fails."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [python or sys.executable, "-c", code],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+def import_report(modules: List[str]) -> Dict[str, Optional[float]]:
+    """Cold import times for several modules."""
+    return {module: measure_import(module) for module in modules}
+
+if __name__ == "__main__":
+    # python -m app.utils.startup [module ...]
+    targets = sys.argv[1:] or ["app.main", "app.agents", "app.graphs", *HEAVY_MODULES]
+    print(json.dumps(import_report(targets), indent=2))
@@ -0,0 +1,187 @@
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TextIO, TypeVar
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+import itertools
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+@dataclass(slots=True)
+class Span:
+    """One timed stage of a turn."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_time: float
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, key: str, value: Any):
+        """Attach an attribute, e.g. a token count or retry number."""
+        self.attributes[key] = value
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration_ms, 3),
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+SpanListener = Callable[[Span], None]
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+class Tracer:
+    """
+    In-process span recorder.
+
+    Spans nest through a context variable, so a span opened inside a graph
+    node becomes a child of the node's span and shares its trace id (the
+    turn's correlation id). Finished spans go into a ring buffer of the last
+    ``capacity`` spans and to any registered listeners.
+    """
+
+    def __init__(self, capacity: int = 2048):
+        self._spans: Deque[Span] = deque(maxlen=capacity)
+        self._listeners: List[SpanListener] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, trace_id: Optional[str] = None, **attributes: Any):
+        """
+        Time a block as a span.
+
+        Args:
+            name: Stage name, e.g. ``flow.assess``
+            trace_id: Correlation id; starts a new trace. Defaults to the
+                enclosing span's trace id.
+            attributes: Initial span attributes
+        """
+        parent = _current_span.get()
+        if trace_id is None:
+            trace_id = parent.trace_id if parent else f"{next(self._ids):x}"
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=f"{next(self._ids):x}",
+            parent_id=parent.span_id if parent else None,
+            start_time=time.time(),
+            attributes=attributes
+        )
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Closed from another context, e.g. an abandoned async generator
+                pass
+            self._finish(span)
+
+    def traced(self, name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+        """Decorator running a coroutine function inside a span."""
+        def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+            @wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> T:
+                with self.span(name):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def add_listener(self, listener: SpanListener):
+        """Call ``listener`` with every finished span."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: SpanListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def recent(self, limit: int = 200, trace_id: Optional[str] = None) -> List[Span]:
+        """Most recent finished spans, oldest first, optionally for one trace."""
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id is not None:
+            spans = [span for span in spans if span.trace_id == trace_id]
+        return spans[-limit:]
+
+    def dump(self, fp: TextIO, trace_id: Optional[str] = None):
+        """Write buffered spans as JSON lines."""
+        for span in self.recent(self._spans.maxlen or 0, trace_id):
+            fp.write(json.dumps(span.as_dict(), default=str) + "\n")
+
+    def resize(self, capacity: int):
+        """Change the ring buffer size, keeping the most recent spans."""
+        with self._lock:
+            self._spans = deque(self._spans, maxlen=capacity)
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+        for listener in self._listeners:
+            try:
+                listener(span)
+            except Exception as e:
+                logger.debug(f"Span listener failed: {e}")
+
+tracer = Tracer()
+
+def current_span() -> Optional[Span]:
+    """The innermost open span in this context, if any."""
+    return _current_span.get()
+
+def enable_opentelemetry(service_name: str = "therapeutic-chat") -> bool:
+    """
+    Mirror finished spans to OpenTelemetry, if the API is installed.
+
+    Spans are re-emitted with their recorded start and end times and
+    attributes; the SDK/exporter configuration is left to the deployment.
+
+    Returns:
+        True when the hook was registered
+    """
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        logger.warning("OpenTelemetry tracing requested but opentelemetry-api is not installed")
+        return False
+
+    otel_tracer = trace.get_tracer(service_name)
+
+    def export(span: Span):
+        start_ns = int(span.start_time * 1e9)
+        otel_span = otel_tracer.start_span(
+            span.name,
+            start_time=start_ns,
+            attributes={
+                "correlation_id": span.trace_id,
+                **{k: v for k, v in span.attributes.items() if isinstance(v, (str, bool, int, float))}
+            }
+        )
+        if span.error:
+            otel_span.set_attribute("error.type", span.error)
+        otel_span.end(end_time=start_ns + int(span.duration_ms * 1e6))
+
+    tracer.add_listener(export)
+    return True
@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+# The agents need a provider key to construct; tests never reach the provider.
+# Warmup stays off so the app under test serves immediately.
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("WARMUP_ENABLED", "false")
+
+API_KEY = "key"
+PROFILE_TOKEN = "s3cret"
+
+@pytest.fixture
+def client():
+    """The app with API key and profiling auth configured and a canned provider."""
+    from fastapi.testclient import TestClient
+    from app.api.routes import chat_handler
+    from app.api.warmup import FakeProvider
+    from app.config.settings import configure_settings
+    from app.main import app
+
+    configure_settings(API_KEY=API_KEY, PROFILE_TOKEN=PROFILE_TOKEN)
+    therapist = chat_handler.flow.therapist
+    provider = therapist._async_client
+    therapist.async_client = FakeProvider()
+    # No context manager: the lifespan (warmup, watchers) isn't needed here
+    yield TestClient(app)
+    therapist.async_client = provider
+    configure_settings(API_KEY=None, PROFILE_TOKEN=None)
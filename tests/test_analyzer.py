@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+from app.agents.assessor import AssessmentAgent
+from app.analyzer.scoring import score_chunk
+from app.models.message import HistoryEntry, Message
+from app.utils.assessment_cache import AssessmentCache
+from app.utils.executor import AssessmentExecutor
+
+TRANSCRIPT = [
+    {"sender": "user", "content": "This is awful"},
+    {"sender": "user", "content": "Everything  is horrible"},
+    {"sender": "user", "content": "I feel terrible"},
+    {"sender": "bot", "content": "Thank you for telling me."},
+    {"sender": "user", "content": "ok"}
+]
+
+async def _live_risks():
+    """Risk levels as CoordinatorAgent computes them: history includes the message."""
+    agent = AssessmentAgent(AssessmentExecutor("inline"), AssessmentCache(0))
+    history, risks = [], []
+    for item in TRANSCRIPT:
+        message = Message(content=item["content"], timestamp=time.time(), sender=item["sender"])
+        history.append(HistoryEntry.from_message(message))
+        if item["sender"] == "user":
+            _, safety_status = await agent.analyze(message, history)
+            risks.append(safety_status.risk_level)
+    return risks
+
+def test_offline_risk_matches_the_live_path():
+    _, messages, _ = score_chunk(0, [("session", TRANSCRIPT)], crisis_threshold=0.7)
+    live = asyncio.run(_live_risks())
+    assert [result["risk_level"] for result in messages] == live
+    # Three very negative messages in a row outweigh each one's own risk
+    assert live[2] > live[1]
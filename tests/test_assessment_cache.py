@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from app.agents import assessor
+from app.agents.assessor import AssessmentAgent, normalize_text
+from app.utils.assessment_cache import AssessmentCache
+from app.utils.executor import AssessmentExecutor
+
+def _assess(agent: AssessmentAgent, texts):
+    return asyncio.run(agent.assess_texts(texts))
+
+def _agent(max_entries: int = 100) -> AssessmentAgent:
+    return AssessmentAgent(AssessmentExecutor("inline"), AssessmentCache(max_entries))
+
+def test_normalize_keeps_case():
+    assert normalize_text("  Not\tgood\n:D ") == "Not good :D"
+
+def test_case_sensitive_emoticon_is_not_shared():
+    # TextBlob's emoticon lexicon is case-sensitive: ":D" is positive, ":d" is not
+    agent = _agent()
+    upper, lower = _assess(agent, ["Not good :D", "not good :d"])
+    assert upper.emotion.valence > 0
+    assert lower.emotion.valence < 0
+
+    # The order the spellings arrive in doesn't change either result
+    other = _agent()
+    lower_first, upper_second = _assess(other, ["not good :d", "Not good :D"])
+    assert lower_first == lower
+    assert upper_second == upper
+
+def test_cached_result_matches_uncached():
+    cached = _agent()
+    uncached = _agent(0)
+    texts = ["I feel anxious", "I  feel\nanxious", "I feel hopeless :(", "ok"]
+    first = _assess(cached, texts)
+    second = _assess(cached, texts)
+    assert first == second == _assess(uncached, texts)
+    # The whitespace variant shares its key with the first text
+    assert cached.cache.misses == 3
+    assert cached.cache.hits == len(texts)
+    assert uncached.cache.hits == uncached.cache.misses == 0
+
+def test_lru_eviction():
+    agent = _agent(2)
+    _assess(agent, ["one", "two", "three"])
+    assert len(agent.cache) == 2
+    assert agent.cache.evictions == 1
+
+def test_customized_agent_does_not_share_results():
+    cache = AssessmentCache(100)
+    default = AssessmentAgent(AssessmentExecutor("inline"), cache)
+    custom = AssessmentAgent(AssessmentExecutor("inline"), cache)
+    custom.crisis_indicators = {**custom.crisis_indicators, "anxious": 0.9}
+    text = ["I feel anxious"]
+    assert _assess(default, text)[0].risk_score == 0
+    assert _assess(custom, text)[0].risk_score > 0
+    assert cache.hits == 0
+
+def test_scoring_config_is_computed_once_and_reset_on_reassignment():
+    agent = _agent()
+    config = agent.scoring_config()
+    assert agent.scoring_config() is config
+    with pytest.raises(TypeError):
+        agent.crisis_indicators["anxious"] = 0.9
+    agent.crisis_indicators = {**agent.crisis_indicators, "anxious": 0.9}
+    assert agent.scoring_config() != config
+    assert _assess(agent, ["I feel anxious"])[0].risk_score == 0.9
+
+def test_config_id_table_is_bounded():
+    for weight in range(assessor.MAX_CONFIG_IDS + 10):
+        agent = _agent()
+        agent.crisis_indicators = {"word": weight}
+        _assess(agent, ["word"])
+    assert len(assessor._config_ids) <= assessor.MAX_CONFIG_IDS
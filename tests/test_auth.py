@@ -0,0 +1,33 @@
+import pytest
+
+from app.config.settings import configure_settings
+from app.utils.profiling import profiling_authorized
+
+
+@pytest.mark.parametrize("token", ["s3cret", "wrong", "sécret", "", None, 42, ["s3cret"], {"token": "s3cret"}])
+def test_profiling_token_never_raises(token):
+    assert profiling_authorized(token, "s3cret") is (token == "s3cret")
+
+def test_profiling_is_off_without_a_configured_token():
+    assert not profiling_authorized("s3cret", None)
+    assert not profiling_authorized("s3cret", "")
+
+def test_non_ascii_profile_header_is_rejected(client):
+    response = client.post(
+        "/message",
+        json={"content": "hello"},
+        headers={"X-API-Key": "key", "X-Debug-Profile": b"s\xe9cret"}
+    )
+    assert response.status_code == 403
+
+def test_api_key_is_required(client):
+    assert client.get("/debug/profiles").status_code == 401
+    assert client.get("/debug/profiles", headers={"X-API-Key": "wrong"}).status_code == 403
+    assert client.get("/debug/profiles", headers={"X-API-Key": b"k\xe9y"}).status_code == 403
+    assert client.get("/debug/profiles", headers={"X-API-Key": "key"}).status_code == 200
+
+def test_api_key_auth_is_unavailable_until_configured(client):
+    configure_settings(API_KEY=None)
+
+    response = client.get("/debug/profiles", headers={"X-API-Key": "key"})
+    assert response.status_code == 503
@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+from app.api.batch import BatchProcessor
+from app.api.warmup import FakeProvider
+from app.graphs.therapeutic_flow import TherapeuticFlow
+from app.utils.assessment_cache import AssessmentCache
+from app.utils.executor import AssessmentExecutor
+
+def _processor() -> BatchProcessor:
+    flow = TherapeuticFlow(AssessmentExecutor("inline"))
+    flow.assessor.cache = AssessmentCache(100)
+    flow.therapist.async_client = FakeProvider()
+    return BatchProcessor(flow, max_concurrency=2)
+
+def _run(processor: BatchProcessor, items):
+    async def collect():
+        return [result async for result in processor.run(items)]
+    return asyncio.run(collect())
+
+def test_per_item_errors_and_summary():
+    items = [
+        {"session_id": "a", "content": "I had a rough day"},
+        {"session_id": "b"},
+        "not an object",
+        {"session_id": "a", "content": "but I feel better now"},
+        {"content": "hello"}
+    ]
+    results = _run(_processor(), items)
+
+    *records, summary = results
+    assert summary == {"summary": True, "total": 5, "errors": 2}
+    by_index = {record["index"]: record for record in records}
+    assert sorted(by_index) == [0, 1, 2, 3, 4]
+    assert by_index[1]["session_id"] == "b"
+    assert by_index[1]["error"].startswith("Invalid message")
+    assert "error" in by_index[2]
+    for index in (0, 3, 4):
+        assert by_index[index]["response"]["content"]
+        assert not by_index[index]["metadata"].get("error")
+    # A session's items are answered in order
+    assert [r["index"] for r in records if r.get("session_id") == "a"] == [0, 3]
+
+def test_batch_scores_through_the_assessment_cache():
+    processor = _processor()
+    cache = processor.flow.assessor.cache
+    _run(processor, [
+        {"session_id": "a", "content": "I  feel\tanxious"},
+        {"session_id": "b", "content": "I feel anxious"},
+        {"content": "hello"}
+    ])
+    # Whitespace variants share one normalized entry, as on the REST/WS path
+    assert len(cache) == 2
+    asyncio.run(processor.flow.assessor.assess_texts(["I feel anxious"]))
+    assert cache.hits == 1
+
+
+def test_batch_endpoint_streams_ndjson(client):
+    response = client.post(
+        "/message/batch",
+        json={"messages": [{"session_id": "a", "content": "hello"}, {"session_id": "a"}]},
+        headers={"X-API-Key": "key"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[-1] == {"summary": True, "total": 2, "errors": 1}
+    assert {line["index"] for line in lines[:-1]} == {0, 1}
+
+def test_batch_endpoint_rejects_an_empty_batch(client):
+    response = client.post("/message/batch", json={"messages": []}, headers={"X-API-Key": "key"})
+    assert response.status_code == 422
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app.utils import circuit as circuit_module
+from app.utils.circuit import CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_module.time, "monotonic", clock)
+    return clock
+
+async def _fail():
+    raise ConnectionError("provider down")
+
+async def _succeed():
+    return "ok"
+
+def _trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            asyncio.run(breaker.call(_fail))
+
+def test_consecutive_failures_open_the_circuit(clock):
+    breaker = CircuitBreaker("provider", failure_threshold=3, reset_timeout=30)
+    _trip(breaker)
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(breaker.call(_succeed))
+    assert breaker.stats() == {"state": "open", "consecutive_failures": 3, "opened_total": 1}
+
+def test_a_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("provider", failure_threshold=2)
+    with pytest.raises(ConnectionError):
+        asyncio.run(breaker.call(_fail))
+    asyncio.run(breaker.call(_succeed))
+    with pytest.raises(ConnectionError):
+        asyncio.run(breaker.call(_fail))
+
+    assert breaker.state == "closed"
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker("provider", failure_threshold=1, reset_timeout=30)
+    _trip(breaker)
+    clock.now += 30
+    assert breaker.state == "half_open"
+
+    breaker.check()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_failed_trial_reopens_the_circuit(clock):
+    breaker = CircuitBreaker("provider", failure_threshold=1, reset_timeout=30)
+    _trip(breaker)
+    clock.now += 30
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(breaker.call(_fail))
+    assert breaker.state == "open"
+    assert breaker.opened_total == 1
+    clock.now += 29
+    assert breaker.state == "open"
+
+def test_cancelled_trial_gives_the_slot_back(clock):
+    breaker = CircuitBreaker("provider", failure_threshold=1, reset_timeout=30)
+    _trip(breaker)
+    clock.now += 30
+
+    async def cancelled_trial():
+        task = asyncio.create_task(breaker.call(asyncio.sleep, 10))
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(cancelled_trial())
+    assert breaker.state == "half_open"
+    breaker.check()
+
+@pytest.fixture
+def ready_client(client, monkeypatch):
+    from app.api.routes import warmup
+    monkeypatch.setattr(warmup, "status", "ready")
+    return client, warmup.handler.flow
+
+def test_ready_when_warm_and_circuits_closed(ready_client):
+    client, flow = ready_client
+    response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+
+@pytest.mark.parametrize("which", ["provider", "crisis_provider"])
+def test_ready_is_503_while_a_provider_circuit_is_open(ready_client, monkeypatch, which):
+    client, flow = ready_client
+    agent = flow.therapist if which == "provider" else flow.coordinator.therapist_agent
+    breaker = CircuitBreaker(agent.circuit.name, failure_threshold=1)
+    monkeypatch.setattr(agent, "circuit", breaker)
+    _trip(breaker)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    report = response.json()
+    assert report["ready"] is False
+    assert report[which]["state"] == "open"
+
+def test_ready_is_503_until_warmup_finishes(client, monkeypatch):
+    from app.api.routes import warmup
+    monkeypatch.setattr(warmup, "status", "running")
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["warmup"]["status"] == "running"
@@ -0,0 +1,33 @@
+import asyncio
+
+from app.agents.assessor import AssessmentAgent
+from app.utils import metrics
+from app.utils.assessment_cache import AssessmentCache
+from app.utils.executor import AssessmentExecutor
+from app.utils.tracing import tracer
+
+def test_thread_mode_keeps_the_callers_context():
+    executor = AssessmentExecutor("thread", workers=1)
+    agent = AssessmentAgent(executor, AssessmentCache(0))
+    seen = []
+
+    def listener(span):
+        if span.name == "assessor.sentiment":
+            seen.append((span, metrics._suppressed.get()))
+
+    async def turn():
+        with metrics.suppressed(), tracer.span("test.turn", trace_id="executor-context") as parent:
+            await agent.assess_texts(["I feel fine today"])
+        return parent
+
+    tracer.add_listener(listener)
+    try:
+        parent = asyncio.run(turn())
+    finally:
+        tracer.remove_listener(listener)
+        executor.shutdown()
+
+    span, suppressed = seen[-1]
+    assert span.trace_id == "executor-context"
+    assert span.parent_id == parent.span_id
+    assert suppressed
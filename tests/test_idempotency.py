@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from app.api.idempotency import IdempotencyCache, IdempotencyConflict, fingerprint
+
+def _counting(result="answer", delay=0.0):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+    return compute, calls
+
+def test_retry_replays_the_cached_result():
+    async def scenario():
+        cache = IdempotencyCache()
+        compute, calls = _counting()
+        first = await cache.run("key", fingerprint({"content": "hi"}), compute)
+        second = await cache.run("key", fingerprint({"content": "hi"}), compute)
+        return first, second, calls, cache.stats()
+
+    first, second, calls, stats = asyncio.run(scenario())
+    assert first == ("answer", False)
+    assert second == ("answer", True)
+    assert len(calls) == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+def test_concurrent_duplicates_share_one_computation():
+    async def scenario():
+        cache = IdempotencyCache()
+        compute, calls = _counting(delay=0.05)
+        results = await asyncio.gather(*(cache.run("key", "fp", compute) for _ in range(3)))
+        return results, calls, cache.stats()
+
+    results, calls, stats = asyncio.run(scenario())
+    assert [replayed for _, replayed in results] == [False, True, True]
+    assert len(calls) == 1
+    assert stats["coalesced"] == 2
+
+def test_reused_key_with_a_different_body_conflicts():
+    async def scenario():
+        cache = IdempotencyCache()
+        compute, _ = _counting()
+        await cache.run("key", fingerprint({"content": "hi"}), compute)
+        await cache.run("key", fingerprint({"content": "bye"}), compute)
+
+    with pytest.raises(IdempotencyConflict):
+        asyncio.run(scenario())
+
+def test_rejected_and_failed_results_are_recomputed():
+    async def scenario():
+        cache = IdempotencyCache()
+        compute, calls = _counting(result={"metadata": {"fallback": True}})
+        await cache.run("fallback", "fp", compute, lambda result: not result["metadata"]["fallback"])
+        await cache.run("fallback", "fp", compute, lambda result: not result["metadata"]["fallback"])
+
+        async def failing():
+            calls.append(1)
+            raise RuntimeError("provider down")
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.run("failing", "fp", failing)
+        return calls, cache.stats()
+
+    calls, stats = asyncio.run(scenario())
+    assert len(calls) == 4
+    assert stats["entries"] == 0
+
+def test_entries_expire_after_the_ttl():
+    async def scenario():
+        cache = IdempotencyCache(ttl=0.0)
+        compute, calls = _counting()
+        await cache.run("key", "fp", compute)
+        await asyncio.sleep(0)
+        await cache.run("key", "fp", compute)
+        return calls
+
+    assert len(asyncio.run(scenario())) == 2
+
+
+def test_message_endpoint_replays_and_rejects_conflicts(client):
+    headers = {"X-API-Key": "key", "Idempotency-Key": "turn-1"}
+    first = client.post("/message", json={"content": "I feel a bit low"}, headers=headers)
+    retry = client.post("/message", json={"content": "I feel a bit low"}, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+    conflict = client.post("/message", json={"content": "something else"}, headers=headers)
+    assert conflict.status_code == 422
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.utils import metrics
+from app.utils.metrics import Registry
+from app.utils.tracing import tracer
+
+
+def test_counter_and_gauge_render_in_prometheus_text_format():
+    registry = Registry()
+    registry.counter("jobs", "Jobs done", ["kind"]).labels('say "hi"').inc(2)
+    registry.gauge("depth", "Queue depth").labels().set_function(lambda: 3.5)
+
+    assert registry.render() == (
+        "# HELP jobs_total Jobs done\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{kind="say \\"hi\\""} 2\n'
+        "# HELP depth Queue depth\n"
+        "# TYPE depth gauge\n"
+        "depth 3.5\n"
+    )
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        latency.labels("assessment").observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'latency_seconds_bucket{stage="assessment",le="0.1"} 2',
+        'latency_seconds_bucket{stage="assessment",le="1"} 3',
+        'latency_seconds_bucket{stage="assessment",le="+Inf"} 4',
+        'latency_seconds_sum{stage="assessment"} 2.65',
+        'latency_seconds_count{stage="assessment"} 4'
+    ]
+
+def test_families_reject_duplicates_and_wrong_labels():
+    registry = Registry()
+    family = registry.counter("jobs", "Jobs done", ["kind"])
+    with pytest.raises(ValueError):
+        registry.counter("jobs", "Again")
+    with pytest.raises(ValueError):
+        family.labels("a", "b")
+
+def _batch_turns():
+    metrics.install()
+    return metrics.TURNS.labels("batch").value
+
+def test_finished_spans_are_recorded():
+    before = _batch_turns()
+    with tracer.span("batch.item"):
+        pass
+    assert _batch_turns() == before + 1
+
+def test_suppressed_spans_are_not_recorded():
+    before = _batch_turns()
+
+    async def synthetic():
+        with tracer.span("batch.item"):
+            await asyncio.sleep(0)
+
+    async def scenario():
+        with metrics.suppressed():
+            with tracer.span("batch.item"):
+                pass
+            # Tasks started inside the block inherit the suppression
+            await asyncio.create_task(synthetic())
+
+    asyncio.run(scenario())
+    assert _batch_turns() == before
+
+def test_metrics_endpoint(client):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.registry.content_type
+    assert "# TYPE chat_turn_duration_seconds histogram" in response.text
+    assert "chat_websocket_connections 0" in response.text
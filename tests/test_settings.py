@@ -0,0 +1,35 @@
+import time
+
+from app.config import settings as settings_module
+from app.config.settings import SettingsWatcher, configure_settings, get_settings
+
+
+def test_settings_are_loaded_once():
+    assert get_settings() is get_settings()
+
+def test_overrides_take_precedence_over_the_environment(monkeypatch):
+    monkeypatch.setenv("MAX_HISTORY", "4")
+    configure_settings(MAX_HISTORY=6)
+    try:
+        assert get_settings().MAX_HISTORY == 6
+    finally:
+        settings_module._overrides.pop("MAX_HISTORY")
+        settings_module.reload_settings()
+    assert get_settings().MAX_HISTORY == 4
+
+def test_watcher_reloads_when_the_env_file_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    env_file = tmp_path / ".env"
+    watcher = SettingsWatcher(env_file, interval=0.01)
+    watcher.start()
+    try:
+        env_file.write_text("CRISIS_THRESHOLD=0.5\n")
+        deadline = time.monotonic() + 2
+        while get_settings().CRISIS_THRESHOLD != 0.5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert get_settings().CRISIS_THRESHOLD == 0.5
+    finally:
+        watcher.stop()
+        watcher.join()
+        monkeypatch.undo()
+        settings_module.reload_settings()
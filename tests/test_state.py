@@ -0,0 +1,34 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.state import ConversationState, TherapeuticFramework, initial_conversation_state
+
+def test_sessions_share_the_default_until_their_first_edit():
+    first, second = initial_conversation_state(), initial_conversation_state()
+    assert first.therapeutic_state is second.therapeutic_state
+    assert first.messages is not second.messages
+    assert first.safety_status is not second.safety_status
+
+    edited = first.edit_therapeutic_state()
+    edited.active_framework = TherapeuticFramework.DBT
+    edited.interventions_used.append("crisis_intervention")
+    assert first.edit_therapeutic_state() is edited
+    assert second.therapeutic_state.active_framework == TherapeuticFramework.PERSON_CENTERED
+    assert initial_conversation_state().therapeutic_state.interventions_used == []
+
+def test_shared_default_refuses_in_place_changes():
+    state = initial_conversation_state()
+    with pytest.raises(Exception):
+        state.therapeutic_state.active_framework = TherapeuticFramework.DBT
+    with pytest.raises(TypeError):
+        state.therapeutic_state.session_goals.append("goal")
+    with pytest.raises(TypeError):
+        state.emotional_state.secondary_emotions.append("sad")
+
+def test_initial_state_round_trips_and_is_stamped_per_session():
+    before = datetime.now()
+    state = initial_conversation_state()
+    assert state.safety_status.last_assessment >= before
+    restored = ConversationState.model_validate_json(state.model_dump_json())
+    assert restored.model_dump() == state.model_dump()
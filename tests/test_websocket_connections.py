@@ -0,0 +1,59 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.api.websocket import ConnectionManager
+
+class FakeSocket:
+    """Just enough of a WebSocket for ConnectionManager."""
+
+    def __init__(self):
+        self.scope = {"subprotocols": []}
+        self.query_params = {}
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+def test_reaper_closes_only_sockets_idle_past_the_timeout():
+    async def scenario():
+        manager = ConnectionManager(reap_interval=3600, idle_timeout=600)
+        idle, active = FakeSocket(), FakeSocket()
+        await manager.connect(idle, "idle")
+        await manager.connect(active, "active")
+        manager.session_states["idle"] = manager.session_states["active"] = object()
+
+        # A minute of silence is a normal pause, not a dead client
+        manager._last_seen[id(idle)] -= 60
+        assert await manager.reap() == 0
+
+        manager._last_seen[id(idle)] -= 600
+        assert await manager.reap() == 1
+        await manager.stop_reaper()
+        return manager, idle, active
+
+    manager, idle, active = asyncio.run(scenario())
+    assert idle.closed_with == 1001
+    assert active.closed_with is None
+    # The reaper sends nothing to live sockets; liveness is the server's pings
+    assert active.sent == []
+    assert set(manager.session_states) == {"active"}
+    assert manager.stats()["reaped_total"] == 1
+
+def test_non_object_frame_gets_an_error_reply_and_keeps_the_socket():
+    from app.main import app
+
+    with TestClient(app).websocket_connect("/ws/frames") as websocket:
+        assert websocket.receive_json()["metadata"]["message_type"] == "welcome"
+        for frame in ("[]", '"hi"', "42"):
+            websocket.send_text(frame)
+            assert websocket.receive_json()["metadata"] == {"error": True}
+        websocket.send_json({"type": "ping"})
+        assert websocket.receive_json() == {"type": "pong"}
@@ -0,0 +1,78 @@
+import asyncio
+
+from app.api.warmup import FakeProvider
+from app.api.websocket import ChatWebSocket, ClientSession
+from app.models.message import Message
+
+class SlowProvider(FakeProvider):
+    """FakeProvider that takes ``delay`` seconds to answer."""
+
+    def __init__(self, delay: float):
+        super().__init__("Thank you for sharing that with me.")
+        self.delay = delay
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        return await super().create(**kwargs)
+
+def _chat(delay: float = 0.0):
+    """A handler whose frames are collected instead of sent."""
+    chat = ChatWebSocket()
+    chat.flow.therapist.async_client = SlowProvider(delay)
+    sent = []
+
+    async def send_message(client_id, message, flush=True):
+        sent.append(message)
+
+    async def send_static(client_id, name, flush=True):
+        sent.append(name)
+
+    chat.manager.send_message = send_message
+    chat.manager.send_static = send_static
+    return chat, sent
+
+async def _converse(chat: ChatWebSocket, *contents: str, gap: float = 0.0):
+    """Submit messages to one session ``gap`` seconds apart and wait for every turn."""
+    session = ClientSession("client", chat.handle_message, cancel_stale=True)
+    session.start()
+    for content in contents:
+        session.submit({"content": content})
+        await asyncio.sleep(gap)
+    await session.inbox.join()
+    await session.close()
+
+def _responses(sent):
+    return [frame for frame in sent if isinstance(frame, Message)]
+
+def test_crisis_turn_is_not_superseded():
+    chat, sent = _chat(delay=0.2)
+    asyncio.run(_converse(chat, "I want to kill myself", "sorry, ignore that"))
+
+    responses = _responses(sent)
+    assert len(responses) == 2
+    crisis = responses[0]
+    assert crisis.metadata["error_type"] == "Crisis situation detected"
+    assert "988" in crisis.content
+    assert sent.count("typing_on") == sent.count("typing_off") == 2
+
+def test_newer_message_supersedes_generation_only():
+    chat, sent = _chat(delay=0.5)
+    asyncio.run(_converse(chat, "I had a long day at work", "and I can't sleep", gap=0.1))
+
+    # Only the newer message is answered, but both were assessed
+    responses = _responses(sent)
+    assert len(responses) == 1
+    assert sent.count("typing_on") == sent.count("typing_off") == 2
+    assert chat.manager.session_states["client"] is not None
+
+def test_typing_off_is_sent_when_the_turn_fails():
+    chat, sent = _chat()
+
+    async def failing_process(*args, **kwargs):
+        raise RuntimeError("flow failed")
+
+    chat.flow.process = failing_process
+    asyncio.run(_converse(chat, "hello"))
+
+    assert sent[:2] == ["typing_on", "typing_off"]
+    assert _responses(sent)[0].metadata == {"error": True}